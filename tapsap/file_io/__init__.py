@@ -1,7 +1,13 @@
+from .read_tdms_meta_data import read_tdms_meta_data
 from .read_tdms import read_tdms
+from .read_tdms_batch import read_tdms_batch
+from .index_tdms import index_tdms
+from .query_tdms_index import query_tdms_index
 from .write_xlsx import write_xlsx
 from .read_xlsx import read_xlsx
 from .transient_to_xlsx import transient_to_xlsx
 from .transient_to_xlsx_summary import transient_to_xlsx_summary
 from .reactor_to_df import reactor_to_df
-from .experiment_to_df import experiment_to_df
\ No newline at end of file
+from .experiment_to_df import experiment_to_df
+from .write_binary import write_binary
+from .read_binary import read_binary
\ No newline at end of file
@@ -0,0 +1,132 @@
+# index_tdms
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from tapsap import file_io, structures
+from nptdms import TdmsFile
+import glob
+import os
+import sqlite3
+
+
+def index_tdms(file_names, index_file: str = 'tdms_index.db', reindex: bool = False, read_temperature: bool = False) -> None:
+    """
+
+    A function for scanning the meta data of many tdms files into a SQLite index that may be queried (see tapsap.file_io.query_tdms_index).
+    Each file is opened for streaming, such that only the meta data of the file (the groups, channels and their lengths) and the meta data group are read, i.e., neither the time channel nor the pulse channels are read.
+    If read_temperature, then the first value (temperature) of each pulse is also read from its offset within the file (see tapsap.structures.TdmsPulseSource.read_temperature), otherwise the temperature is None.
+    Files that are already in the index and have not been modified since are skipped unless reindex, or unless read_temperature and the file was indexed without the temperature.
+
+    The index contains three tables:
+        experiments: file_name, modified, collection_time, pulse_spacing, num_samples_per_pulse and error (None if the file was read).
+
+        species: file_name, name, mass, gain, delay_time, num_pulse, temperature_min and temperature_max (None unless read_temperature).
+
+        pulses: file_name, name, pulse_number and temperature (None unless read_temperature).
+
+    Args:
+        file_names (str or str list): A directory containing .tdms files, a glob pattern, e.g., 'campaign/*.tdms', or a list of file paths.
+
+        index_file (str): The path of the SQLite database.  The database is created if needed.
+
+        reindex (bool): Scan every file, even if it is unchanged.
+
+        read_temperature (bool): Read the temperature of each pulse.
+
+    Returns:
+        None
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.query_tdms_index
+
+        tapsap.file_io.read_tdms
+
+    Link:
+        https://docs.python.org/3/library/sqlite3.html
+    """
+    if isinstance(file_names, str):
+        if os.path.isdir(file_names):
+            file_names = os.path.join(file_names, '*.tdms')
+
+        file_names = sorted(glob.glob(file_names))
+
+    connection = sqlite3.connect(index_file)
+    try:
+        connection.execute('CREATE TABLE IF NOT EXISTS experiments (file_name TEXT PRIMARY KEY, modified REAL, collection_time REAL, pulse_spacing REAL, num_samples_per_pulse INTEGER, error TEXT)')
+        connection.execute('CREATE TABLE IF NOT EXISTS species (file_name TEXT, name TEXT, mass REAL, gain REAL, delay_time REAL, num_pulse INTEGER, temperature_min REAL, temperature_max REAL)')
+        connection.execute('CREATE TABLE IF NOT EXISTS pulses (file_name TEXT, name TEXT, pulse_number INTEGER, temperature REAL)')
+        connection.execute('CREATE INDEX IF NOT EXISTS species_file_name ON species (file_name)')
+        connection.execute('CREATE INDEX IF NOT EXISTS pulses_file_name ON pulses (file_name, name)')
+        for file_name in file_names:
+            file_name = os.path.abspath(file_name)
+            modified = os.path.getmtime(file_name)
+            previous = connection.execute('SELECT modified FROM experiments WHERE file_name = ?', (file_name,)).fetchone()
+            if (not reindex) and (previous is not None) and (previous[0] == modified):
+                missing_temperature = connection.execute('SELECT COUNT(*) FROM species WHERE file_name = ? AND temperature_min IS NULL', (file_name,)).fetchone()[0]
+                if (not read_temperature) or (missing_temperature == 0):
+                    continue
+
+            experiment_row = (file_name, modified, None, None, None, None)
+            species_rows = []
+            pulse_rows = []
+            try:
+                with TdmsFile.open(file_name) as tdms_file:
+                    meta_data = file_io.read_tdms_meta_data(tdms_file)
+                    amu_values = [meta_data[i] for i in meta_data.keys() if 'AMU' in i]
+                    gain_values = [meta_data[i] for i in meta_data.keys() if 'Gain' in i]
+                    delay_time = float([meta_data[i] for i in meta_data.keys() if 'Delay Time' in i][0])
+                    pulse_spacing = float([meta_data[i] for i in meta_data.keys() if 'Pulse Spacing' in i][0])
+                    collection_time = float([meta_data[i] for i in meta_data.keys() if 'Collection Time' in i][0])
+                    # the gas species are named as in tapsap.file_io.read_tdms
+                    mass_groups = [group for group in tdms_file.groups() if group.name not in ['Meta Data', 'Secondary Data']]
+                    all_gas_names = []
+                    num_samples_per_pulse = None
+                    for i, group in enumerate(mass_groups):
+                        gas_mass = amu_values[i]
+                        gas_name = 'AMU_' + str(gas_mass) + '_1'
+                        if gas_name in all_gas_names:
+                            current_set = [temp_val for temp_val in all_gas_names if gas_name in temp_val]
+                            gas_name = 'AMU_' + str(gas_mass) + '_' + str(len(current_set) + 1)
+
+                        all_gas_names.append(gas_name)
+                        # the channel lengths are part of the meta data, the first value of each pulse is the temperature
+                        group_channels = group.channels()
+                        pulse_channels = group_channels[3:]
+                        num_samples = max([len(channel) for channel in pulse_channels]) - 1
+                        if num_samples_per_pulse is None:
+                            num_samples_per_pulse = min(len(group_channels[2]), num_samples)
+
+                        pulse_names = [channel.name for channel in pulse_channels]
+                        if read_temperature:
+                            temperature_values = [float(j) for j in structures.TdmsPulseSource(tdms_file, group.name, pulse_names, num_samples).read_temperature()]
+                            temperature_min = min(temperature_values)
+                            temperature_max = max(temperature_values)
+                        else:
+                            temperature_values = [None] * len(pulse_names)
+                            temperature_min = None
+                            temperature_max = None
+
+                        species_rows.append((file_name, gas_name, float(gas_mass), float(gain_values[i]), delay_time, len(pulse_names), temperature_min, temperature_max))
+                        pulse_rows += [(file_name, gas_name, int(j), k) for j, k in zip(pulse_names, temperature_values)]
+
+                    experiment_row = (file_name, modified, collection_time, pulse_spacing, num_samples_per_pulse, None)
+            except Exception as error:
+                experiment_row = (file_name, modified, None, None, None, repr(error))
+                species_rows = []
+                pulse_rows = []
+
+            # each file is replaced within a single transaction
+            with connection:
+                for table_name in ['experiments', 'species', 'pulses']:
+                    connection.execute('DELETE FROM ' + table_name + ' WHERE file_name = ?', (file_name,))
+
+                connection.execute('INSERT INTO experiments VALUES (?, ?, ?, ?, ?, ?)', experiment_row)
+                connection.executemany('INSERT INTO species VALUES (?, ?, ?, ?, ?, ?, ?, ?)', species_rows)
+                connection.executemany('INSERT INTO pulses VALUES (?, ?, ?, ?)', pulse_rows)
+    finally:
+        connection.close()
@@ -0,0 +1,60 @@
+# query_tdms_index
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import sqlite3
+import pandas as pd
+
+
+def query_tdms_index(index_file: str = 'tdms_index.db', temperature_range: list = None, masses: list = None, pulse_spacing: float = None) -> pd.DataFrame:
+    """
+
+    A function for finding the gas species within a SQLite index of tdms files (see tapsap.file_io.index_tdms) that match the given conditions.
+    A species matches a temperature range if any of its pulses were collected within the range, where only the files indexed with read_temperature have a temperature.
+
+    Args:
+        index_file (str): The path of the SQLite database.
+
+        temperature_range (floats list, optional): The minimum and maximum temperature.
+
+        masses (floats list, optional): The atomic mass units of the species, e.g., [40].
+
+        pulse_spacing (float, optional): The time between pulses of the experiment.
+
+    Returns:
+        matches (DataFrame): One row per matching species containing the species information and the experiment information.
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.index_tdms
+
+    Link:
+        https://docs.python.org/3/library/sqlite3.html
+    """
+    conditions = ['experiments.error IS NULL']
+    params = []
+    if temperature_range is not None:
+        temperature_range = sorted(temperature_range)
+        conditions.append('EXISTS (SELECT 1 FROM pulses WHERE pulses.file_name = species.file_name AND pulses.name = species.name AND pulses.temperature BETWEEN ? AND ?)')
+        params += [float(temperature_range[0]), float(temperature_range[1])]
+
+    if masses is not None:
+        conditions.append('species.mass IN (' + ', '.join(['?'] * len(masses)) + ')')
+        params += [float(i) for i in masses]
+
+    if pulse_spacing is not None:
+        conditions.append('experiments.pulse_spacing = ?')
+        params.append(float(pulse_spacing))
+
+    query = 'SELECT species.*, experiments.collection_time, experiments.pulse_spacing, experiments.num_samples_per_pulse FROM species JOIN experiments ON species.file_name = experiments.file_name WHERE ' + ' AND '.join(conditions) + ' ORDER BY species.file_name, species.name'
+    connection = sqlite3.connect(index_file)
+    try:
+        matches = pd.read_sql_query(query, connection, params=params)
+    finally:
+        connection.close()
+
+    return matches
@@ -0,0 +1,107 @@
+# read_binary
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from tapsap import structures
+
+
+def read_binary(input_dir: str, mmap_mode: str = 'c') -> structures.Experiment:
+    """
+
+    A function for reading an experiment written by tapsap.file_io.write_binary to a tapsap Experiment object.
+    The flux arrays are memory mapped rather than read, such that only the pulses that are used are loaded.
+    With the default mode (c), changes to the flux are kept in memory and the files are left untouched.
+    With mode r+, changes are written to the files and any new flux arrays are written next to them (see tapsap.structures.PulseMatrix).
+    With mode r, the flux arrays are read-only and the flux is copied into memory the first time it is changed, e.g., by baseline_correct.
+    The reactor of each species is restored, where a species that used the reactor of the experiment uses the reactor of the new experiment.
+
+    Args:
+        input_dir (str): The directory written by write_binary.
+
+        mmap_mode (str): The memory map mode of the flux. Options: c, r+, r, None (read into memory)
+
+    Returns:
+        experiment (Experiment): A object containing all of the experiment information.
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.write_binary
+
+    Link:
+        https://numpy.org/doc/stable/reference/generated/numpy.lib.format.html
+    """
+    if mmap_mode not in ['c', 'r+', 'r', None]:
+        raise ValueError(
+            "mmap_mode must be either c, r+, r or None")
+
+    with open(os.path.join(input_dir, 'experiment.json'), 'r') as f:
+        info = json.load(f)
+
+    # version 1 does not contain the reactor of each species
+    if info.get('format_version') not in [1, 2]:
+        raise ValueError(
+            "format_version must be either 1 or 2, the directory was written by a newer version of tapsap or is not an experiment: " + str(info.get('format_version')))
+
+    new_experiment = structures.Experiment()
+    for i in info['experiment'].keys():
+        setattr(new_experiment, i, info['experiment'][i])
+
+    for i in info['reactor'].keys():
+        setattr(new_experiment.reactor, i, info['reactor'][i])
+
+    for i, species_info in enumerate(info['species']):
+        species_dir = os.path.join(input_dir, str(i))
+        new_transient = structures.Transient()
+        for j in ['name', 'mass', 'gain', 'delay_time', 'smoothing_parameter', 'diffusion', 'amount_pulsed', 'initial_concentration', 'num_pulse', 'integration_times']:
+            setattr(new_transient, j, species_info[j])
+
+        new_transient.times = np.load(os.path.join(species_dir, 'times.npy'))
+        if species_info.get('experiment_reactor', True):
+            new_transient.reactor = new_experiment.reactor
+        else:
+            for j in species_info['reactor'].keys():
+                setattr(new_transient.reactor, j, species_info['reactor'][j])
+        for j in ['flux_matrix', 'smoothed_flux_matrix']:
+            if not species_info[j]:
+                continue
+
+            matrix_file = os.path.join(species_dir, j + '.npy')
+            temperature = species_info['temperature']
+            pulse_ids = np.array(species_info['pulse_ids'], dtype=object)
+            index = np.load(os.path.join(species_dir, 'index.npy'))
+            if mmap_mode == 'r+':
+                temp_matrix = structures.PulseMatrix.from_memmap(matrix_file, pulse_ids, temperature, index)
+            else:
+                temp_matrix = structures.PulseMatrix(np.load(matrix_file, mmap_mode=mmap_mode), pulse_ids, temperature, index)
+
+            setattr(new_transient, j, temp_matrix)
+
+        moments_info = species_info['df_moments']
+        if moments_info is not None:
+            moments_values = np.load(os.path.join(species_dir, 'df_moments.npy'))
+            init_moments = {}
+            for j in moments_info['columns']:
+                if j in moments_info['numeric_columns']:
+                    k = moments_info['numeric_columns'].index(j)
+                    init_moments[j] = moments_values[:, k].astype(moments_info['dtypes'][k])
+                else:
+                    init_moments[j] = moments_info['other_columns'][j]
+
+            new_transient.df_moments = pd.DataFrame(init_moments, columns=moments_info['columns'])
+
+        new_experiment.species_data[species_info['key']] = new_transient
+
+    # link the reference gas of each species
+    for species_info in info['species']:
+        if species_info['reference_gas'] is not None:
+            new_experiment.species_data[species_info['key']].reference_gas = new_experiment.species_data[species_info['reference_gas']]
+
+    return new_experiment
@@ -1,21 +1,35 @@
 # read_tdms
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
-from tapsap import structures
+from tapsap import structures, file_io
 from nptdms import TdmsFile
-from numpy import unique, array
+import numpy as np
 import pandas as pd
+import os
 
 
-def read_tdms(file_name: str) -> structures.Experiment:
+def read_tdms(file_name: str, species: list = None, pulse_range: list = None, lazy: bool = False, memmap_dir: str = None) -> structures.Experiment:
     """
 
     A function for reading a tdms file to a tapsap Experiment object.
     Requires the use of the python package 'nptdms' for use.
+    The groups and channels are read directly from the file.
+    The meta data group is read as item / value pairs and the pulse channels of each measured mass are placed into a preallocated array, such that only one copy of the flux is held in memory.
+    If lazy, then the groups and channels are indexed and the flux of a species is only read the first time its flux is used, while the temperature of each pulse is only read the first time the moments are used.
+    The file is then kept open until the experiment is closed.
+    If memmap_dir is given, then the flux of each species is read into a .npy file within the directory (see tapsap.structures.PulseMatrix), such that the flux is processed in chunks of pulses rather than held in memory.
     
     Args:
         file_name (str): The path to the TDMS file that is to be read.
 
+        species (str list, optional): The names of the gas species to read, e.g., ['AMU_40_1'].  If None, then all species are read.
+
+        pulse_range (ints list, optional): The start and end (exclusive) of the pulses to read.  If None, then all pulses are read.
+
+        lazy (bool): Read the flux of each species on demand.
+
+        memmap_dir (str, optional): The directory of the memory mapped flux.  The files are not removed when the experiment is closed.
+
     Returns:
         experiment (Experiment): A object containing all of the TDMS information.
 
@@ -30,77 +44,90 @@ def read_tdms(file_name: str) -> structures.Experiment:
 
         tapsap.file_io.Transient
 
+        tapsap.file_io.read_tdms_meta_data
+
+        tapsap.structures.TdmsPulseSource
+
     Link:
         None
 
     """
     new_experiment = structures.Experiment()
     new_experiment.file_name = file_name
-    base_file = TdmsFile(file_name).as_dataframe()
-
-    meta_data = base_file.filter(regex='Meta Data')
-    df = meta_data.dropna()
-    df_names = list(df.keys())
-    amu_values = [i for i, item_name in enumerate(
-        df[df_names[0]]) if 'AMU' in item_name]
-    pulse_spacing = [i for i, item_name in enumerate(
-        df[df_names[0]]) if 'Pulse Spacing' in item_name]
-    pulse_spacing = pulse_spacing[0]
-    new_experiment.pulse_spacing = float(df[df_names[1]][pulse_spacing])
-    collection_time = [i for i, item_name in enumerate(
-        df[df_names[0]]) if 'Collection Time' in item_name]
-    collection_time = collection_time[0]
-    new_experiment.collection_time = float(df[df_names[1]][collection_time])
-
-    # get the group info which corresponds to the names of each individual measured mass
-    tdms_names = tdms_names = base_file.keys()
-    tdms_names_split = [str(i).replace("'", "") for i in tdms_names]
-    tdms_names_split = [str(i).split("/") for i in tdms_names_split]
-    group_info = [i[1] for i in tdms_names_split]
-    unique_group_info = list(unique(array(group_info)))
-    # removing secondary and meta data where the remainder are the individual measured masses
-    unique_group_info = unique_group_info[:len(unique_group_info) - 2]
-
-    for i, group_value in enumerate(unique_group_info):
-        gas_mass = df[df_names[1]][i]
-        gas_name = 'AMU_' + str(gas_mass) + '_1'
-        all_gas_names = new_experiment.species_data.keys()
-        if gas_name in all_gas_names:
-            current_set = [
-                temp_val for temp_val in all_gas_names if gas_name in temp_val]
-            gas_name = 'AMU_' + str(gas_mass) + '_' + str(len(current_set) + 1)
-
-        group_locs = [j for j, temp_val in enumerate(
-            group_info) if temp_val == group_value]
-        # subset the data based on the group locations
-        group_df = base_file.iloc[:, group_locs]
-        num_rows = group_df.shape[0]
-        time_values = array(group_df.iloc[:(num_rows - 1), 2]).flatten()
-        temperature_values = list(group_df.iloc[0, 3:])
-        flux_df = group_df.iloc[1:, 3:]
-        pulse_index = [str((i.split('/')[2]).replace("'", ""))
-                       for i in flux_df.keys()]
-        flux_df.columns = pulse_index
-        # set experiment values
-        if i == 0:
-            new_experiment.num_samples_per_pulse = len(time_values)
-            new_experiment.time_start = min(time_values)
-            new_experiment.time_end = max(time_values)
-        # creation of the transient
-        new_species = structures.Transient()
-        new_species.name = gas_name
-        new_species.mass = float(gas_mass)
-        new_species.gain = float(df[df_names[1]][i + len(amu_values)])
-        new_species.delay_time = float(df[df_names[1]][2*len(amu_values)])
-        new_species.flux = flux_df
-        new_species.times = time_values
-        new_species.num_pulse = flux_df.shape[1]
-        new_species.integration_times = [0, max(time_values)]
-        init_moments = {
-            'pulse_number': [int(i) for i in pulse_index],
-            'temperature': temperature_values
-        }
-        new_species.df_moments = pd.DataFrame.from_dict(init_moments)
-        new_experiment.species_data[gas_name] = new_species
+
+    tdms_file = TdmsFile.open(file_name)
+    try:
+        meta_data = file_io.read_tdms_meta_data(tdms_file)
+        amu_values = [meta_data[i] for i in meta_data.keys() if 'AMU' in i]
+        gain_values = [meta_data[i] for i in meta_data.keys() if 'Gain' in i]
+        delay_time = float([meta_data[i] for i in meta_data.keys() if 'Delay Time' in i][0])
+        new_experiment.pulse_spacing = float([meta_data[i] for i in meta_data.keys() if 'Pulse Spacing' in i][0])
+        new_experiment.collection_time = float([meta_data[i] for i in meta_data.keys() if 'Collection Time' in i][0])
+
+        # removing secondary and meta data where the remainder are the individual measured masses
+        mass_groups = [group for group in tdms_file.groups() if group.name not in ['Meta Data', 'Secondary Data']]
+        all_gas_names = []
+        for i, group in enumerate(mass_groups):
+            gas_mass = amu_values[i]
+            gas_name = 'AMU_' + str(gas_mass) + '_1'
+            if gas_name in all_gas_names:
+                current_set = [
+                    temp_val for temp_val in all_gas_names if gas_name in temp_val]
+                gas_name = 'AMU_' + str(gas_mass) + '_' + str(len(current_set) + 1)
+
+            all_gas_names.append(gas_name)
+            if (species is not None) and (gas_name not in species):
+                continue
+
+            # the first three channels are the item, value and time, the remainder are the pulses
+            group_channels = group.channels()
+            pulse_channels = group_channels[3:]
+            # the first value of each pulse is the temperature
+            num_samples = max([len(channel) for channel in pulse_channels]) - 1
+            pulse_index = [channel.name for channel in pulse_channels]
+            if pulse_range is not None:
+                pulse_index = pulse_index[pulse_range[0]:pulse_range[1]]
+
+            time_values = np.array(group_channels[2][:num_samples], dtype=float)
+            memmap_file = None if memmap_dir is None else os.path.join(memmap_dir, gas_name + '.npy')
+            flux_source = structures.TdmsPulseSource(tdms_file, group.name, pulse_index, num_samples, memmap_file)
+
+            # set experiment values
+            if len(new_experiment.species_data) == 0:
+                new_experiment.num_samples_per_pulse = len(time_values)
+                new_experiment.time_start = min(time_values)
+                new_experiment.time_end = max(time_values)
+            # creation of the transient
+            new_species = structures.Transient()
+            new_species.name = gas_name
+            new_species.mass = float(gas_mass)
+            new_species.gain = float(gain_values[i])
+            new_species.delay_time = delay_time
+            if lazy:
+                new_species.flux_source = flux_source
+                # the temperature is read on first use of the moments
+                temperature_values = np.full(len(pulse_index), np.nan)
+            else:
+                new_species.flux = flux_source.read()
+                temperature_values = new_species.flux_matrix.temperature
+            new_species.times = time_values
+            new_species.num_pulse = len(pulse_index)
+            new_species.integration_times = [0, max(time_values)]
+            init_moments = {
+                'pulse_number': [int(i) for i in pulse_index],
+                'temperature': list(temperature_values)
+            }
+            new_species.df_moments = pd.DataFrame.from_dict(init_moments)
+            if lazy:
+                new_species.temperature_source = flux_source
+            new_experiment.species_data[gas_name] = new_species
+    except Exception:
+        tdms_file.close()
+        raise
+
+    if lazy:
+        new_experiment.tdms_file = tdms_file
+    else:
+        tdms_file.close()
 
     return new_experiment
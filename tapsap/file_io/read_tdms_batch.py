@@ -0,0 +1,93 @@
+# read_tdms_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from tapsap import structures, file_io
+import glob
+import os
+import time
+import pandas as pd
+
+
+def read_tdms_batch(file_names, output_dir: str = None, num_cores: int = None, read_args: dict = None) -> pd.DataFrame:
+    """
+
+    A function for reading many tdms files into a catalog of tapsap Experiment objects.
+    Each file is independent, so the files are read concurrently by a pool of worker processes (see tapsap.structures.Executor), where the disk reads of one file overlap the parsing of another.
+    If output_dir is given, then each experiment is written as a binary checkpoint (see tapsap.file_io.write_binary) by its worker and only the path is returned, such that the flux is not sent between processes.
+    A file that cannot be read is recorded in the catalog with its error rather than stopping the batch.
+
+    Args:
+        file_names (str or str list): A directory containing .tdms files, a glob pattern, e.g., 'campaign/*.tdms', or a list of file paths.
+
+        output_dir (str, optional): The directory of the binary checkpoints.  Each file is written to a directory named after the file.
+
+        num_cores (int, optional): The number of worker processes.  If None, then the total number of cores available - 1.
+
+        read_args (dict, optional): Additional arguments passed to tapsap.file_io.read_tdms, e.g., {'species': ['AMU_40_1']}.  Without output_dir, lazy is ignored as a lazy experiment holds the open file and cannot be sent back from a worker.  The memory mapped flux of each file is written to a directory within memmap_dir named after the file, as the species of different files have the same names.
+
+    Returns:
+        catalog (DataFrame): One row per file containing the file_name, the experiment (or None if checkpointed or failed), the checkpoint directory, the read_time in seconds and the error (None if the file was read).
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.read_tdms
+
+        tapsap.file_io.write_binary
+
+        tapsap.structures.Executor
+
+    Link:
+        None
+
+    """
+    if isinstance(file_names, str):
+        if os.path.isdir(file_names):
+            file_names = os.path.join(file_names, '*.tdms')
+
+        file_names = sorted(glob.glob(file_names))
+
+    file_names = list(file_names)
+    read_args = {} if read_args is None else dict(read_args)
+    if output_dir is None:
+        read_args['lazy'] = False
+
+    # files with the same name in different directories are numbered
+    all_stems = [os.path.splitext(os.path.basename(i))[0] for i in file_names]
+    file_stems = [stem + '_' + str(all_stems[:i].count(stem) + 1) if all_stems.count(stem) > 1 else stem for i, stem in enumerate(all_stems)]
+    checkpoint_names = [None] * len(file_names)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        checkpoint_names = [os.path.join(output_dir, stem) for stem in file_stems]
+
+    all_read_args = [read_args] * len(file_names)
+    if read_args.get('memmap_dir') is not None:
+        all_read_args = [dict(read_args, memmap_dir=os.path.join(read_args['memmap_dir'], stem)) for stem in file_stems]
+        for temp_args in all_read_args:
+            os.makedirs(temp_args['memmap_dir'], exist_ok=True)
+
+    with structures.Executor(num_cores, min_parallel_tasks=2) as temp_executor:
+        results = temp_executor.starmap(_read_file, [(file_names[i], checkpoint_names[i], all_read_args[i]) for i in range(len(file_names))])
+
+    catalog = pd.DataFrame(results, columns=['file_name', 'experiment', 'checkpoint', 'read_time', 'error'])
+
+    return catalog
+
+
+def _read_file(file_name: str, checkpoint_name: str, read_args: dict) -> tuple:
+    # the work of a single process, failures are returned rather than raised
+    start_time = time.perf_counter()
+    try:
+        new_experiment = file_io.read_tdms(file_name, **read_args)
+        if checkpoint_name is not None:
+            file_io.write_binary(new_experiment, checkpoint_name)
+            new_experiment.close()
+            new_experiment = None
+    except Exception as error:
+        return (file_name, None, None, time.perf_counter() - start_time, repr(error))
+
+    return (file_name, new_experiment, checkpoint_name, time.perf_counter() - start_time, None)
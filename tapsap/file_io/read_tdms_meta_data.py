@@ -0,0 +1,37 @@
+# read_tdms_meta_data
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from nptdms import TdmsFile
+
+
+def read_tdms_meta_data(tdms_file: TdmsFile) -> dict:
+    """
+
+    A function for reading the meta data group of a tdms file as item / value pairs.
+    
+    Args:
+        tdms_file (TdmsFile): The opened TDMS file.
+
+    Returns:
+        meta_data (dict): The value (str) of each meta data item in the order of the file.  Empty items are removed.
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.read_tdms
+
+    Link:
+        None
+
+    """
+    meta_group = tdms_file['Meta Data']
+    meta_data = {}
+    for item_name, item_value in zip(meta_group['Item'][:], meta_group['Value'][:]):
+        if item_name != '':
+            meta_data[item_name] = item_value
+
+    return meta_data
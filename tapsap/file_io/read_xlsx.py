@@ -1,21 +1,31 @@
 # read_xlsx
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
-from tapsap.structures import Experiment, Transient
+from tapsap.structures import Experiment, Transient, PulseMatrix
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
 from tapsap.utils import filter_xl
 
 
-def read_xlsx(file_name: str) -> Experiment:
+def read_xlsx(file_name: str, species: list = None, pulse_range: list = None, block_size: int = 1024) -> Experiment:
     """
 
     A function for reading an excel file to a tapsap Experiment object.
-    
+    The workbook is opened in read-only mode, such that the rows of each sheet are streamed rather than parsed into data frames.
+    Only the sheets of the requested species are read and the flux cells of the requested pulses are placed directly into the pulse matrix.
+
     Args:
-        file_name (str): The path to the TDMS file that is to be read.
+        file_name (str): The path to the excel file that is to be read.
+
+        species (str list, optional): The names of the gas species to read, e.g., ['AMU_40_1'].  If None, then all species are read.
+
+        pulse_range (ints list, optional): The start and end (exclusive) of the pulses to read.  If None, then all pulses are read.
+
+        block_size (int): The number of samples the pulse matrix grows by when the size of a sheet is not stored in the file.
 
     Returns:
-        experiment (Experiment): A object containing all of the TDMS information.
+        experiment (Experiment): A object containing all of the excel information.
 
     Citation:
         None
@@ -24,53 +34,100 @@ def read_xlsx(file_name: str) -> Experiment:
         M. Ross Kunz
 
     See also:
+        tapsap.file_io.write_xlsx
+
         tapsap.file_io.Experiment
 
     Link:
-        None
+        https://openpyxl.readthedocs.io/en/stable/optimized.html
 
     """
     new_experiment = Experiment()
-    # reading in the data
-    data = pd.ExcelFile(file_name)
-    all_sheets = data.sheet_names
-    gas_sheets = all_sheets[3:]
-    # setting the experiment object
-    df = data.parse('experiment')
-    df_keys = df['Key']
-    for i, key in enumerate(df_keys):
-        setattr(new_experiment, str(key), filter_xl(df['Value'][i]))
-
-    # setting the reactor object
-    df = data.parse('reactor')
-    df_keys = df['Key']
-    for i, key in enumerate(df_keys):
-        setattr(new_experiment.reactor, key, filter_xl(df['Value'][i]))
-
-
-    # setting all of the gas information
-    for gas in gas_sheets:
-        df = data.parse(gas)
-        new_transient = Transient()
-        # TODO this could be enhanced
-        new_transient.name = (df['Value'])[0]
-        new_transient.mass = float((df['Value'])[1])
-        new_transient.gain = float((df['Value'])[2])
-        new_transient.delay_time = float((df['Value'])[3])
-        times = (df['Time'])[1:]
-        pulse_ids = (df.keys())[3:]
-        temperature_values = df.iloc[0, 3:]
-        flux = df.iloc[1:, 3:]
-        new_transient.flux = flux
-        init_moments = {
-            'pulse_number': pulse_ids,
-            'temperature': temperature_values
-        }
-        new_transient.df_moments = pd.DataFrame.from_dict(init_moments)
-        new_transient.times = times
-        new_transient.reactor = new_experiment.reactor
-        new_transient.integration_times = [0, max(times)]
-        new_transient.num_pulse = flux.shape[1]
-        new_experiment.species_data[new_transient.name] = new_transient
+    workbook = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        # setting the experiment object
+        for key, value in _key_values(workbook['experiment']):
+            setattr(new_experiment, str(key), value)
+
+        # setting the reactor object
+        for key, value in _key_values(workbook['reactor']):
+            setattr(new_experiment.reactor, key, value)
+
+        # the gas species sheets have the key, value and time columns followed by the pulses, other sheets (e.g., simulation) are skipped
+        gas_sheets = [i for i in workbook.sheetnames if (i not in ['experiment', 'reactor', 'simulation']) and _is_gas_sheet(workbook[i])]
+        if species is not None:
+            gas_sheets = [i for i in gas_sheets if i in species]
+
+        for gas in gas_sheets:
+            new_transient = _read_gas_sheet(workbook[gas], pulse_range, block_size)
+            new_transient.reactor = new_experiment.reactor
+            new_experiment.species_data[new_transient.name] = new_transient
+    finally:
+        workbook.close()
 
     return new_experiment
+
+
+def _is_gas_sheet(sheet) -> bool:
+    header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+    return tuple(header[:3]) == ('Key', 'Value', 'Time')
+
+
+def _key_values(sheet) -> list:
+    # the key and value columns below the header
+    result = []
+    for row in sheet.iter_rows(min_row=2, max_col=2, values_only=True):
+        if row[0] is not None:
+            result.append((row[0], None if row[1] is None else filter_xl(str(row[1]))))
+
+    return result
+
+
+def _read_gas_sheet(sheet, pulse_range: list, block_size: int) -> Transient:
+    # the header holds the pulse ids, the first row the temperature and the remaining rows the time and flux of each sample
+    header = next(sheet.iter_rows(max_row=1, values_only=True))
+    pulse_ids = list(header[3:])
+    pulse_start, pulse_end = (0, len(pulse_ids)) if pulse_range is None else pulse_range[:2]
+    pulse_ids = pulse_ids[pulse_start:pulse_end]
+    column_range = slice(3 + pulse_start, 3 + pulse_start + len(pulse_ids))
+    # the cells after the last requested pulse are not read
+    rows = sheet.iter_rows(min_row=2, max_col=column_range.stop, values_only=True)
+
+    gas_info = []
+    temperature_values = None
+    times = []
+    num_samples = 0
+    flux = np.empty((len(pulse_ids), block_size if sheet.max_row is None else max(sheet.max_row - 2, 1)))
+    for row in rows:
+        if len(gas_info) < 4:
+            gas_info.append(row[1])
+
+        if temperature_values is None:
+            temperature_values = np.array(row[column_range], dtype=float)
+            continue
+
+        if num_samples == flux.shape[1]:
+            flux = np.concatenate((flux, np.empty((len(pulse_ids), block_size))), axis=1)
+
+        times.append(row[2])
+        flux[:, num_samples] = np.array(row[column_range], dtype=float)
+        num_samples += 1
+
+    new_transient = Transient()
+    new_transient.name = gas_info[0]
+    new_transient.mass = float(gas_info[1])
+    new_transient.gain = float(gas_info[2])
+    new_transient.delay_time = float(gas_info[3])
+    times = np.array(times, dtype=float)
+    # the samples are labeled from 1 as in the sheet (and read_tdms)
+    new_transient.flux = PulseMatrix(flux[:, :num_samples], pulse_ids, temperature_values, np.arange(1, num_samples + 1))
+    init_moments = {
+        'pulse_number': pulse_ids,
+        'temperature': temperature_values
+    }
+    new_transient.df_moments = pd.DataFrame.from_dict(init_moments)
+    new_transient.times = times
+    new_transient.integration_times = [0, max(times)]
+    new_transient.num_pulse = len(pulse_ids)
+
+    return new_transient
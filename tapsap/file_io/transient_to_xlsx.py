@@ -1,6 +1,7 @@
 # transient_to_xlsx
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
+import numpy as np
 import pandas as pd
 from tapsap import structures
 
@@ -33,9 +34,10 @@ def transient_to_xlsx(species_data: structures.Transient) -> pd.DataFrame:
         'Value': [species_data.name, species_data.mass, species_data.gain, species_data.delay_time] + ['None'] * (len_times - 4),
         'Time': times
     }
-    data_df = species_data.flux
-    data_df.loc[0.5] = species_data.df_moments['temperature'].values
-    data_df = data_df.sort_index().reset_index(drop=True)
+    # the temperature is the first row followed by the flux, the transient is left untouched
+    flux_matrix = species_data.flux_matrix
+    data_values = np.concatenate((np.asarray(species_data.df_moments['temperature'].values, dtype=float)[None, :], flux_matrix.values.T))
+    data_df = pd.DataFrame(data_values, columns=flux_matrix.pulse_ids)
     data_df = pd.concat([pd.DataFrame.from_dict(series_dict), data_df], axis=1)
 
     return data_df
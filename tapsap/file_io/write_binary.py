@@ -0,0 +1,105 @@
+# write_binary
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import json
+import os
+import numpy as np
+from tapsap import structures
+
+
+def write_binary(experiment: structures.Experiment, output_dir: str) -> None:
+    """
+
+    This function writes a TAP Experiment object to a directory of raw binary arrays that may be memory mapped when read.
+    The experiment, reactor and species information (including the reactor of each species) is written to experiment.json.
+    Each species has a directory (numbered in the order of the species data) containing the flux, smoothed flux, times, sample index and the moments as .npy files.
+    Writing and reading the arrays does not require parsing, such that the directory is suited for checkpointing a processed experiment.
+
+    Args:
+        experiment (class Experiment): The Experiment class from tapsap holding all of the kinetic information.
+
+        output_dir (str): The directory in which to save the experiment.  The directory is created if needed.
+
+    Returns:
+        None
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.file_io.read_binary
+
+    Link:
+        https://numpy.org/doc/stable/reference/generated/numpy.lib.format.html
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    experiment_keys = ['file_name', 'collection_time', 'pulse_spacing', 'time_start', 'time_end', 'num_samples_per_pulse', 'species_class']
+    reactor_keys = ['zone_lengths', 'zone_porosity', 'zone_diffusion', 'zone_residence_time', 'reactor_radius', 'catalyst_weight', 'mol_per_pulse']
+    transient_keys = ['name', 'mass', 'gain', 'delay_time', 'smoothing_parameter', 'diffusion', 'amount_pulsed', 'initial_concentration', 'num_pulse', 'integration_times']
+    species_names = list(experiment.species_data.keys())
+    experiment_info = {i: getattr(experiment, i) for i in experiment_keys}
+    experiment_info['file_name'] = str(experiment.file_name)
+    reactor_info = {i: getattr(experiment.reactor, i) for i in reactor_keys}
+
+    all_species_info = []
+    for i, species_name in enumerate(species_names):
+        temp_species = experiment.species_data[species_name]
+        species_dir = os.path.join(output_dir, str(i))
+        os.makedirs(species_dir, exist_ok=True)
+        species_info = {j: getattr(temp_species, j) for j in transient_keys}
+        species_info['key'] = species_name
+        # the reference gas is stored by its key within the species data
+        reference_names = [j for j in species_names if experiment.species_data[j] is temp_species.reference_gas]
+        species_info['reference_gas'] = reference_names[0] if len(reference_names) > 0 else None
+        # the reactor of the species, which may be the reactor of the experiment
+        species_info['reactor'] = {j: getattr(temp_species.reactor, j) for j in reactor_keys}
+        species_info['experiment_reactor'] = temp_species.reactor is experiment.reactor
+
+        np.save(os.path.join(species_dir, 'times.npy'), np.asarray(temp_species.times, dtype=float))
+        for j in ['flux_matrix', 'smoothed_flux_matrix']:
+            temp_matrix = getattr(temp_species, j)
+            species_info[j] = temp_matrix is not None
+            if temp_matrix is not None:
+                np.save(os.path.join(species_dir, j + '.npy'), temp_matrix.values)
+
+        if temp_species.flux_matrix is not None:
+            species_info['pulse_ids'] = temp_species.flux_matrix.pulse_ids.tolist()
+            species_info['temperature'] = None if temp_species.flux_matrix.temperature is None else temp_species.flux_matrix.temperature.tolist()
+            np.save(os.path.join(species_dir, 'index.npy'), temp_species.flux_matrix.index)
+
+        # numeric moments are stored as a single array, any other column is stored as json
+        species_info['df_moments'] = None
+        if temp_species.df_moments is not None:
+            numeric_columns = [j for j in temp_species.df_moments.columns if temp_species.df_moments[j].dtype.kind in 'biuf']
+            species_info['df_moments'] = {
+                'columns': [str(j) for j in temp_species.df_moments.columns],
+                'numeric_columns': [str(j) for j in numeric_columns],
+                'dtypes': [temp_species.df_moments[j].dtype.str for j in numeric_columns],
+                'other_columns': {str(j): temp_species.df_moments[j].tolist() for j in temp_species.df_moments.columns if j not in numeric_columns}
+            }
+            np.save(os.path.join(species_dir, 'df_moments.npy'), np.asarray(temp_species.df_moments[numeric_columns].values, dtype=float).reshape(len(temp_species.df_moments), len(numeric_columns)))
+
+        all_species_info.append(species_info)
+
+    info = {
+        'format_version': 2,
+        'experiment': experiment_info,
+        'reactor': reactor_info,
+        'species': all_species_info
+    }
+    with open(os.path.join(output_dir, 'experiment.json'), 'w') as f:
+        json.dump(info, f, indent=1, default=_json_default)
+
+
+def _json_default(value):
+    # numpy scalars and arrays within the meta data
+    if isinstance(value, np.generic):
+        return value.item()
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    return str(value)
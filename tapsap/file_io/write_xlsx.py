@@ -1,14 +1,17 @@
 # write_xlsx
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
-import pandas as pd
+import numpy as np
+from openpyxl import Workbook
 from tapsap import file_io, structures
 
 
-def write_xlsx(experiment: structures.Experiment, output_file_name: str = 'results.xlsx', data_type: str = 'flux') -> None:
+def write_xlsx(experiment: structures.Experiment, output_file_name: str = 'results.xlsx', data_type: str = 'flux', block_size: int = 256) -> None:
     """
 
     This function converts a TAP Experiment object to an Excel spread sheet.
+    The rows of each sheet are streamed to a write-only workbook, such that no intermediate data frames are created and the species data is left untouched.
+    The sheets have the same layout as tapsap.file_io.transient_to_xlsx and tapsap.file_io.transient_to_xlsx_summary.
 
     Args:
         experiment (class Experiment): The Experiment class from tapsap holding all of the kinetic information.
@@ -17,6 +20,8 @@ def write_xlsx(experiment: structures.Experiment, output_file_name: str = 'resul
 
         output_file_name (str): The path in which you would like to save the excel document.
 
+        block_size (int): The number of samples read from the flux at once when writing the flux sheets.
+
     Returns:
         None
 
@@ -26,24 +31,77 @@ def write_xlsx(experiment: structures.Experiment, output_file_name: str = 'resul
     Implementor:
         M. Ross Kunz
 
+    See also:
+        tapsap.file_io.read_xlsx
+
+    Link:
+        https://openpyxl.readthedocs.io/en/stable/optimized.html
     """
     if data_type not in ['flux', 'summary']:
         raise ValueError(
             "data_type must be either flux or summary")
-    experiment_df = file_io.experiment_to_df(experiment)
-    reactor_df = file_io.reactor_to_df(experiment.reactor)
-
-    with pd.ExcelWriter(output_file_name) as writer:
-        experiment_df.to_excel(writer, sheet_name='experiment', index=False)
-        reactor_df.to_excel(writer, sheet_name='reactor', index=False)
-        for i in experiment.species_data.keys():
-            temp_species = experiment.species_data[i]
-            if data_type == 'summary':
-                species_data_df = file_io.transient_to_xlsx_summary(
-                    temp_species, excel_format=True)
-            else:
-                species_data_df = file_io.transient_to_xlsx(
-                    temp_species)
-
-            species_data_df.to_excel(
-                writer, sheet_name=temp_species.name, index=False)
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, temp_df in [('experiment', file_io.experiment_to_df(experiment)), ('reactor', file_io.reactor_to_df(experiment.reactor))]:
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(list(temp_df.columns))
+        for row in temp_df.itertuples(index=False):
+            sheet.append(list(row))
+
+    for i in experiment.species_data.keys():
+        temp_species = experiment.species_data[i]
+        sheet = workbook.create_sheet(temp_species.name)
+        if data_type == 'summary':
+            temp_rows = _summary_rows(temp_species)
+        else:
+            temp_rows = _flux_rows(temp_species, block_size)
+
+        for row in temp_rows:
+            sheet.append(row)
+
+    workbook.save(output_file_name)
+
+
+def _gas_info(species_data: structures.Transient, num_rows: int) -> list:
+    # the key and value columns of a species sheet
+    keys = ['name', 'amu', 'gain', 'delay_time'] + ['None'] * (num_rows - 4)
+    values = [species_data.name, species_data.mass, species_data.gain, species_data.delay_time] + ['None'] * (num_rows - 4)
+    return [[keys[i], _to_cell(values[i])] for i in range(num_rows)]
+
+
+def _flux_rows(species_data: structures.Transient, block_size: int):
+    # the header, the temperature row and then one row per sample
+    flux_matrix = species_data.flux_matrix
+    num_samples = flux_matrix.num_samples
+    gas_info = _gas_info(species_data, num_samples + 1)
+    yield ['Key', 'Value', 'Time'] + [_to_cell(i) for i in flux_matrix.pulse_ids]
+    yield gas_info[0] + [0] + _to_cells(np.asarray(species_data.df_moments['temperature'].values, dtype=float))
+    for i in range(0, num_samples, block_size):
+        temp_block = np.array(flux_matrix.values[:, i:(i + block_size)].T)
+        for j in range(temp_block.shape[0]):
+            yield gas_info[i + j + 1] + [_to_cell(species_data.times[i + j])] + _to_cells(temp_block[j])
+
+
+def _summary_rows(species_data: structures.Transient):
+    # the header and then one row per pulse
+    df_moments = species_data.df_moments
+    gas_info = _gas_info(species_data, species_data.num_pulse)
+    yield ['Key', 'Value'] + [str(i) for i in df_moments.columns]
+    for i, row in enumerate(df_moments.itertuples(index=False)):
+        yield gas_info[i] + [_to_cell(j) for j in row]
+
+
+def _to_cells(values: np.ndarray) -> list:
+    # missing values are written as empty cells
+    values = values.tolist()
+    return [None if i != i else i for i in values]
+
+
+def _to_cell(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, float) and (value != value):
+        return None
+
+    return value
@@ -1,4 +1,5 @@
 from .moments import moments
+from .moments_batch import moments_batch
 from .rtd_parameters import rtd_parameters
 from .reactivities_product import reactivities_product
 from .reactivities_reactant import reactivities_reactant
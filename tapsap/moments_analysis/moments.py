@@ -2,7 +2,7 @@
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
 
-from tapsap import utils
+from tapsap import utils, moments_analysis
 import numpy as np
 import pandas as pd
 
@@ -34,6 +34,8 @@ def moments(flux: np.ndarray, times: np.ndarray, integration_time_range: list =
     See also:
         tapsap.utils.trapz
 
+        tapsap.moments_analysis.moments_batch
+
     Link:
         https://doi.org/10.1016/S0926-860X(97)00124-5
 
@@ -54,25 +56,7 @@ def moments(flux: np.ndarray, times: np.ndarray, integration_time_range: list =
     index_range = np.arange(integration_index_start, integration_index_end)
 
     if isinstance(flux, pd.DataFrame):
-        num_pulse = flux.shape[1]        
-        M0 = np.zeros(num_pulse)
-        M1 = np.zeros(num_pulse)
-        M2 = np.zeros(num_pulse)
-        for i in range(num_pulse):
-            if integration_time_range is None:
-                temp_times = utils.find_integration_time(flux.iloc[:,i], times)
-                temp_integration_index_start = abs(times - temp_times[0]).argmin()
-                temp_integration_index_end = abs(times - temp_times[1]).argmin()
-                index_len = temp_integration_index_end - temp_integration_index_start
-                index_range = np.arange(temp_integration_index_start, temp_integration_index_end)
-
-            sub_flux = flux.iloc[index_range, :].copy(deep=True)
-            sub_times = times[np.arange(0, index_len)]
-
-            M0[i] = utils.trapz(sub_flux.iloc[:,i].values * sub_times**0, sub_times)
-            M1[i] = utils.trapz(sub_flux.iloc[:,i].values * sub_times**1, sub_times)
-            M2[i] = utils.trapz(sub_flux.iloc[:,i].values * sub_times**2, sub_times)
-
+        result = moments_analysis.moments_batch(np.asarray(flux.values, dtype=float).T, times, integration_time_range)
     else:
         sub_flux = flux[index_range]
         sub_times = times[np.arange(0, index_len)]
@@ -85,10 +69,10 @@ def moments(flux: np.ndarray, times: np.ndarray, integration_time_range: list =
         M1 = utils.trapz(flux_M1, sub_times)
         M2 = utils.trapz(flux_M2, sub_times)
 
-    result = {
-        'M0':M0,
-        'M1':M1,
-        'M2':M2
-    }
+        result = {
+            'M0':M0,
+            'M1':M1,
+            'M2':M2
+        }
 
     return result
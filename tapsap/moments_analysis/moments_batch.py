@@ -0,0 +1,103 @@
+# moments_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+
+from tapsap import utils
+import numpy as np
+
+
+def moments_batch(flux: np.ndarray, times: np.ndarray, integration_time_range: list = None, max_moment: int = 2, chunk_size: int = 256) -> dict:
+    """
+
+    Calculation of the moments of every pulse at once using the trapezoidal rule.
+    The trapezoid weights multiplied by the powers of time are built once and the moments of all pulses are found by a single matrix product.
+    If the integration time range is None, then each pulse has its own integration window (see tapsap.utils.find_integration_time) which is applied as a mask.
+    The results are identical to tapsap.moments_analysis.moments applied to each pulse.
+
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        integration_time_range (ints list, optional): A list contianing the start and end time to integrate the flux. If None, then found for each pulse.
+
+        max_moment (int): The highest moment to calculate, i.e., 2 returns M0, M1 and M2.
+
+        chunk_size (int): The number of pulses masked at once when each pulse has its own integration window.
+
+    Returns:
+        moments (dict): The moments of each pulse
+
+    Citation:
+        Gleaves et al, "TAP-2: An interrogative kinetics approach"
+
+        Constales et al, "Multi-zone TAP-reactors theory and application: I. The global transfer matrix equation"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.moments_analysis.moments
+
+        tapsap.utils.find_integration_time
+
+    Link:
+        https://doi.org/10.1016/S0926-860X(97)00124-5
+
+        https://doi.org/10.1016/S0009-2509(00)00216-5
+    """
+    flux = np.asarray(flux, dtype=float)
+    if flux.ndim == 1:
+        flux = flux.reshape(1, -1)
+
+    times = np.asarray(times, dtype=float)
+    num_pulse, num_samples = flux.shape
+    powers = np.arange(max_moment + 1)
+
+    if integration_time_range is not None:
+        integration_time_range = sorted(integration_time_range)
+        integration_index_start = abs(times - integration_time_range[0]).argmin()
+        integration_index_end = abs(times - integration_time_range[1]).argmin()
+        index_start = np.full(num_pulse, integration_index_start)
+        index_len = np.full(num_pulse, integration_index_end - integration_index_start)
+    else:
+        index_start = np.zeros(num_pulse, dtype=int)
+        index_len = np.zeros(num_pulse, dtype=int)
+        for i in range(num_pulse):
+            temp_times = utils.find_integration_time(flux[i], times)
+            index_start[i] = abs(times - temp_times[0]).argmin()
+            index_len[i] = abs(times - temp_times[1]).argmin() - index_start[i]
+
+    all_moments = np.zeros((num_pulse, len(powers)))
+    if (index_start == index_start[0]).all() and (index_len == index_len[0]).all():
+        # a single integration window, so the weights are shared by every pulse
+        weights = _moment_weights(times, index_start[:1], index_len[:1], powers)[0]
+        all_moments = flux @ weights.T
+    else:
+        for i in range(0, num_pulse, chunk_size):
+            temp_range = slice(i, min(i + chunk_size, num_pulse))
+            weights = _moment_weights(times, index_start[temp_range], index_len[temp_range], powers)
+            all_moments[temp_range] = np.einsum('pn,pkn->pk', flux[temp_range], weights)
+
+    result = {}
+    for k in powers:
+        result['M' + str(k)] = all_moments[:, k]
+
+    return result
+
+
+def _moment_weights(times: np.ndarray, index_start: np.ndarray, index_len: np.ndarray, powers: np.ndarray) -> np.ndarray:
+    # The flux sample m of a pulse is integrated against times[m - start] (the integration window starts at time zero),
+    # with the trapezoid weight of that position in a window of the given length.  Samples outside the window are masked.
+    num_samples = len(times)
+    window_position = np.arange(num_samples)[None, :] - index_start[:, None]
+    in_window = (window_position >= 0) & (window_position < index_len[:, None])
+    window_position = np.clip(window_position, 0, num_samples - 1)
+    window_end = np.clip(index_len[:, None] - 1, 0, num_samples - 1)
+    upper = np.minimum(window_position + 1, window_end)
+    lower = np.clip(window_position - 1, 0, None)
+    trapz_weights = 0.5 * (times[upper] - times[lower]) * in_window
+    sub_times = times[window_position]
+    weights = trapz_weights[:, None, :] * sub_times[:, None, :]**powers[None, :, None]
+
+    return weights
@@ -1,7 +1,15 @@
 from .baseline_correction import baseline_correction
+from .baseline_correction_batch import baseline_correction_batch
 from .calibration_coef import calibration_coef
 from .baseline_gamma import baseline_gamma
+from .baseline_gamma_batch import baseline_gamma_batch
+from .tap_mix_problem import tap_mix_problem
+from .tap_mix_qp import tap_mix_qp
+from .tap_mix_irls import tap_mix_irls
 from .tap_mix import tap_mix
+from .tap_mix_joint import tap_mix_joint
+from .drift_model import drift_model
 from .smooth_flux_gam import smooth_flux_gam
+from .smooth_flux_gam_batch import smooth_flux_gam_batch
 from .calibration_teak import calibration_teak
 from .tap_mix_opt import tap_mix_opt
\ No newline at end of file
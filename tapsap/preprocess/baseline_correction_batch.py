@@ -0,0 +1,62 @@
+# baseline_correction_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+
+
+def baseline_correction_batch(flux: np.ndarray, times: np.ndarray, baseline_time_range: list = None, baseline_amount: float = None) -> dict:
+    """
+
+    Baseline correction of every flux at once through user input.
+    The user can either provide a list of baseline time ranges ([start, end]), the baseline amount (0.2), or neither where the last 5% of each flux will be taken as the baseline.
+    The baseline of each pulse is the mean of its row within the baseline range.
+    The results are identical to tapsap.preprocess.baseline_correction applied to each flux.
+
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        baseline_time_range (float list): The points in time in which to take the baseline.
+
+        baseline_amount (float): The amount of baseline correction to apply.
+
+    Returns:
+        corrected_flux, baseline_amount (dict): The baseline corrected flux and the baseline amount of each pulse.
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.baseline_correction
+
+    Link:
+        None
+    """
+    flux = np.asarray(flux, dtype=float)
+    if flux.ndim == 1:
+        flux = flux.reshape(1, -1)
+
+    if baseline_amount is None:
+        if baseline_time_range is not None:
+            baseline_time_range = sorted(baseline_time_range)
+            baseline_start_index = abs(times - baseline_time_range[0]).argmin()
+            baseline_end_index = abs(times - baseline_time_range[1]).argmin()
+        else:
+            baseline_start_index = int(np.floor(len(times) * 0.95))
+            baseline_end_index = len(times)
+
+        baseline_amount = flux[:, baseline_start_index:baseline_end_index].mean(axis=1)
+    else:
+        baseline_amount = np.full(flux.shape[0], baseline_amount, dtype=float)
+
+    corrected_flux = flux - baseline_amount[:, None]
+    result = {
+        'flux':corrected_flux,
+        'baseline_amount':baseline_amount
+    }
+
+    return result
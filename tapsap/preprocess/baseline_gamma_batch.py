@@ -0,0 +1,61 @@
+# baseline_gamma_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import utils
+
+
+def baseline_gamma_batch(flux: np.ndarray, times: np.ndarray) -> dict:
+    """
+
+    Baseline every flux at once through examining the tail of the gamma distribution.
+    The peak, the minimum after the peak and the mean of the tail are row-wise reductions of the pulse matrix, such that a single gamma PDF evaluation per pulse remains.
+    The results are identical (up to rounding in the mean of the tail) to tapsap.preprocess.baseline_gamma applied to each flux.
+
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+    Returns:
+        corrected_flux, baseline_amount (dict): The baseline corrected flux and the baseline amount of each pulse.
+
+    Citation:
+        Kunz et al, "A Priori Calibration of Transient Kinetics Data via Machine Learning" (In prep)
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.baseline_gamma
+
+        tapsap.utils.gamma_pdf
+
+    Link:
+        https://en.wikipedia.org/wiki/Gamma_distribution
+
+        https://arxiv.org/abs/2109.15042
+    """
+    flux = np.asarray(flux, dtype=float)
+    if flux.ndim == 1:
+        flux = flux.reshape(1, -1)
+
+    num_samples = flux.shape[1]
+    peak_index = flux.argmax(axis=1)
+    # Set the peak location to an arbitrary value of the flux starts with a maximum value in the case of pure noise
+    peak_index[peak_index == 0] = 5
+    peak_residence_time = times[peak_index]
+    after_peak = np.arange(num_samples)[None, :] >= peak_index[:, None]
+    flux_min = np.where(after_peak, flux, np.inf).min(axis=1)
+    tail_position = np.arange(num_samples - 30, num_samples)
+    # the scale of the inert gamma distribution is the peak residence time / (1.5 - 1) (see tapsap.preprocess.baseline_gamma)
+    tail_gamma = utils.gamma_pdf(times[-1], shape=1.5, scale=peak_residence_time * 2)
+    baseline_offset = (flux[:, tail_position].mean(axis=1) - flux_min) - tail_gamma
+    baseline_amount = flux_min - np.sign(flux_min) * abs(baseline_offset)
+    corrected_flux = flux - baseline_amount[:, None]
+    result = {
+        'flux':corrected_flux,
+        'baseline_amount':baseline_amount
+    }
+
+    return result
@@ -5,7 +5,7 @@ from numpy import ndarray
 from tapsap import moments_analysis, preprocess, utils
 
 
-def calibration_teak(flux: ndarray, inert_flux: ndarray, times: ndarray, flux_mass: float, inert_mass: float, huber_loss: bool = False, constraints:bool = True) -> dict:
+def calibration_teak(flux: ndarray, inert_flux: ndarray, times: ndarray, flux_mass: float, inert_mass: float, huber_loss: bool = False, constraints:bool = True, backend:str = 'cvxpy') -> dict:
     """
 
     This function determines the calibration coefficients for the flux based on the inert flux.
@@ -29,6 +29,8 @@ def calibration_teak(flux: ndarray, inert_flux: ndarray, times: ndarray, flux_ma
 
         constraints (bool): Apply the molecule constraints. If false, tap_mix performs regular linear regression.
 
+        backend (str): The tap_mix solver. Options: cvxpy, numpy (tap_mix_irls with the huber loss).
+
     Returns:
         [corrected_flux, calibration_amount] (dict): The calibration corrected flux and the calibration amount. 
 
@@ -60,7 +62,7 @@ def calibration_teak(flux: ndarray, inert_flux: ndarray, times: ndarray, flux_ma
         return result
     else:
         result = preprocess.tap_mix(
-            flux, inert_flux, times, huber_loss, constraints)
+            flux, inert_flux, times, huber_loss, constraints, backend = backend)
         result['calibration_coef'] = result['calibration_coef']
 
     return result
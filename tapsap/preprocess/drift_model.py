@@ -0,0 +1,60 @@
+# drift_model
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from csaps import csaps
+import numpy as np
+
+
+def drift_model(pulse_index: np.ndarray, calibration_coef: np.ndarray, intercept: np.ndarray, num_pulse: int, smooth_amount: float = 0.99) -> dict:
+    """
+
+    A smooth model of the instrument drift across pulses.
+    The calibration coefficient and intercept found for a subsample of pulses (e.g., via tapsap.preprocess.tap_mix against a reference pulse) are each fit by a cubic smoothing spline in the pulse number.
+    The splines are then evaluated at every pulse, such that the drift of all pulses is found from a few optimizations.
+    The pulse number is scaled to the unit interval, so the smoothing parameter does not depend on the number of pulses.
+
+    Args:
+        pulse_index (int ndarray): The pulse number of each fitted pulse.
+
+        calibration_coef (float ndarray): The calibration coefficient of each fitted pulse.
+
+        intercept (float ndarray): The intercept of each fitted pulse.
+
+        num_pulse (int): The total number of pulses.
+
+        smooth_amount (float): The smoothing parameter of the cubic smoothing spline, where 0 is a straight line and 1 interpolates the fitted pulses.
+
+    Returns:
+        calibration_coef, intercept (dict): The calibration coefficient and the intercept of every pulse.
+
+    Citation:
+        Hastie et al. "Generalized additive models"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.structures.Transient.calibrate_flux
+
+        tapsap.structures.Transient.drift_error
+
+    Link:
+        https://doi.org/10.1214/ss/1177013604
+    """
+    pulse_index = np.asarray(pulse_index, dtype=float)
+    fitted_values = np.vstack([calibration_coef, intercept]).astype(float)
+    order = np.argsort(pulse_index)
+    pulse_index = pulse_index[order]
+    fitted_values = fitted_values[:, order]
+    scale = max(num_pulse - 1, 1)
+    if len(pulse_index) == 1:
+        drift_values = np.repeat(fitted_values, num_pulse, axis=1)
+    else:
+        drift_values = np.array(csaps(pulse_index / scale, fitted_values, np.arange(num_pulse) / scale, smooth = smooth_amount), dtype=float).reshape(2, num_pulse)
+
+    result = {
+        'calibration_coef': drift_values[0],
+        'intercept': drift_values[1]
+    }
+
+    return result
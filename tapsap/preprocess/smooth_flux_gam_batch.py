@@ -0,0 +1,57 @@
+# smooth_flux_gam_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from csaps import csaps
+import numpy as np
+
+
+def smooth_flux_gam_batch(flux: np.ndarray, smooth_amount = 1e-4) -> np.ndarray:
+    """
+
+    Smoothing via a Generalized Additive Model applied to every flux at once.
+    All of the flux share the same sample grid, so a single cubic smoothing spline solve smooths every pulse.
+    The pre-peak correction is applied to all pulses together.
+    The results are identical to tapsap.preprocess.smooth_flux_gam applied to each flux.
+
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        smooth_amount (float): The smoothing parameter of the cubic smoothing spline.
+
+    Returns:
+        smoothed_flux (float ndarray): The smoothed outlet flux of each pulse.
+
+    Citation:
+        Hastie et al. "Generalized additive models"
+
+        Kunz et al, "A Priori Calibration of Transient Kinetics Data via Machine Learning" (In prep)
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.smooth_flux_gam
+
+    Link:
+        https://doi.org/10.1214/ss/1177013604
+
+        https://arxiv.org/abs/2109.15042
+    """
+    flux = np.asarray(flux, dtype=float)
+    if flux.ndim == 1:
+        flux = flux.reshape(1, -1)
+
+    temp_index = np.arange(0, flux.shape[1])
+    smoothed_flux = np.array(csaps(temp_index, flux, temp_index, smooth = smooth_amount), dtype=float).reshape(flux.shape)
+    # smoothed values prior to the peak that fall below the minimum flux are replaced by the median of the neighboring values
+    peak_pos = np.argmax(flux, axis=1)
+    less_than_zero = (smoothed_flux < flux.min(axis=1)[:, None]) & (temp_index[None, :] < peak_pos[:, None])
+    # columns are corrected in order as each correction uses the previously corrected value
+    for i in np.where(less_than_zero.any(axis=0))[0]:
+        temp_rows = less_than_zero[:, i]
+        if i == 0:
+            smoothed_flux[temp_rows, i] = np.median(smoothed_flux[temp_rows, i:(i + 3)], axis=1)
+        else:
+            smoothed_flux[temp_rows, i] = np.median(smoothed_flux[temp_rows, (i - 1):(i + 2)], axis=1)
+
+    return smoothed_flux
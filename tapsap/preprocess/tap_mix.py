@@ -8,13 +8,14 @@ import copy
 from tapsap import preprocess, utils
 
 
-def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool = False, constraints: bool = True, fit_intercept:bool = True, enforce_max:bool = False) -> dict:
+def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool = False, constraints: bool = True, fit_intercept:bool = True, enforce_max:bool = False, backend:str = 'cvxpy') -> dict:
     """
 
     Optimization of the calibration coefficient or fragmentation.
     This method is a convex optimization fitting the response (y) to a single or set of flux.
     For example, given an inert and reactant, then y (of length n) would be the inert and X would be a matrix of a single flux with a shape of n by 1.
     This can also be used to extract fragmentation patterns from a single mass measurement.
+    With the square error loss, the problem is reduced to the sufficient statistics of the loss and the residual floor is only applied to the samples found by constraint generation, such that the solve time does not grow with the number of samples.
     
     Args:
         X (float ndarray): A set of flux responses used in describing y.
@@ -31,6 +32,8 @@ def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool =
 
         enforce_max (bool): Enforce the maximum of the X values must be less than y.
 
+        backend (str): The solver used for the optimization. Options: cvxpy (CLARABEL with the sufficient statistics of the square error loss, otherwise ECOS), numpy (tap_mix_qp or tap_mix_irls with the huber loss, for up to two coefficients).  The numpy backend falls back to cvxpy when the problem is not supported.
+
     Returns:
         corrected_flux, calibration_amount (dict): The calibration corrected flux and the calibration amount. 
 
@@ -40,10 +43,21 @@ def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool =
     Implementor:
         M. Ross Kunz
 
+    See also:
+        tapsap.preprocess.tap_mix_problem
+
+        tapsap.preprocess.tap_mix_qp
+
+        tapsap.preprocess.tap_mix_irls
+
     Link:
         https://arxiv.org/abs/2109.15042
     """
-    
+    if backend not in ['cvxpy', 'numpy']:
+        raise ValueError(
+            "backend must be either cvxpy or numpy")
+
+
     if len(X.shape) == 1:
         flux_ci = np.median(X) + 6 * utils.mad(X)
         flux_max = np.max(X)
@@ -67,6 +81,7 @@ def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool =
         X = np.concatenate((intercept.T, X), axis = 1)
 
     p = X.shape[1]
+    y = np.asarray(y, dtype=float)
     orig_y = y
     orig_X = copy.deepcopy(X)
 
@@ -75,56 +90,39 @@ def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool =
     m0_X = [max(i) / max(y) for i in X.transpose()]
     m0_X = np.array([m0_X])
 
-    warnings.filterwarnings("ignore", category=DeprecationWarning)
-    beta_hat = cp.Variable(p)
-    resids = y - X @ beta_hat
-    if huber_loss:
-        objective = cp.Minimize(cp.sum(cp.huber(resids, M=1e-5)))
-    else:
-        objective = cp.Minimize(cp.sum_squares(resids))  # resids
-
-    if fit_intercept:
-        if enforce_max:
-            temp_constraints = [
-                beta_hat[1:p] >= 0,
-                np.sum(m0_X * beta_hat) <= 1,
-                cp.sum(resids) * (times[1] - times[0]) >= 1e-5,
-                resids >= (orig_y.min() * 2)
-            ]
+    fit_coefs = None
+    if backend == 'numpy':
+        if huber_loss:
+            fit_coefs = preprocess.tap_mix_irls(X, y, times, constraints, fit_intercept, enforce_max)
         else:
-            temp_constraints = [
-                beta_hat[1:p] >= 0,
-                cp.sum(resids) * (times[1] - times[0]) >= 1e-5,
-                resids >= (orig_y.min() * 2)
-            ]
-    else:
-        if enforce_max:
-            temp_constraints = [
-                beta_hat >= 0,
-                np.sum(m0_X * beta_hat) <= 1,
-                cp.sum(resids) * (times[1] - times[0]) >= 1e-5,
-                resids >= (orig_y.min() * 2)
-            ]
-        else:
-            temp_constraints = [
-                beta_hat >= 0,
-                cp.sum(resids) * (times[1] - times[0]) >= 1e-5,
-                resids >= (orig_y.min() * 2)
-            ]
-        
-    if constraints:
+            fit_coefs = preprocess.tap_mix_qp(X, y, times, constraints, fit_intercept, enforce_max)
+
+        if np.isnan(fit_coefs).any():
+            fit_coefs = None
+
+    if (fit_coefs is None) and (not huber_loss):
+        fit_coefs = _solve_reduced(X, y, times, m0_X.flatten(), constraints, fit_intercept, enforce_max)
+
+    if fit_coefs is None:
+        # the problem is compiled once per problem size and options, only the data changes between pulses
         warnings.filterwarnings("ignore", category=DeprecationWarning)
-        prob = cp.Problem(objective, temp_constraints)
-    else:
+        problem_data = preprocess.tap_mix_problem(n, p, huber_loss, constraints, fit_intercept, enforce_max)
+        beta_hat = problem_data['beta_hat']
+        problem_data['X'].value = X
+        problem_data['y'].value = y
+        problem_data['area_X'].value = X.sum(axis = 0) * (times[1] - times[0])
+        problem_data['area_y'].value = y.sum() * (times[1] - times[0])
+        problem_data['m0_X'].value = m0_X.flatten()
+        problem_data['resid_floor'].value = orig_y.min() * 2
+        prob = problem_data['problem']
+
+        warnings.filterwarnings("ignore", category=UserWarning)
         warnings.filterwarnings("ignore", category=DeprecationWarning)
-        prob = cp.Problem(objective)
+        prob.solve(solver=cp.ECOS)
 
-    warnings.filterwarnings("ignore", category=UserWarning)
-    warnings.filterwarnings("ignore", category=DeprecationWarning)
-    prob.solve(solver=cp.ECOS)
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        fit_coefs = beta_hat.value
 
-    warnings.filterwarnings("ignore", category=DeprecationWarning)
-    fit_coefs = beta_hat.value
     fit_list = [float(i) for i in fit_coefs]
     fitted_values = orig_X @ fit_coefs
     #fit_rmse = utils.rmse(y, fitted_values)
@@ -153,3 +151,57 @@ def tap_mix(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool =
     #         result = opt_result
 
     return result
+
+
+def _solve_reduced(X: np.ndarray, y: np.ndarray, times: np.ndarray, m0_X: np.ndarray, constraints: bool, fit_intercept: bool, enforce_max: bool, max_iter: int = 20) -> np.ndarray:
+    # the square error loss only depends on X'X, X'y and y'y (through X = QR and Q'y), and the residual floor is applied to a growing set of samples until no other sample violates it
+    n, p = X.shape
+    Q, R = np.linalg.qr(X)
+    Qy = Q.T @ y
+    resid_floor = y.min() * 2
+    tol = 1e-8 * max(1, np.abs(y).max())
+    # the samples with the smallest y are the first candidates for the residual floor
+    active = list(np.argsort(y)[:8])
+    num_active = 8
+    for _ in range(max_iter):
+        while len(active) > num_active:
+            num_active *= 2
+
+        # the selected samples are repeated to fill the problem size
+        rows = np.resize(np.array(active), num_active)
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        problem_data = preprocess.tap_mix_problem(num_active, p, False, constraints, fit_intercept, enforce_max, True)
+        problem_data['X'].value = X[rows]
+        problem_data['y'].value = y[rows]
+        problem_data['R'].value = R
+        problem_data['Qy'].value = Qy
+        problem_data['area_X'].value = X.sum(axis = 0) * (times[1] - times[0])
+        problem_data['area_y'].value = y.sum() * (times[1] - times[0])
+        problem_data['m0_X'].value = m0_X
+        problem_data['resid_floor'].value = resid_floor
+        prob = problem_data['problem']
+
+        warnings.filterwarnings("ignore", category=UserWarning)
+        warnings.filterwarnings("ignore", category=DeprecationWarning)
+        # the reduced problem is small, so tight tolerances only cost a few iterations
+        try:
+            prob.solve(solver=cp.CLARABEL, tol_gap_abs=1e-10, tol_gap_rel=1e-10, tol_feas=1e-10)
+        except cp.SolverError:
+            return None
+
+        fit_coefs = problem_data['beta_hat'].value
+        if (prob.status != 'optimal') or (fit_coefs is None):
+            return None
+
+        if not constraints:
+            return fit_coefs
+
+        resids = y - X @ fit_coefs
+        violated = np.setdiff1d(np.where(resids < resid_floor - tol)[0], active)
+        if len(violated) == 0:
+            return fit_coefs
+
+        # the most violated samples are added, at most doubling the selected samples
+        active = active + list(violated[np.argsort(resids[violated])][:len(active)])
+
+    return None
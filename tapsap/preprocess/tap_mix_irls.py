@@ -0,0 +1,115 @@
+# tap_mix_irls
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import preprocess
+
+
+def tap_mix_irls(X: np.ndarray, y: np.ndarray, times: np.ndarray, constraints: bool = True, fit_intercept: bool = True, enforce_max: bool = False, M: float = 1e-5, max_iter: int = 200, tol: float = 1e-10) -> np.ndarray:
+    """
+
+    A NumPy solver for the tap_mix calibration problem with the huber loss, i.e., the sum of r^2 if |r| <= M and 2M|r| - M^2 otherwise (as cp.huber).
+    Each iteration solves two constrained weighted least squares problems via tapsap.preprocess.tap_mix_qp, such that the constraints are handled exactly:
+    the iteratively reweighted least squares step (weights of min(1, M / |r|)), which never increases the loss,
+    and the Newton step, i.e., the minimizer of the loss given which residuals are within M (at least p residuals) and the sign of the remaining residuals, with a backtracking search.
+    The step with the smaller loss is kept.
+    The loss is piecewise quadratic, so once the Newton step does not change which residuals are within M or their signs, it is the optimum.
+    The coefficients match cvxpy (cp.huber) to the tolerance of the convex solver, i.e., within about 1e-6 of ECOS (the cvxpy backend of tap_mix) and 1e-8 of CLARABEL with tolerances of 1e-12 for flux with a maximum of about one.
+    The leading axis may be used for batching, i.e., X with a shape of (num_pulse, n, p) and y with a shape of (num_pulse, n).
+
+    Args:
+        X (float ndarray): The design matrix with a shape of (n, p), including the intercept column if fit_intercept.
+
+        y (float ndarray): The flux that contains all of X.
+
+        times (float ndarray): An array of time.
+
+        constraints (bool): Apply the molecule constraints. If false, tap_mix_irls performs robust linear regression.
+
+        fit_intercept (bool): The first column of X is the intercept and is not constrained to be non-negative.
+
+        enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+        M (float): The threshold of the huber loss.
+
+        max_iter (int): The maximum number of iterations.
+
+        tol (float): The relative change of the coefficients in which the iterations stop if the Newton step has not converged.
+
+    Returns:
+        coefs (float ndarray): The fitted coefficients with a shape of (p,) or (num_pulse, p).  The coefficients are NaN if the problem is not supported (p > 2) or could not be solved.
+
+    Citation:
+        Holland and Welsch, "Robust regression using iteratively reweighted least-squares"
+
+        Kunz et al, "A Priori Calibration of Transient Kinetics Data via Machine Learning" (In prep)
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.tap_mix
+
+        tapsap.preprocess.tap_mix_qp
+
+    Link:
+        https://doi.org/10.1080/03610927708827533
+
+        https://arxiv.org/abs/2109.15042
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        coefs = tap_mix_irls(X[None, :, :], y[None, :], times, constraints, fit_intercept, enforce_max, M, max_iter, tol)
+        return coefs[0]
+
+    num_pulse, n, p = X.shape
+    # the square error loss is the initial fit
+    coefs = preprocess.tap_mix_qp(X, y, times, constraints, fit_intercept, enforce_max)
+    active = np.where(~np.isnan(coefs).any(axis=1))[0]
+    for _ in range(max_iter):
+        if len(active) == 0:
+            break
+
+        temp_X = X[active]
+        temp_y = y[active]
+        temp_coefs = coefs[active]
+        resids = temp_y - np.einsum('bni,bi->bn', temp_X, temp_coefs)
+        abs_resids = np.abs(resids)
+        irls_coefs = preprocess.tap_mix_qp(temp_X, temp_y, times, constraints, fit_intercept, enforce_max, np.minimum(1, M / np.maximum(abs_resids, M)))
+        # the quadratic residuals are within M and include the p smallest residuals
+        quadratic = (abs_resids <= M) | (abs_resids <= np.sort(abs_resids, axis=1)[:, [min(p, n) - 1]])
+        signs = np.where(quadratic, 0, np.sign(resids))
+        newton_coefs = preprocess.tap_mix_qp(temp_X, temp_y, times, constraints, fit_intercept, enforce_max, quadratic.astype(float), linear = M * np.einsum('bni,bn->bi', temp_X, signs))
+
+        irls_loss = _huber_loss(temp_X, temp_y, irls_coefs, M)
+        # a backtracking search along the Newton step, where every step is feasible as the constraints are convex
+        newton_loss = np.full(len(active), np.inf)
+        step_coefs = newton_coefs.copy()
+        for step in 0.5**np.arange(20):
+            temp_step = temp_coefs + step * (newton_coefs - temp_coefs)
+            temp_loss = _huber_loss(temp_X, temp_y, temp_step, M)
+            better = temp_loss < newton_loss
+            newton_loss[better] = temp_loss[better]
+            step_coefs[better] = temp_step[better]
+
+        use_newton = newton_loss <= irls_loss
+        new_coefs = np.where(use_newton[:, None], step_coefs, irls_coefs)
+        # the Newton step is the optimum when it has the same quadratic residuals and signs that it was found with
+        newton_resids = temp_y - np.einsum('bni,bi->bn', temp_X, newton_coefs)
+        abs_newton_resids = np.abs(newton_resids)
+        consistent = np.where(quadratic, abs_newton_resids <= M * (1 + 1e-6), (np.sign(newton_resids) == signs) & (abs_newton_resids >= M * (1 - 1e-6)))
+        newton_done = use_newton & consistent.all(axis=1) & (step_coefs == newton_coefs).all(axis=1)
+        change_done = (np.abs(new_coefs - temp_coefs).max(axis=1) <= tol * (1 + np.abs(temp_coefs).max(axis=1)))
+        failed = np.isnan(new_coefs).any(axis=1)
+        coefs[active] = np.where(failed[:, None], temp_coefs, new_coefs)
+        active = active[~(newton_done | change_done | failed)]
+
+    return coefs
+
+
+def _huber_loss(X: np.ndarray, y: np.ndarray, coefs: np.ndarray, M: float) -> np.ndarray:
+    # the huber loss of each pulse (infinite if the coefficients were not found)
+    abs_resids = np.abs(y - np.einsum('bni,bi->bn', X, coefs))
+    loss = np.where(abs_resids <= M, abs_resids**2, 2 * M * abs_resids - M**2).sum(axis=1)
+    return np.where(np.isnan(loss), np.inf, loss)
@@ -0,0 +1,187 @@
+# tap_mix_joint
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+import cvxpy as cp
+import scipy.sparse as sp
+import warnings
+from tapsap import preprocess
+
+
+def tap_mix_joint(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool = False, constraints: bool = True, fit_intercept: bool = True, enforce_max: bool = False, backend: str = 'cvxpy') -> dict:
+    """
+
+    Optimization of the calibration coefficient of many flux in a single problem, e.g., every gas species of a set of pulses.
+    Each row of X is calibrated against the same row of y as in tapsap.preprocess.tap_mix with a single flux, i.e., a coefficient and an intercept per row.
+    The rows do not share coefficients, so the problem is block-structured: the design matrix is a sparse block diagonal matrix and the constraints of each block only involve its own coefficients.
+    The result of each row is the same as solving the rows separately (up to the solver tolerance), while every row is solved in a single problem.
+    With the square error loss, the residual floor of each row is only applied to the samples that need it, found over a few solves (as tapsap.preprocess.tap_mix).
+    A flux that is only noise (its maximum is less than the median plus 6 times the median absolute deviation) is not calibrated, as in tapsap.preprocess.tap_mix.
+
+    Args:
+        X (float ndarray): The flux to calibrate with a shape of (num_block, n).
+
+        y (float ndarray): The flux that contains each row of X with a shape of (num_block, n), e.g., the inert flux shifted to the mass of each species.
+
+        times (float ndarray): An array of time.
+
+        huber_loss (bool): Use a robust loss function rather than the standard square error loss.
+
+        constraints (bool): Apply the molecule constraints. If false, tap_mix_joint performs regular linear regression.
+
+        fit_intercept (bool): Fit the intercept within the convex optimization.
+
+        enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+        backend (str): The solver used for the optimization. Options: cvxpy (CLARABEL), numpy (tap_mix_qp or tap_mix_irls with the huber loss, batched over the rows).  The numpy backend falls back to cvxpy for the rows that are not solved.
+
+    Returns:
+        corrected_flux, calibration_amount (dict): The calibration corrected flux, the intercept and the calibration coefficient of each row.
+
+    Citation:
+        Kunz et al, "A Priori Calibration of Transient Kinetics Data via Machine Learning" (In prep)
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.tap_mix
+
+        tapsap.preprocess.tap_mix_qp
+
+        tapsap.structures.Experiment.calibrate_all_species
+
+    Link:
+        https://arxiv.org/abs/2109.15042
+    """
+    if backend not in ['cvxpy', 'numpy']:
+        raise ValueError(
+            "backend must be either cvxpy or numpy")
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    num_block, n = X.shape
+    intercept = np.zeros(num_block)
+    calibration_coef = np.ones(num_block)
+    # the flux that is only noise is not calibrated
+    X_median = np.median(X, axis=1)
+    flux_ci = X_median + 6 * np.median(abs(X - X_median[:, None]), axis=1)
+    unsolved = np.where(X.max(axis=1) >= flux_ci)[0]
+
+    if (backend == 'numpy') and (len(unsolved) > 0):
+        design = X[unsolved][:, :, None]
+        if fit_intercept:
+            design = np.concatenate((np.ones_like(design), design), axis=2)
+
+        if huber_loss:
+            fit_coefs = preprocess.tap_mix_irls(design, y[unsolved], times, constraints, fit_intercept, enforce_max)
+        else:
+            fit_coefs = preprocess.tap_mix_qp(design, y[unsolved], times, constraints, fit_intercept, enforce_max)
+
+        solved = ~np.isnan(fit_coefs).any(axis=1)
+        calibration_coef[unsolved[solved]] = fit_coefs[solved, -1]
+        if fit_intercept:
+            intercept[unsolved[solved]] = fit_coefs[solved, 0]
+
+        unsolved = unsolved[~solved]
+
+    if len(unsolved) > 0:
+        fit_coefs = _solve_blocks(X[unsolved], y[unsolved], times, huber_loss, constraints, fit_intercept, enforce_max)
+        calibration_coef[unsolved] = fit_coefs[1]
+        intercept[unsolved] = fit_coefs[0]
+
+    result = {
+        'flux':X * calibration_coef[:, None] + intercept[:, None],
+        'intercept':intercept,
+        'calibration_coef':calibration_coef
+    }
+
+    return result
+
+
+def _solve_blocks(X: np.ndarray, y: np.ndarray, times: np.ndarray, huber_loss: bool, constraints: bool, fit_intercept: bool, enforce_max: bool, max_iter: int = 20) -> tuple:
+    # a single convex problem with the coefficient and intercept of every block, where row b of X only contributes to samples b * n to (b + 1) * n
+    num_block, n = X.shape
+    dt = times[1] - times[0]
+    coef = cp.Variable(num_block)
+    if fit_intercept:
+        intercept = cp.Variable(num_block)
+    else:
+        intercept = np.zeros(num_block)
+
+    def block_resids(rows):
+        # the residuals of the selected samples (the flat index of X) given the coefficients of their blocks
+        blocks = rows // n
+        temp_rows = np.arange(len(rows))
+        fitted = sp.csr_matrix((X.ravel()[rows], (temp_rows, blocks)), shape=(len(rows), num_block)) @ coef
+        if fit_intercept:
+            fitted = fitted + sp.csr_matrix((np.ones(len(rows)), (temp_rows, blocks)), shape=(len(rows), num_block)) @ intercept
+
+        return y.ravel()[rows] - fitted
+
+    if huber_loss:
+        objective = cp.Minimize(cp.sum(cp.huber(block_resids(np.arange(num_block * n)), M=1e-5)))
+    else:
+        # the square error of each block only depends on X'X, X'y and y'y, i.e., ||R b - Q'y||^2 given X = QR (as tapsap.preprocess.tap_mix) rather than a cone of every residual
+        design = X[:, :, None]
+        if fit_intercept:
+            design = np.concatenate((np.ones_like(design), design), axis=2)
+
+        Q, R = np.linalg.qr(design)
+        Qy = np.einsum('bnp,bn->bp', Q, y)
+        if fit_intercept:
+            objective = cp.Minimize(cp.sum_squares(cp.multiply(R[:, 0, 0], intercept) + cp.multiply(R[:, 0, 1], coef) - Qy[:, 0]) + cp.sum_squares(cp.multiply(R[:, 1, 1], coef) - Qy[:, 1]))
+        else:
+            objective = cp.Minimize(cp.sum_squares(cp.multiply(R[:, 0, 0], coef) - Qy[:, 0]))
+
+    temp_constraints = []
+    resid_floor = y.min(axis=1) * 2
+    if constraints:
+        temp_constraints.append(coef >= 0)
+        y_max = y.max(axis=1)
+        if enforce_max:
+            temp_constraints.append(cp.multiply(X.max(axis=1) / y_max, coef) + intercept / y_max <= 1)
+
+        temp_constraints.append(y.sum(axis=1) * dt - (cp.multiply(X.sum(axis=1) * dt, coef) + intercept * (n * dt)) >= 1e-5)
+
+    # the residual floor of the huber loss is applied to every sample, while the square error loss applies it to a growing set of samples per block (as tapsap.preprocess.tap_mix) until no other sample violates it
+    if huber_loss or (not constraints):
+        active = np.arange(num_block * n)
+    else:
+        active = (np.argsort(y, axis=1)[:, :min(8, n)] + np.arange(num_block)[:, None] * n).ravel()
+
+    tol = 1e-8 * np.maximum(1, np.abs(y).max(axis=1))
+    for i in range(max_iter + 1):
+        if i == max_iter:
+            # the floor is applied to every sample if the selected samples have not converged
+            active = np.arange(num_block * n)
+
+        floor_constraints = []
+        if constraints:
+            floor_constraints.append(block_resids(active) >= resid_floor[active // n])
+
+        # the solver warnings are only ignored during the solve, rather than for the rest of the process
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=UserWarning)
+            warnings.simplefilter("ignore", category=DeprecationWarning)
+            cp.Problem(objective, temp_constraints + floor_constraints).solve(solver=cp.CLARABEL, tol_gap_abs=1e-12, tol_gap_rel=1e-12, tol_feas=1e-12)
+
+        if (not constraints) or (len(active) == num_block * n):
+            break
+
+        resids = y - X * coef.value[:, None] - (intercept.value if fit_intercept else intercept)[:, None]
+        violated = np.setdiff1d(np.where((resids < (resid_floor - tol)[:, None]).ravel())[0], active)
+        if len(violated) == 0:
+            break
+
+        # the most violated samples of each block are added, at most doubling the selected samples of the block
+        violated = violated[np.lexsort((resids.ravel()[violated], violated // n))]
+        block_counts = np.bincount(active // n, minlength=num_block)
+        violated_blocks = violated // n
+        block_order = np.arange(len(violated)) - np.searchsorted(violated_blocks, violated_blocks)
+        active = np.concatenate((active, violated[block_order < block_counts[violated_blocks]]))
+
+    if fit_intercept:
+        intercept = intercept.value
+
+    return intercept, coef.value
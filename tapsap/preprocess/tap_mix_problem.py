@@ -0,0 +1,106 @@
+# tap_mix_problem
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import cvxpy as cp
+import threading
+
+# the parameters of a problem are set prior to each solve, so each thread keeps its own problems
+_problem_cache = threading.local()
+
+
+def tap_mix_problem(n: int, p: int, huber_loss: bool = False, constraints: bool = True, fit_intercept: bool = True, enforce_max: bool = False, reduced: bool = False) -> dict:
+    """
+
+    The parametrized convex problem used by tap_mix.
+    The problem structure only depends on the size of the data and the options, so it is built once per set of options and cached.
+    The data is passed through cvxpy parameters, such that repeated solves skip the problem canonicalization.  ECOS does not accept a starting point, so each solve starts from scratch.
+    Each thread has its own cache, such that species may be calibrated concurrently.
+    The reduced problem uses the sufficient statistics of the square error loss, i.e., the QR decomposition X = QR and Q'y, such that the loss does not depend on the number of samples.
+    The residual floor of the reduced problem is only applied to n selected samples (see tapsap.preprocess.tap_mix).
+
+    Args:
+        n (int): The number of samples in the flux or the number of residual floor samples of the reduced problem.
+
+        p (int): The number of coefficients (including the intercept).
+
+        huber_loss (bool): Use a robust loss function rather than the standard square error loss.
+
+        constraints (bool): Apply the molecule constraints. If false, tap_mix performs regular linear regression.
+
+        fit_intercept (bool): The first coefficient is the intercept and is not constrained to be non-negative.
+
+        enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+        reduced (bool): Use the sufficient statistics of the square error loss (the huber_loss is ignored).
+
+    Returns:
+        problem (dict): The cvxpy problem, the coefficient variable (beta_hat) and the parameters to set prior to solving (X, y, m0_X, area_X, area_y and resid_floor, as well as R and Qy when reduced).
+
+    Citation:
+        Agrawal et al, "Differentiable Convex Optimization Layers"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.tap_mix
+
+    Link:
+        https://www.cvxpy.org/tutorial/advanced/index.html#disciplined-parametrized-programming
+    """
+    if not hasattr(_problem_cache, 'problems'):
+        _problem_cache.problems = {}
+
+    problem_key = (n, p, huber_loss, constraints, fit_intercept, enforce_max, reduced)
+    if problem_key in _problem_cache.problems:
+        return _problem_cache.problems[problem_key]
+
+    beta_hat = cp.Variable(p)
+    X = cp.Parameter((n, p))
+    y = cp.Parameter(n)
+    # the column sums of X and the sum of y multiplied by the time step
+    area_X = cp.Parameter(p)
+    area_y = cp.Parameter()
+    m0_X = cp.Parameter(p)
+    resid_floor = cp.Parameter()
+
+    # given X = QR, then ||y - X beta||^2 = ||R beta - Q'y||^2 + y'y - ||Q'y||^2, where R'R = X'X and R'Q'y = X'y
+    R = cp.Parameter((p, p))
+    Qy = cp.Parameter(p)
+
+    resids = y - X @ beta_hat
+    if reduced:
+        objective = cp.Minimize(cp.sum_squares(R @ beta_hat - Qy))
+    elif huber_loss:
+        objective = cp.Minimize(cp.sum(cp.huber(resids, M=1e-5)))
+    else:
+        objective = cp.Minimize(cp.sum_squares(resids))
+
+    temp_constraints = []
+    if constraints:
+        if fit_intercept:
+            temp_constraints.append(beta_hat[1:p] >= 0)
+        else:
+            temp_constraints.append(beta_hat >= 0)
+
+        if enforce_max:
+            temp_constraints.append(m0_X @ beta_hat <= 1)
+
+        temp_constraints.append(area_y - area_X @ beta_hat >= 1e-5)
+        temp_constraints.append(resids >= resid_floor)
+
+    result = {
+        'problem':cp.Problem(objective, temp_constraints),
+        'beta_hat':beta_hat,
+        'X':X,
+        'y':y,
+        'area_X':area_X,
+        'area_y':area_y,
+        'm0_X':m0_X,
+        'resid_floor':resid_floor,
+        'R':R,
+        'Qy':Qy
+    }
+    _problem_cache.problems[problem_key] = result
+
+    return result
@@ -0,0 +1,162 @@
+# tap_mix_qp
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from itertools import combinations
+
+
+def tap_mix_qp(X: np.ndarray, y: np.ndarray, times: np.ndarray, constraints: bool = True, fit_intercept: bool = True, enforce_max: bool = False, weights: np.ndarray = None, max_iter: int = 200, tol: float = 1e-9, linear: np.ndarray = None) -> np.ndarray:
+    """
+
+    A NumPy active-set solver for the tap_mix calibration problem with one or two coefficients (for example, a calibration coefficient and an intercept).
+    The square error loss only depends on the data through X'X, X'y, so the problem is reduced to a quadratic program with p variables.
+    The constraints (non-negative coefficients, positive residual area, the residual floor at 2 * min(y) and optionally the maximum constraint) are handled exactly:
+    the optimum of a strictly convex quadratic program has at most p linearly independent active constraints, so every candidate active set is enumerated.
+    The residual floor contributes one constraint per sample, so these are added by constraint generation (the most violated sample is added until none are violated).
+    The leading axis may be used for batching, i.e., X with a shape of (num_pulse, n, p) and y with a shape of (num_pulse, n).
+
+    Args:
+        X (float ndarray): The design matrix with a shape of (n, p), including the intercept column if fit_intercept.
+
+        y (float ndarray): The flux that contains all of X.
+
+        times (float ndarray): An array of time.
+
+        constraints (bool): Apply the molecule constraints. If false, tap_mix_qp performs regular linear regression.
+
+        fit_intercept (bool): The first column of X is the intercept and is not constrained to be non-negative.
+
+        enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+        weights (float ndarray): Optional weights for each sample in the square error loss.
+
+        max_iter (int): The maximum number of residual floor constraints added.
+
+        tol (float): The relative tolerance for the constraints.
+
+        linear (float ndarray): An optional term added to X'y with a shape of (p,) or (num_pulse, p), e.g., the linear part of the huber loss (see tapsap.preprocess.tap_mix_irls).
+
+    Returns:
+        coefs (float ndarray): The fitted coefficients with a shape of (p,) or (num_pulse, p).  The coefficients are NaN if the problem is not supported (p > 2) or could not be solved.
+
+    Citation:
+        Nocedal and Wright, "Numerical Optimization" (Chapter 16, Quadratic Programming)
+
+        Kunz et al, "A Priori Calibration of Transient Kinetics Data via Machine Learning" (In prep)
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.preprocess.tap_mix
+
+    Link:
+        https://doi.org/10.1007/978-0-387-40065-5
+
+        https://arxiv.org/abs/2109.15042
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 1:
+        coefs = tap_mix_qp(X[None, :, :], y[None, :], times, constraints, fit_intercept, enforce_max, None if weights is None else np.asarray(weights)[None, :], max_iter, tol, None if linear is None else np.asarray(linear)[None, :])
+        return coefs[0]
+
+    num_pulse, n, p = X.shape
+    coefs = np.full((num_pulse, p), np.nan)
+    if p > 2:
+        return coefs
+
+    if weights is None:
+        weights = np.ones((num_pulse, n))
+
+    weights = np.broadcast_to(weights, (num_pulse, n))
+    # sufficient statistics of the square error loss for every pulse
+    all_H = np.einsum('bni,bn,bnj->bij', X, weights, X)
+    all_g = np.einsum('bni,bn,bn->bi', X, weights, y)
+    if linear is not None:
+        all_g = all_g + linear
+
+    if not constraints:
+        for i in range(num_pulse):
+            coefs[i] = _solve_small_qp(all_H[i], all_g[i], np.zeros((0, p)), np.zeros(0), tol)
+
+        return coefs
+
+    dt = times[1] - times[0]
+    coef_index = np.arange(1, p) if fit_intercept else np.arange(p)
+    nonnegative_A = -np.eye(p)[coef_index]
+    all_area_A = X.sum(axis=1) * dt
+    all_area_c = y.sum(axis=1) * dt - 1e-5
+    all_m0 = X.max(axis=1) / y.max(axis=1)[:, None]
+    all_floor = y - y.min(axis=1)[:, None] * 2
+    for i in range(num_pulse):
+        small_A = [nonnegative_A, all_area_A[i][None, :]]
+        small_c = [np.zeros(len(coef_index)), all_area_c[i:(i + 1)]]
+        if enforce_max:
+            small_A.append(all_m0[i][None, :])
+            small_c.append(np.ones(1))
+
+        small_A = np.concatenate(small_A)
+        small_c = np.concatenate(small_c)
+        temp_X = X[i]
+        temp_floor = all_floor[i]
+        working_set = []
+        for j in range(max_iter):
+            temp_A = np.concatenate([small_A, temp_X[working_set]])
+            temp_c = np.concatenate([small_c, temp_floor[working_set]])
+            temp_coefs = _solve_small_qp(all_H[i], all_g[i], temp_A, temp_c, tol)
+            if np.isnan(temp_coefs).any():
+                break
+
+            violation = temp_X @ temp_coefs - temp_floor
+            worst = violation.argmax()
+            if violation[worst] <= tol * (abs(temp_floor[worst]) + abs(temp_X[worst]) @ abs(temp_coefs)):
+                coefs[i] = temp_coefs
+                break
+
+            working_set.append(worst)
+
+    return coefs
+
+
+def _solve_small_qp(H: np.ndarray, g: np.ndarray, A: np.ndarray, c: np.ndarray, tol: float) -> np.ndarray:
+    # Minimize b'Hb - 2g'b subject to Ab <= c by checking the minimizer of every candidate active set with at most p constraints.
+    # The feasible candidate with the smallest objective is the optimum as H is positive definite.
+    p = len(g)
+    try:
+        H_inv = np.linalg.inv(H)
+    except np.linalg.LinAlgError:
+        return np.full(p, np.nan)
+
+    if not np.isfinite(H_inv).all():
+        return np.full(p, np.nan)
+
+    unconstrained = H_inv @ g
+    candidates = [unconstrained[None, :]]
+    if len(c) > 0:
+        # minimizer on each constraint boundary
+        H_inv_A = A @ H_inv
+        A_H_A = (A * H_inv_A).sum(axis=1)
+        single = A_H_A > 0
+        step = (c[single] - A[single] @ unconstrained) / A_H_A[single]
+        candidates.append(unconstrained[None, :] + step[:, None] * H_inv_A[single])
+        # the vertices found by p constraints at once
+        for active_set in combinations(range(len(c)), p) if p > 1 else []:
+            active_set = list(active_set)
+            try:
+                candidates.append(np.linalg.solve(A[active_set], c[active_set])[None, :])
+            except np.linalg.LinAlgError:
+                pass
+
+    candidates = np.concatenate(candidates)
+    if len(c) > 0:
+        scale = abs(c)[None, :] + abs(candidates) @ abs(A).T
+        feasible = (candidates @ A.T - c[None, :] <= tol * scale).all(axis=1)
+        candidates = candidates[feasible]
+
+    if len(candidates) == 0:
+        return np.full(p, np.nan)
+
+    objective = np.einsum('ki,ij,kj->k', candidates, H, candidates) - 2 * candidates @ g
+
+    return candidates[objective.argmin()]
@@ -0,0 +1,142 @@
+# Executor
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import multiprocessing as mp
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Executor():
+    """
+
+    This class manages the worker pool used for pulse-parallel processing.
+    The pool is created on first use and reused by every call until the executor is closed, such that the process start-up cost is paid once per experiment rather than once per method call.
+    Small workloads are evaluated serially in the current process.
+    Species-level tasks with dependencies (e.g., calibrating the inert prior to a reactant) are scheduled on threads via run_tasks, while each task uses the same worker pool for its pulses.
+    The executor may be used as a context manager to guarantee the pool is released.
+
+    Attributes:
+        num_cores (int): The number of worker processes to use.  Initially set to the total number of cores available - 1.
+
+        min_parallel_tasks (int): The minimum number of tasks before the worker pool is used.  Fewer tasks are evaluated serially.
+
+    """
+
+    def __init__(self, num_cores:int = None, min_parallel_tasks:int = 16):
+        if num_cores is None:
+            num_cores = mp.cpu_count() - 1
+
+        self.num_cores = num_cores
+        self.min_parallel_tasks = min_parallel_tasks
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __deepcopy__(self, memo):
+        # the executor is shared, never duplicated, when copying a Transient or Experiment
+        return self
+
+    def __getstate__(self):
+        # worker pools cannot be pickled, a new pool will be started on first use
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get_pool(self):
+        """
+        A method for returning the worker pool, starting it if needed.
+
+        Returns:
+            pool (multiprocessing.Pool): The worker pool.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = mp.Pool(self.num_cores)
+
+        return self._pool
+
+    def starmap(self, func, args:list) -> list:
+        """
+        A method for applying a function to each set of arguments.
+        This mirrors multiprocessing.Pool.starmap and returns the results in order.
+
+        Args:
+            func (function): A picklable function.
+
+            args (list): A list of argument tuples, one per task.
+
+        Returns:
+            results (list): The result of each task.
+        """
+        args = list(args)
+        if (self.num_cores < 2) or (len(args) < self.min_parallel_tasks):
+            return [func(*i) for i in args]
+
+        return self.get_pool().starmap(func, args)
+
+    def run_tasks(self, tasks:dict, num_workers:int = None) -> dict:
+        """
+        A method for running tasks that depend on each other, e.g., the processing of each gas species within an experiment.
+        A task is started as soon as all of its dependencies have finished, such that independent tasks run concurrently on at most num_workers threads.
+        The tasks share the objects they are given, so threads are used rather than processes.
+        If num_workers is less than 2, then the tasks are run one after another in the order given.
+
+        Args:
+            tasks (dict): The tasks by name, where each task is a tuple of a function, the argument tuple and a list of the task names it depends on.
+
+            num_workers (int): The number of tasks to run at once.  If None, then num_cores is used.
+
+        Returns:
+            results (dict): The result of each task by name.
+        """
+        if num_workers is None:
+            num_workers = self.num_cores
+
+        remaining = dict(tasks)
+        results = {}
+        if num_workers < 2:
+            while len(remaining) > 0:
+                ready = [i for i in remaining.keys() if all(j in results for j in remaining[i][2])]
+                if len(ready) == 0:
+                    raise ValueError('The task dependencies cannot be resolved: ' + ', '.join(remaining.keys()))
+
+                func, args, _ = remaining.pop(ready[0])
+                results[ready[0]] = func(*args)
+
+            return results
+
+        with ThreadPoolExecutor(max_workers=num_workers) as thread_pool:
+            running = {}
+            while (len(remaining) > 0) or (len(running) > 0):
+                ready = [i for i in remaining.keys() if all(j in results for j in remaining[i][2])]
+                for i in ready:
+                    func, args, _ = remaining.pop(i)
+                    running[thread_pool.submit(func, *args)] = i
+
+                if len(running) == 0:
+                    raise ValueError('The task dependencies cannot be resolved: ' + ', '.join(remaining.keys()))
+
+                finished, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results[running.pop(future)] = future.result()
+
+        return results
+
+    def close(self) -> None:
+        """
+        A method for shutting down the worker pool.  The executor may still be used afterwards and will start a new pool when required.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
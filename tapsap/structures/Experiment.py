@@ -1,8 +1,7 @@
 # Experiment
 # Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
 
-from tapsap import structures
-import copy
+from tapsap import structures, preprocess
 import numpy as np
 
 class Experiment():
@@ -28,6 +27,10 @@ class Experiment():
         species_data (dict): A collection of Transient objects.
 
         reactor (class Reactor): The reactor information.
+
+        executor (class Executor): The worker pool shared by all of the species when processing the experiment.
+
+        tdms_file (TdmsFile): The opened TDMS file when the flux is read on demand (see tapsap.file_io.read_tdms).
         
     """
     def __init__(self):
@@ -40,7 +43,45 @@ class Experiment():
         self.species_data = {}
         self.reactor = structures.Reactor()
         self.species_class = {'inert':None, 'reactants': None, 'products':None}
-       
+        self.executor = structures.Executor()
+        self.tdms_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        This method shuts down the worker pool used by the experiment and closes the TDMS file if the flux was read on demand.
+        The temperature of the species that has not been used is read prior to closing the file.
+        """
+        self.executor.close()
+        if self.tdms_file is not None:
+            for temp_species in self.species_data.values():
+                if temp_species.temperature_source is not None:
+                    temp_species._read_temperature()
+
+            self.tdms_file.close()
+            self.tdms_file = None
+
+    def set_executor(self) -> None:
+        """
+        This method shares the experiment executor with each species in species_data such that a single worker pool is reused for all of the processing.
+        """
+        for i in list(self.species_data.keys()):
+            self.species_data[i].executor = self.executor
+
+    def set_cache(self, cache) -> None:
+        """
+        This method shares a result cache with each species in species_data such that rerunning the processing with unchanged data and parameters reads the previous results.
+
+        Args:
+            cache (ResultCache): The on disk result cache.  If None, then the results are always computed.
+        """
+        for i in list(self.species_data.keys()):
+            self.species_data[i].cache = cache
 
     def set_reactor_params(self) -> None:
         """
@@ -59,21 +100,25 @@ class Experiment():
 
     def make_copy(self, name_to_copy:str, new_species_name:str) -> None:
         """
-        This method makes a deep copy of a species such that it may be transformed without removing the original flux.
+        This method makes a copy of a species such that it may be transformed without removing the original flux.
+        The flux is shared by both species until the copy is transformed (see tapsap.structures.Transient.copy).
+        The reactor of the copy is copied, while the reference gas is the same object for both species.
 
         Args:
             name_to_copy (str): A name contained in the species_data attribute
 
             new_species_name (str): The new name of the copy.
         """
-        current_species = copy.deepcopy((self.species_data[name_to_copy]))
+        current_species = self.species_data[name_to_copy].copy()
         current_species.name = new_species_name
         self.species_data[new_species_name] = current_species
 
 
-    def calibrate_all_species(self, inert:str = None, reference_index = 10, enforce_max:bool = False) -> None:
+    def calibrate_all_species(self, inert:str = None, reference_index = 10, enforce_max:bool = False, backend:str = 'cvxpy', num_workers:int = None, joint:bool = False, batch_size:int = 8, drift_subsample:int = None) -> None:
         """
         This method calibrates all other flux to the inert species.
+        The species are calibrated concurrently as each species only depends on its own copy of the inert.
+        When joint, the copies of the inert are calibrated concurrently and then every species of a batch of pulses is calibrated within a single optimization problem (see tapsap.preprocess.tap_mix_joint) rather than one problem per pulse and species.
 
         Args:
             inert (str): The name of the inert species as found in the species_data keys.  If none, then will use species_class contained in the experiment.
@@ -81,6 +126,21 @@ class Experiment():
             reference_index (optional int): The index in which to calibrate the inert values.  Be sure to examine prior to application in case of outgassing.
 
             enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+            backend (str): The tap_mix solver used in calibration. Options: cvxpy, numpy.
+
+            num_workers (int): The number of species processed at once.  If None, then the number of cores of the executor is used.
+
+            joint (bool): Calibrate all of the species of a batch of pulses at once.
+
+            batch_size (int): The number of pulses calibrated at once when joint.  The problem contains batch_size times the number of species blocks.
+
+            drift_subsample (int): The number of pulses used to fit the drift model of each copy of the inert (see tapsap.structures.Transient.calibrate_flux).  If None, then every pulse is calibrated to the reference pulse.
+
+        See also:
+            tapsap.structures.Executor.run_tasks
+
+            tapsap.preprocess.tap_mix_joint
         """
         if inert is not None:
             self.species_class['inert'] = inert
@@ -94,29 +154,106 @@ class Experiment():
         except ValueError:
             print("Please enter a valid inert from the species data keys, i.e., experiment.species_data.keys()")
 
+        self.set_executor()
+        tasks = self.calibration_tasks(inert_species, reference_index, enforce_max, backend, drift_subsample)
+        if joint:
+            species_inert = {i: tasks[i][1][1] for i in list(tasks.keys()) if tasks[i][0] == self._calibrate_species}
+            self.executor.run_tasks({i: tasks[i] for i in list(species_inert.values())}, num_workers)
+            self._calibrate_joint(species_inert, enforce_max, backend, batch_size)
+        else:
+            self.executor.run_tasks(tasks, num_workers)
+
 
+    def calibration_tasks(self, inert:str, reference_index = 10, enforce_max:bool = False, backend:str = 'cvxpy', drift_subsample:int = None) -> dict:
+        """
+        This method creates the tasks for calibrating all other flux to the inert species (see tapsap.structures.Executor.run_tasks).
+        Each species depends on its own copy of the inert, such that the species are independent of each other.
 
-        all_other_species = [i for i in list(self.species_data.keys()) if i is not inert_species]
+        Args:
+            inert (str): The name of the inert species as found in the species_data keys.
+
+            reference_index (optional int): The index in which to calibrate the inert values.  Be sure to examine prior to application in case of outgassing.
+
+            enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+            backend (str): The tap_mix solver used in calibration. Options: cvxpy, numpy.
+
+            drift_subsample (int): The number of pulses used to fit the drift model of each copy of the inert.  If None, then every pulse is calibrated to the reference pulse.
+
+        Returns:
+            tasks (dict): The calibration tasks, named after the calibrated species.
+        """
+        tasks = {}
+        all_other_species = [i for i in list(self.species_data.keys()) if i != inert]
+        # the species read by each copy task, such that a species is not changed while it is being copied
+        copy_sources = {}
         for i in all_other_species:
             current_mass = self.species_data[i].mass
             current_name = self.species_data[i].name.replace('AMU', '')
             inert_name = 'inert' + current_name
-            self.make_copy(inert_species, inert_name)
-            self.species_data[inert_name].grahams_law(current_mass)
-            self.species_data[inert_name].baseline_correct()
-            self.species_data[inert_name].calibrate_flux(reference_index = reference_index)
-
-            # baseline correction and calibration
-            
-            self.species_data[i].reference_gas = self.species_data[inert_name]
+            tasks[inert_name] = (self._calibrate_inert, (inert, inert_name, current_mass, reference_index, backend, drift_subsample), [])
+            copy_sources[inert_name] = inert
+
+        for i in all_other_species:
+            inert_name = 'inert' + self.species_data[i].name.replace('AMU', '')
+            copy_tasks = [j for j in copy_sources.keys() if (copy_sources[j] == i) and (j != inert_name)]
+            tasks[i] = (self._calibrate_species, (i, inert_name, enforce_max, backend), [inert_name] + copy_tasks)
+
+        return tasks
+
+    def _calibrate_inert(self, inert:str, inert_name:str, new_mass:float, reference_index, backend:str, drift_subsample:int = None) -> None:
+        self.make_copy(inert, inert_name)
+        self.species_data[inert_name].grahams_law(new_mass)
+        self.species_data[inert_name].baseline_correct()
+        self.species_data[inert_name].calibrate_flux(reference_index = reference_index, backend = backend, drift_subsample = drift_subsample)
+
+    def _calibrate_species(self, species_name:str, inert_name:str, enforce_max:bool, backend:str) -> None:
+        # baseline correction and calibration
+        self.species_data[species_name].reference_gas = self.species_data[inert_name]
+        self.species_data[species_name].baseline_correct()
+        self.species_data[species_name].calibrate_flux(enforce_max = enforce_max, backend = backend)
+        self.species_data[species_name].set_moments()
+
+    def _calibrate_joint(self, species_inert:dict, enforce_max:bool, backend:str, batch_size:int) -> None:
+        # the blocks of a batch are the species by pulse pairs, where each species is calibrated to its own copy of the inert
+        all_species = list(species_inert.keys())
+        for i in all_species:
+            self.species_data[i].reference_gas = self.species_data[species_inert[i]]
             self.species_data[i].baseline_correct()
-            self.species_data[i].calibrate_flux(enforce_max = enforce_max)
+            if self.species_data[i].smoothed_flux_matrix is None:
+                self.species_data[i].smooth_flux()
+
+        num_pulse = min(self.species_data[i].num_pulse for i in all_species)
+        times = self.species_data[all_species[0]].times
+        all_coef = np.ones((len(all_species), num_pulse))
+        all_intercept = np.zeros((len(all_species), num_pulse))
+        for start in range(0, num_pulse, batch_size):
+            chunk = slice(start, min(start + batch_size, num_pulse))
+            X = np.concatenate([self.species_data[i].smoothed_flux_matrix.values[chunk] for i in all_species])
+            y = np.concatenate([self.species_data[species_inert[i]].smoothed_flux_matrix.values[chunk] for i in all_species])
+            result = preprocess.tap_mix_joint(X, y, times, enforce_max = enforce_max, backend = backend)
+            all_coef[:, chunk] = result['calibration_coef'].reshape(len(all_species), -1)
+            all_intercept[:, chunk] = result['intercept'].reshape(len(all_species), -1)
+
+        for j, i in enumerate(all_species):
+            self.species_data[i].apply_calibration(all_coef[j], all_intercept[j])
             self.species_data[i].set_moments()
 
+    def _derive_species(self, name_to_copy:str, new_species_name:str, transformation:str, transformation_args:dict = None) -> None:
+        # copy the species and apply the transformation, e.g., set_rate, to the copy
+        if transformation_args is None:
+            transformation_args = {}
+
+        self.make_copy(name_to_copy, new_species_name)
+        getattr(self.species_data[new_species_name], transformation)(**transformation_args)
+        self.species_data[new_species_name].set_moments()
 
-    def rate_reactivity_data(self, inert:str = None, reactants:np.ndarray = None, products:np.ndarray = None, calibrate_data:bool = True, reference_index:int = 10, enforce_max:bool = False) -> None:
+    def rate_reactivity_data(self, inert:str = None, reactants:np.ndarray = None, products:np.ndarray = None, calibrate_data:bool = True, reference_index:int = 10, enforce_max:bool = False, backend:str = 'cvxpy', num_workers:int = None) -> None:
         """
         This method calculates the rate, concentration, and the accumulation for each different species.
+        The species and their transformations are processed concurrently in dependency order:
+        the inert copies are calibrated first, then each species is calibrated, then its concentration and rate, and the accumulation follows the rate.
+        The products follow the calibration of the reactants.
 
         Args:
             inert (str): The name of the inert species as found in the species_data keys.  If none, then will use species_class contained in the experiment.
@@ -130,6 +267,13 @@ class Experiment():
             reference_index (optional int): The index in which to calibrate the inert values.  Be sure to examine prior to application in case of outgassing.
 
             enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+            backend (str): The tap_mix solver used in calibration. Options: cvxpy, numpy.
+
+            num_workers (int): The number of species transformations processed at once.  If None, then the number of cores of the executor is used.
+
+        See also:
+            tapsap.structures.Executor.run_tasks
         """
 
         if inert is not None:
@@ -169,43 +313,34 @@ class Experiment():
                 except ValueError:
                     print("Please enter a valid product from the species data keys, i.e., experiment.species_data.keys()")
 
+        self.set_executor()
+        tasks = {}
         if calibrate_data:
-            self.calibrate_all_species(inert_species, reference_index = reference_index, enforce_max = enforce_max)
+            tasks.update(self.calibration_tasks(inert_species, reference_index, enforce_max, backend))
 
+        reactant_tasks = [i for i in reactant_species if i in tasks]
         for i in reactant_species:
             current_name = self.species_data[i].name.replace('AMU', '')
-            # measure the concentration
+            calibrated = [i] if i in tasks else []
+            # measure the concentration, rate and accumulation
             concentration_name = 'concentration' + current_name
-            self.make_copy(i, concentration_name)
-            self.species_data[concentration_name].set_concentration()
-            self.species_data[concentration_name].set_moments()
-            # measure the rate
             rate_name = 'rate' + current_name
-            self.make_copy(i, rate_name)
-            self.species_data[rate_name].set_rate(isreactant = True)
-            self.species_data[rate_name].set_moments()
-            # measure the accumulation
             accumulation_name = 'accumulation' + current_name
-            self.make_copy(rate_name, accumulation_name)
-            self.species_data[accumulation_name].set_accumulation()
-            self.species_data[accumulation_name].set_moments()
+            tasks[concentration_name] = (self._derive_species, (i, concentration_name, 'set_concentration'), calibrated)
+            tasks[rate_name] = (self._derive_species, (i, rate_name, 'set_rate', {'isreactant':True}), calibrated)
+            tasks[accumulation_name] = (self._derive_species, (rate_name, accumulation_name, 'set_accumulation'), [rate_name])
 
         if product_species is not None:
             for i in product_species:
                 current_name = self.species_data[i].name.replace('AMU', '')
-                # measure the concentration
+                # products follow the calibration of the reactants
+                calibrated = reactant_tasks + ([i] if i in tasks else [])
+                # measure the concentration, rate and accumulation
                 concentration_name = 'concentration' + current_name
-                self.make_copy(i, concentration_name)
-                self.species_data[concentration_name].set_concentration()
-                self.species_data[concentration_name].set_moments()
-                # measure the rate
                 rate_name = 'rate' + current_name
-                self.make_copy(i, rate_name)
-                self.species_data[rate_name].set_rate()
-                self.species_data[rate_name].set_moments()
-                # measure the accumulation
                 accumulation_name = 'accumulation' + current_name
-                self.make_copy(rate_name, accumulation_name)
-                self.species_data[accumulation_name].set_accumulation()
-                self.species_data[accumulation_name].set_moments()
+                tasks[concentration_name] = (self._derive_species, (i, concentration_name, 'set_concentration'), calibrated)
+                tasks[rate_name] = (self._derive_species, (i, rate_name, 'set_rate'), calibrated)
+                tasks[accumulation_name] = (self._derive_species, (rate_name, accumulation_name, 'set_accumulation'), [rate_name])
 
+        self.executor.run_tasks(tasks, num_workers)
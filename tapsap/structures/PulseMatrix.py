@@ -0,0 +1,466 @@
+# PulseMatrix
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+import pandas as pd
+import os
+import tempfile
+import threading
+
+# guards the owner counts of shared values when species are processed on several threads (reentrant, as a pulse matrix may be finalized while the lock is held)
+_share_lock = threading.RLock()
+
+
+class PulseMatrix():
+    """
+
+    This class stores the flux of every pulse of a single gas species as one contiguous 2-D array.
+    Each row is a pulse (C order), such that a single pulse is a contiguous block of memory and results for all pulses can be read and written at once.
+    The DataFrame view (one column per pulse) shares memory with the array.
+    Pulse matrices made by share use the same array (copy-on-write), such that the array is only copied when one of them is written to.
+    A read-only array (e.g., memory mapped with mode r) is copied in the same way when it is written to.
+    A pulse matrix stops sharing the array once it is garbage collected, e.g., after a species replaces its smoothed flux.
+    The array may be memory mapped to a .npy file (see from_memmap and to_memmap) for pulse trains that do not fit in memory.
+    New arrays of a memory mapped pulse matrix (e.g., the smoothed flux) are then temporary sibling .npy files within the same directory and the flux is processed in chunks of pulses (see map_chunks and update_chunks).
+    A temporary .npy file is removed once no pulse matrix uses it, i.e., when the pulse matrices using it are closed, garbage collected or have new values.
+
+    Attributes:
+        values (float ndarray): The flux with a shape of (num_pulse, num_samples).
+
+        pulse_ids (ndarray): The pulse index for each row.  Used as the column names of the DataFrame view.
+
+        temperature (float ndarray): The temperature of each pulse.
+
+        index (ndarray): The sample labels used as the index of the DataFrame view.
+
+        memmap_file (str): The .npy file backing the values.  None if the values are held in memory.
+
+        chunk_size (int): The number of pulses processed at once by map_chunks and update_chunks.  If None, then all pulses are processed at once unless the values are memory mapped (1024 pulses).
+
+    """
+
+    def __init__(self, values:np.ndarray, pulse_ids:np.ndarray = None, temperature:np.ndarray = None, index:np.ndarray = None, memmap_file:str = None, chunk_size:int = None):
+        self.values = np.ascontiguousarray(values, dtype=float)
+        if self.values.ndim == 1:
+            self.values = self.values.reshape(1, -1)
+
+        num_pulse, num_samples = self.values.shape
+        if pulse_ids is None:
+            pulse_ids = np.arange(num_pulse)
+
+        if index is None:
+            index = np.arange(num_samples)
+
+        self.pulse_ids = np.asarray(pulse_ids)
+        self.temperature = None if temperature is None else np.asarray(temperature, dtype=float)
+        self.index = np.asarray(index)
+        self.memmap_file = memmap_file
+        self.chunk_size = chunk_size
+        # the number of pulse matrices sharing the values and the temporary .npy file of the values (None if the values are not temporary), shared between them
+        self._storage = {'owners': 1, 'temp_file': None}
+
+    def __del__(self):
+        self._drop_storage()
+
+    def __getstate__(self) -> dict:
+        # a pickled or deep copied pulse matrix has its own values
+        state = self.__dict__.copy()
+        state['_storage'] = {'owners': 1, 'temp_file': None}
+        return state
+
+    @classmethod
+    def from_dataframe(cls, flux:pd.DataFrame, temperature:np.ndarray = None):
+        """
+        A method for creating a pulse matrix from a DataFrame containing one column per pulse.
+
+        Args:
+            flux (DataFrame): The flux where each column is a pulse.
+
+            temperature (float ndarray): The temperature of each pulse.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The flux as a pulse matrix.
+        """
+        values = np.asarray(flux.values, dtype=float).T
+        return cls(values, np.asarray(flux.columns), temperature, np.asarray(flux.index))
+
+    @classmethod
+    def from_memmap(cls, memmap_file:str, pulse_ids:np.ndarray = None, temperature:np.ndarray = None, index:np.ndarray = None, mode:str = 'r+', chunk_size:int = None):
+        """
+        A method for creating a pulse matrix backed by a .npy file with a shape of (num_pulse, num_samples).
+
+        Args:
+            memmap_file (str): The path to the .npy file.
+
+            pulse_ids (ndarray): The pulse index for each row.
+
+            temperature (float ndarray): The temperature of each pulse.
+
+            index (ndarray): The sample labels.
+
+            mode (str): The memory map mode. Options: r+, r, c
+
+            chunk_size (int): The number of pulses processed at once.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The memory mapped pulse matrix.
+        """
+        values = np.load(memmap_file, mmap_mode=mode)
+        return cls(values, pulse_ids, temperature, index, memmap_file, chunk_size)
+
+    @classmethod
+    def empty_memmap(cls, memmap_file:str, num_pulse:int, num_samples:int, pulse_ids:np.ndarray = None, temperature:np.ndarray = None, index:np.ndarray = None, chunk_size:int = None):
+        """
+        A method for creating a pulse matrix backed by a new .npy file.  The values are to be filled in, e.g., while reading a file.
+
+        Args:
+            memmap_file (str): The path to the new .npy file.
+
+            num_pulse (int): The number of pulses.
+
+            num_samples (int): The number of samples per pulse.
+
+            pulse_ids (ndarray): The pulse index for each row.
+
+            temperature (float ndarray): The temperature of each pulse.
+
+            index (ndarray): The sample labels.
+
+            chunk_size (int): The number of pulses processed at once.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The memory mapped pulse matrix.
+        """
+        values = np.lib.format.open_memmap(memmap_file, mode='w+', dtype=float, shape=(num_pulse, num_samples))
+        return cls(values, pulse_ids, temperature, index, memmap_file, chunk_size)
+
+    @property
+    def num_pulse(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def num_samples(self) -> int:
+        return self.values.shape[1]
+
+    def get_pulse(self, pulse_index:int) -> np.ndarray:
+        """
+        A method for reading the flux of a single pulse.
+
+        Args:
+            pulse_index (int): The row of the pulse.
+
+        Returns:
+            flux (float ndarray): A view of the pulse flux.
+        """
+        return self.values[pulse_index]
+
+    def set_pulse(self, pulse_index:int, flux:np.ndarray) -> None:
+        """
+        A method for writing the flux of a single pulse.
+
+        Args:
+            pulse_index (int): The row of the pulse.
+
+            flux (float ndarray): The new flux of the pulse.
+        """
+        self._detach()
+        self.values[pulse_index] = flux
+
+    def get_all(self) -> np.ndarray:
+        """
+        A method for reading the flux of every pulse.
+
+        Returns:
+            values (float ndarray): The flux with a shape of (num_pulse, num_samples).
+        """
+        return self.values
+
+    def set_all(self, results) -> None:
+        """
+        A method for writing the flux of every pulse at once.
+        When the results have the same shape as the current values, they are written in place such that any DataFrame views remain valid.
+
+        Args:
+            results (float ndarray or list of ndarrays): The new flux for each pulse in row order.
+        """
+        results = np.asarray(results, dtype=float)
+        if self._release() or ((self.memmap_file is not None) and (results.shape != self.values.shape)):
+            # the shared values are left untouched
+            old_file = self._set_storage(results.shape)
+            self.values[:] = results
+            _remove_file(old_file)
+        elif results.shape == self.values.shape:
+            self.values[:] = results
+        else:
+            self.values = np.ascontiguousarray(results)
+
+    def get_chunks(self, chunk_size:int = None) -> list:
+        """
+        A method for splitting the pulses into chunks.
+
+        Args:
+            chunk_size (int): The number of pulses per chunk.  If None, then the chunk size of the pulse matrix is used.
+
+        Returns:
+            chunks (slice list): The rows of each chunk.
+        """
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+
+        if chunk_size is None:
+            chunk_size = 1024 if self.memmap_file is not None else max(self.num_pulse, 1)
+
+        return [slice(i, min(i + chunk_size, self.num_pulse)) for i in range(0, self.num_pulse, chunk_size)]
+
+    def map_chunks(self, func, chunk_size:int = None, num_samples:int = None):
+        """
+        A method for creating a new pulse matrix from a function applied to chunks of pulses.
+        If the values are memory mapped, then the new values are written to a sibling .npy file.
+
+        Args:
+            func (function): A function of the flux of the chunk (float ndarray) and the rows of the chunk (slice) that returns the new values of those rows.
+
+            chunk_size (int): The number of pulses per chunk.
+
+            num_samples (int): The number of samples per pulse of the new values.  If None, then the number of samples is unchanged.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The new pulse matrix.
+        """
+        if num_samples is None:
+            num_samples = self.num_samples
+
+        new_matrix = PulseMatrix.__new__(PulseMatrix)
+        new_matrix.__dict__.update(self.__dict__)
+        new_matrix._storage = {'owners': 1, 'temp_file': None}
+        new_matrix._set_storage((self.num_pulse, num_samples))
+        for chunk in self.get_chunks(chunk_size):
+            new_matrix.values[chunk] = func(self.values[chunk], chunk)
+
+        return new_matrix
+
+    def update_chunks(self, func, chunk_size:int = None) -> None:
+        """
+        A method for writing the results of a function applied to chunks of pulses.
+        The values are written one chunk after another, so the function must only depend on the flux of its own chunk.
+        Shared values are left untouched and new values are allocated instead (a sibling .npy file if memory mapped).
+
+        Args:
+            func (function): A function of the flux of the chunk (float ndarray) and the rows of the chunk (slice) that returns the new values of those rows.
+
+            chunk_size (int): The number of pulses per chunk.
+        """
+        old_values = self.values
+        if self._release():
+            self._set_storage(old_values.shape)
+
+        for chunk in self.get_chunks(chunk_size):
+            self.values[chunk] = func(old_values[chunk], chunk)
+
+    def with_values(self, values:np.ndarray):
+        """
+        A method for creating a new pulse matrix with the same pulse information but different values.
+
+        Args:
+            values (float ndarray or list of ndarrays): The flux for each pulse in row order.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The new pulse matrix.
+        """
+        return PulseMatrix(values, self.pulse_ids, self.temperature, self.index, chunk_size=self.chunk_size)
+
+    def slice_samples(self, start:int = None, stop:int = None):
+        """
+        A method for creating a new pulse matrix containing a range of samples from every pulse.
+
+        Args:
+            start (int): The first sample to keep.
+
+            stop (int): The sample to stop at (exclusive).
+
+        Returns:
+            pulse_matrix (PulseMatrix): The new pulse matrix.
+        """
+        if self.memmap_file is not None:
+            new_matrix = self.map_chunks(lambda flux, chunk: flux[:, start:stop], num_samples=len(self.index[start:stop]))
+            new_matrix.index = self.index[start:stop]
+            return new_matrix
+
+        return PulseMatrix(self.values[:, start:stop], self.pulse_ids, self.temperature, self.index[start:stop], chunk_size=self.chunk_size)
+
+    def append(self, pulse_matrix, start:int = 0) -> None:
+        """
+        A method for adding the pulses of another pulse matrix after the last pulse, e.g., the new pulses of an experiment that is still being collected.
+        The values are allocated with the new number of pulses (a sibling .npy file if memory mapped) and shared values are left untouched.
+
+        Args:
+            pulse_matrix (PulseMatrix): The pulse matrix containing the new pulses.
+
+            start (int): The first pulse of pulse_matrix to add.
+        """
+        new_values = pulse_matrix.values[start:]
+        if new_values.shape[1] != self.num_samples:
+            raise ValueError('The number of samples of the new pulses (' + str(new_values.shape[1]) + ') differs from the pulse matrix (' + str(self.num_samples) + ')')
+
+        old_values = self.values
+        num_pulse = old_values.shape[0]
+        self._release()
+        old_file = self._set_storage((num_pulse + new_values.shape[0], self.num_samples))
+        for chunk in self.get_chunks():
+            if chunk.start < num_pulse:
+                old_chunk = slice(chunk.start, min(chunk.stop, num_pulse))
+                self.values[old_chunk] = old_values[old_chunk]
+
+            if chunk.stop > num_pulse:
+                new_start = max(chunk.start, num_pulse)
+                self.values[new_start:chunk.stop] = new_values[(new_start - num_pulse):(chunk.stop - num_pulse)]
+
+        _remove_file(old_file)
+
+        self.pulse_ids = np.concatenate((self.pulse_ids, pulse_matrix.pulse_ids[start:]))
+        if (self.temperature is not None) and (pulse_matrix.temperature is not None):
+            self.temperature = np.concatenate((self.temperature, pulse_matrix.temperature[start:]))
+        else:
+            self.temperature = None
+
+    def share(self):
+        """
+        A method for creating a copy-on-write pulse matrix.
+        The new pulse matrix uses the same values until either pulse matrix is written to via set_pulse, set_all, update_chunks or append.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The pulse matrix sharing the values.
+        """
+        new_matrix = PulseMatrix.__new__(PulseMatrix)
+        with _share_lock:
+            new_matrix.__dict__.update(self.__dict__)
+            self._storage['owners'] += 1
+
+        return new_matrix
+
+    def copy(self):
+        """
+        A method for copying the pulse matrix.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The copied pulse matrix.
+        """
+        temperature = None if self.temperature is None else self.temperature.copy()
+        if self.memmap_file is not None:
+            new_matrix = self.map_chunks(lambda flux, chunk: flux)
+            new_matrix.pulse_ids = self.pulse_ids.copy()
+            new_matrix.temperature = temperature
+            new_matrix.index = self.index.copy()
+            return new_matrix
+
+        return PulseMatrix(self.values.copy(), self.pulse_ids.copy(), temperature, self.index.copy(), chunk_size=self.chunk_size)
+
+    def to_memmap(self, memmap_file:str):
+        """
+        A method for writing the pulse matrix to a .npy file and returning the memory mapped pulse matrix.
+
+        Args:
+            memmap_file (str): The path to the new .npy file.
+
+        Returns:
+            pulse_matrix (PulseMatrix): The memory mapped pulse matrix.
+        """
+        new_matrix = PulseMatrix.empty_memmap(memmap_file, self.num_pulse, self.num_samples, self.pulse_ids, self.temperature, self.index, self.chunk_size)
+        for chunk in new_matrix.get_chunks():
+            new_matrix.values[chunk] = self.values[chunk]
+
+        return new_matrix
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        A method for viewing the pulse matrix as a DataFrame where each column is a pulse.
+        The DataFrame shares memory with the pulse matrix, so the values are never copied.
+        When the values are shared with another pulse matrix (see share), the DataFrame is read-only and the flux is written via set_pulse, set_all or update_chunks instead.
+
+        Returns:
+            flux (DataFrame): The flux where each column is a pulse.
+        """
+        values = self.values
+        with _share_lock:
+            is_shared = self._storage['owners'] > 1
+
+        if is_shared:
+            values = values.view()
+            values.flags.writeable = False
+
+        return pd.DataFrame(values.T, index=self.index, columns=self.pulse_ids, copy=False)
+
+    def close(self) -> None:
+        """
+        A method for releasing the values of the pulse matrix, e.g., when a memory mapped species is no longer needed.
+        The temporary .npy file of the values is removed once no other pulse matrix shares it.
+        The pulse matrix must not be used afterwards.
+        """
+        self._drop_storage()
+        self.values = None
+
+    def _release(self) -> bool:
+        # stop sharing the values with other pulse matrices, returns True if new values must be allocated prior to writing
+        # values that cannot be written (e.g., memory mapped with mode r) are copied on write as if they were shared
+        remove_file = None
+        with _share_lock:
+            is_shared = (self._storage['owners'] > 1) or (not self.values.flags.writeable)
+            if is_shared:
+                self._storage['owners'] -= 1
+                if self._storage['owners'] == 0:
+                    remove_file = self._storage['temp_file']
+
+                self._storage = {'owners': 1, 'temp_file': None}
+
+        _remove_file(remove_file)
+        return is_shared
+
+    def _drop_storage(self) -> None:
+        # stop using the values, where the temporary .npy file is removed by the last pulse matrix using it
+        storage = self.__dict__.get('_storage')
+        if storage is None:
+            return
+
+        self._storage = None
+        with _share_lock:
+            storage['owners'] -= 1
+            remove_file = storage['owners'] == 0
+
+        if remove_file:
+            _remove_file(storage['temp_file'])
+
+    def _detach(self) -> None:
+        # copy the values prior to writing when they are shared with another pulse matrix
+        old_values = self.values
+        if self._release():
+            self._set_storage(old_values.shape)
+            for chunk in self.get_chunks():
+                self.values[chunk] = old_values[chunk]
+
+    def _set_storage(self, shape:tuple) -> str:
+        # allocate new values, a temporary sibling .npy file of the current file if memory mapped
+        # returns the temporary .npy file of the previous values (only used by this pulse matrix), to remove once the previous values are no longer read
+        old_file = self._storage['temp_file']
+        if self.memmap_file is None:
+            self.values = np.empty(shape)
+            self._storage['temp_file'] = None
+        else:
+            file_dir, file_name = os.path.split(self.memmap_file)
+            file_handle, new_file = tempfile.mkstemp(suffix='.npy', prefix=os.path.splitext(file_name)[0].split('-')[0] + '-', dir=file_dir)
+            os.close(file_handle)
+            self.values = np.lib.format.open_memmap(new_file, mode='w+', dtype=float, shape=shape)
+            self.memmap_file = new_file
+            self._storage['temp_file'] = new_file
+
+        return old_file
+
+
+def _remove_file(file_name:str) -> None:
+    # remove a temporary .npy file, a file that is still mapped may not be removable (Windows) and is left in place
+    if file_name is None:
+        return
+
+    try:
+        os.remove(file_name)
+    except OSError:
+        pass
@@ -0,0 +1,126 @@
+# ResultCache
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+
+class ResultCache():
+    """
+
+    This class stores the outputs of the Transient processing stages (e.g., smooth_flux or calibrate_flux) on disk, such that rerunning an analysis with the same data and parameters reads the results rather than recomputing them.
+    Each result is keyed by a hash of the input arrays (flux, times, the moments used by the stage and the reference flux), the stage name and its parameters (including the reactor), so any change to the inputs results in a new key.
+    A result only contains the outputs of the stage, i.e., the flux, the smoothed flux, the moments written by the stage and the smoothed reference flux if the stage smoothed the reference gas.
+    The results are .npz files within the cache directory.
+    Reading a result marks it as recently used and the least recently used results are removed once the cache exceeds max_size.
+
+    Attributes:
+        cache_dir (str): The directory containing the results.  The directory is created if needed.
+
+        max_size (int): The maximum total size of the results in bytes.
+
+    """
+
+    def __init__(self, cache_dir:str, max_size:int = 2**30):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, stage:str, arrays:list, params:dict) -> str:
+        """
+        A method for hashing the inputs of a processing stage.
+
+        Args:
+            stage (str): The name of the processing stage.
+
+            arrays (list): The input arrays (None for a missing input).
+
+            params (dict): The parameters of the stage.  The values must be representable as json (other values are converted to strings).
+
+        Returns:
+            key (str): The hexadecimal hash of the inputs.
+        """
+        key_hash = hashlib.sha256(stage.encode())
+        key_hash.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for temp_array in arrays:
+            if temp_array is None:
+                key_hash.update(b'None')
+                continue
+
+            temp_array = np.ascontiguousarray(temp_array)
+            key_hash.update(str((temp_array.dtype.str, temp_array.shape)).encode())
+            key_hash.update(memoryview(temp_array).cast('B'))
+
+        return key_hash.hexdigest()
+
+    def get(self, key:str) -> dict:
+        """
+        A method for reading a result.
+
+        Args:
+            key (str): The key of the result (see make_key).
+
+        Returns:
+            results (dict): The arrays of the result by name.  None if the key is not in the cache.
+        """
+        result_file = os.path.join(self.cache_dir, key + '.npz')
+        try:
+            with np.load(result_file, allow_pickle=False) as temp_file:
+                results = {i: temp_file[i] for i in temp_file.files}
+            os.utime(result_file)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        return results
+
+    def put(self, key:str, results:dict) -> None:
+        """
+        A method for writing a result and removing the least recently used results when the cache is full.
+        The file is written under a temporary name and then renamed, such that an incomplete result is never read.
+
+        Args:
+            key (str): The key of the result (see make_key).
+
+            results (dict): The arrays of the result by name.
+        """
+        file_handle, temp_file = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        with os.fdopen(file_handle, 'wb') as result_file:
+            np.savez(result_file, **results)
+
+        os.replace(temp_file, os.path.join(self.cache_dir, key + '.npz'))
+        self._evict()
+
+    def clear(self) -> None:
+        """
+        A method for removing every result.
+        """
+        for i in os.listdir(self.cache_dir):
+            if i.endswith('.npz'):
+                os.remove(os.path.join(self.cache_dir, i))
+
+    def _evict(self) -> None:
+        # remove the least recently used results until the cache fits
+        all_results = []
+        for i in os.listdir(self.cache_dir):
+            if i.endswith('.npz'):
+                try:
+                    file_stat = os.stat(os.path.join(self.cache_dir, i))
+                except FileNotFoundError:
+                    continue
+
+                all_results.append((file_stat.st_mtime, file_stat.st_size, i))
+
+        total_size = sum(i[1] for i in all_results)
+        for _, file_size, file_name in sorted(all_results):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+            total_size -= file_size
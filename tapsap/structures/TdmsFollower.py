@@ -0,0 +1,142 @@
+# TdmsFollower
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from tapsap import structures, file_io
+from nptdms import TdmsFile
+
+
+class TdmsFollower():
+    """
+
+    This class follows a TDMS file that is still being collected, such that only the pulses added since the last update are read and processed.
+    The first update reads and processes every complete pulse in the file as an Experiment.
+    Each later update reads the new pulses, baseline corrects, calibrates and finds the moments of only those pulses and appends them to each species of the experiment (see tapsap.structures.Transient.append_pulses).
+    Every processing step is applied to each pulse on its own, so the followed experiment matches processing the full file at once, while the cost of an update only depends on the number of new pulses.
+    When calibrating, the raw reference pulse (reference_index) is processed along with the new pulses such that the new pulses are calibrated against the same reference.
+    A pulse is complete when every gas species has a full pulse channel, as the last channel may still be written to.
+
+    Attributes:
+        file_name (str): The path to the TDMS file.
+
+        species (str list): The names of the gas species to read.  If None, then all species are read.
+
+        inert (str): The name of the inert species used to calibrate all other species (see tapsap.structures.Experiment.calibrate_all_species).  If None, then each species is only baseline corrected prior to finding the moments.
+
+        reference_index (int): The pulse of the inert in which to calibrate the inert values.
+
+        enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+        backend (str): The tap_mix solver used in calibration. Options: cvxpy, numpy.
+
+        num_workers (int): The number of species processed at once.  If None, then the number of cores of the executor is used.
+
+        experiment (Experiment): The followed experiment.  None until the first update.
+
+        num_read (int): The number of pulses that have been read.
+
+    """
+
+    def __init__(self, file_name:str, species:list = None, inert:str = None, reference_index:int = 10, enforce_max:bool = False, backend:str = 'cvxpy', num_workers:int = None):
+        self.file_name = file_name
+        self.species = species
+        self.inert = inert
+        self.reference_index = reference_index
+        self.enforce_max = enforce_max
+        self.backend = backend
+        self.num_workers = num_workers
+        self.experiment = None
+        self.num_read = 0
+        self._reference = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        A method for shutting down the worker pool used by the followed experiment.
+        """
+        if self.experiment is not None:
+            self.experiment.close()
+
+    def count_pulses(self) -> int:
+        """
+        A method for counting the complete pulses within the file.
+        Only the file structure is read, not the flux.
+
+        Returns:
+            num_pulse (int): The number of pulses that are complete for every gas species.
+        """
+        with TdmsFile.open(self.file_name) as tdms_file:
+            group_names = [group.name for group in tdms_file.groups()]
+            mass_groups = [group for group in tdms_file.groups() if group.name not in ['Meta Data', 'Secondary Data']]
+            if ('Meta Data' not in group_names) or (len(mass_groups) == 0):
+                return 0
+
+            num_complete = []
+            for group in mass_groups:
+                # the first three channels are the item, value and time, the remainder are the pulses
+                channel_lengths = [len(channel) for channel in group.channels()[3:]]
+                if self.experiment is None:
+                    full_length = max(channel_lengths, default=0)
+                else:
+                    full_length = self.experiment.num_samples_per_pulse + 1
+
+                group_complete = 0
+                while (group_complete < len(channel_lengths)) and (channel_lengths[group_complete] >= full_length):
+                    group_complete += 1
+
+                num_complete.append(group_complete)
+
+        return min(num_complete)
+
+    def update(self) -> int:
+        """
+        A method for reading and processing the pulses added to the file since the last update.
+        When calibrating, the first update waits until the reference pulse is complete.
+
+        Returns:
+            num_new (int): The number of new pulses.
+        """
+        num_complete = self.count_pulses()
+        if (num_complete <= self.num_read) or ((self.inert is not None) and (num_complete <= self.reference_index)):
+            return 0
+
+        new_experiment = file_io.read_tdms(self.file_name, self.species, [self.num_read, num_complete])
+        if self.experiment is None:
+            if self.inert is not None:
+                self._reference = file_io.read_tdms(self.file_name, self.species, [self.reference_index, self.reference_index + 1])
+
+            self._process(new_experiment, self.reference_index)
+            self.experiment = new_experiment
+        else:
+            new_experiment.executor = self.experiment.executor
+            new_experiment.reactor = self.experiment.reactor
+            if self.inert is not None:
+                # the reference pulse is the first pulse
+                for i in list(new_experiment.species_data.keys()):
+                    temp_species = self._reference.species_data[i].copy()
+                    temp_species.append_pulses(new_experiment.species_data[i])
+                    new_experiment.species_data[i] = temp_species
+
+            new_experiment.set_reactor_params()
+            self._process(new_experiment, 0)
+            for i in list(new_experiment.species_data.keys()):
+                self.experiment.species_data[i].append_pulses(new_experiment.species_data[i], 0 if self.inert is None else 1)
+
+        num_new = num_complete - self.num_read
+        self.num_read = num_complete
+
+        return num_new
+
+    def _process(self, experiment:structures.Experiment, reference_index:int) -> None:
+        # the same processing is applied to the first and the new pulses
+        if self.inert is not None:
+            experiment.calibrate_all_species(self.inert, reference_index, self.enforce_max, self.backend, self.num_workers)
+        else:
+            experiment.set_executor()
+            for i in list(experiment.species_data.keys()):
+                experiment.species_data[i].baseline_correct()
+                experiment.species_data[i].set_moments()
@@ -0,0 +1,122 @@
+# TdmsPulseSource
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+from tapsap import structures
+import numpy as np
+import threading
+
+# reads from an open TDMS file are not thread safe
+_read_lock = threading.Lock()
+
+
+class TdmsPulseSource():
+    """
+
+    This class points to the pulse channels of a single gas species within an opened (streaming) TDMS file.
+    The flux is only read when requested, such that a Transient may be created without loading the flux (see tapsap.file_io.read_tdms).
+    The first value of each pulse channel is the temperature and the remainder is the flux.
+
+    Attributes:
+        tdms_file (TdmsFile): The TDMS file opened via TdmsFile.open.
+
+        group_name (str): The name of the group containing the gas species.
+
+        channel_names (list): The names of the pulse channels to read, i.e., the pulse index.
+
+        num_samples (int): The number of samples per pulse.
+
+        memmap_file (str): The .npy file the flux is read into.  If None, then the flux is read into memory.
+
+    """
+
+    def __init__(self, tdms_file, group_name:str, channel_names:list, num_samples:int, memmap_file:str = None):
+        self.tdms_file = tdms_file
+        self.group_name = group_name
+        self.channel_names = list(channel_names)
+        self.num_samples = num_samples
+        self.memmap_file = memmap_file
+
+    def read_temperature(self) -> np.ndarray:
+        """
+        A method for reading the temperature (first value) of each pulse.
+        Only the first value of each pulse channel is read, i.e., the value is read at its offset within the first data segment of the channel rather than reading the data chunk of the channel.
+
+        Returns:
+            temperature (float ndarray): The temperature of each pulse.
+        """
+        group = self.tdms_file[self.group_name]
+        with _read_lock:
+            temperature = _read_first_values(self.tdms_file, [group[i].path for i in self.channel_names])
+            # the channels that are not stored contiguously are read via nptdms
+            for i in np.where(np.isnan(temperature))[0]:
+                temperature[i] = group[self.channel_names[i]][0]
+
+        return temperature
+
+    def read(self, pulse_range:list = None) -> structures.PulseMatrix:
+        """
+        A method for reading the flux of the pulses into a pulse matrix.
+
+        Args:
+            pulse_range (ints list, optional): The start and end (exclusive) of the pulses to read.  If None, then all pulses are read.
+
+        Returns:
+            flux (PulseMatrix): The flux of the pulses.
+        """
+        channel_names = self.channel_names
+        if pulse_range is not None:
+            channel_names = channel_names[pulse_range[0]:pulse_range[1]]
+
+        group = self.tdms_file[self.group_name]
+        if self.memmap_file is None:
+            flux = structures.PulseMatrix(np.zeros((len(channel_names), self.num_samples)))
+        else:
+            flux = structures.PulseMatrix.empty_memmap(self.memmap_file, len(channel_names), self.num_samples)
+
+        flux.pulse_ids = np.array(channel_names, dtype=object)
+        flux.temperature = np.zeros(len(channel_names))
+        flux.index = np.arange(1, self.num_samples + 1)
+        with _read_lock:
+            for i, channel_name in enumerate(channel_names):
+                channel_data = group[channel_name][:(self.num_samples + 1)]
+                flux.temperature[i] = channel_data[0]
+                flux.values[i, :(len(channel_data) - 1)] = channel_data[1:]
+                flux.values[i, (len(channel_data) - 1):] = np.nan
+
+        return flux
+
+
+def _read_first_values(tdms_file, channel_paths:list) -> np.ndarray:
+    # the first value of each channel from the segment offsets of the opened file, where nptdms would read the whole data chunk of the channel
+    # NaN if the first segment of the channel is not contiguous (interleaved or DAQmx data), is truncated or the file is not opened for streaming
+    first_values = np.full(len(channel_paths), np.nan)
+    reader = getattr(tdms_file, '_reader', None)
+    if (reader is None) or (getattr(reader, '_segments', None) is None) or (getattr(reader, '_file', None) is None):
+        return first_values
+
+    remaining = {path: i for i, path in enumerate(channel_paths)}
+    for segment in reader._segments:
+        if len(remaining) == 0:
+            break
+
+        if segment.num_chunks == 0:
+            continue
+
+        data_objects = segment._get_data_objects()
+        segment_paths = [obj.path for obj in data_objects if (obj.path in remaining) and (obj.number_values > 0)]
+        if len(segment_paths) == 0:
+            continue
+
+        data_reader = segment._get_data_reader()
+        contiguous = (type(data_reader).__name__ == 'ContiguousDataReader') and (segment.final_chunk_lengths_override is None)
+        position = segment.data_position
+        for obj in data_objects:
+            if obj.path in segment_paths:
+                i = remaining.pop(obj.path)
+                if contiguous and (obj.data_type.size is not None):
+                    reader._file.seek(position)
+                    first_values[i] = obj.read_values(reader._file, 1, data_reader.endianness)[0]
+
+            position += obj.data_size
+
+    return first_values
@@ -3,9 +3,37 @@
 
 import numpy as np
 import pandas as pd
+import copy
+import functools
+import inspect
 from tapsap import structures, moments_analysis, preprocess, transient_analysis, diffusion
 import multiprocessing as mp
-import copy
+
+
+def _cached_stage(moments_columns:list):
+    # the outputs of a processing stage are read from the result cache of the transient when the inputs and parameters are unchanged
+    # moments_columns are the columns of df_moments that the stage reads or writes, i.e., the only columns in the key and restored from the cache
+    def stage_decorator(method):
+        @functools.wraps(method)
+        def cached_method(self, *args, **kwargs):
+            if self.cache is None:
+                return method(self, *args, **kwargs)
+
+            stage_args = inspect.signature(method).bind(self, *args, **kwargs)
+            stage_args.apply_defaults()
+            stage_params = {i: stage_args.arguments[i] for i in stage_args.arguments.keys() if i != 'self'}
+            key = self._cache_key(method.__name__, stage_params, moments_columns)
+            results = self.cache.get(key)
+            if results is None:
+                reference_smoothed = (self.reference_gas is not None) and (self.reference_gas.smoothed_flux_matrix is not None)
+                method(self, *args, **kwargs)
+                self.cache.put(key, self._cache_results(moments_columns, reference_smoothed))
+            else:
+                self._set_cache_results(results)
+
+        return cached_method
+
+    return stage_decorator
 
 
 class Transient():
@@ -25,7 +53,17 @@ class Transient():
 
         delay_time (float): The delay time of the gas species.
 
-        flux (dataframe): The measured flux of the gas species.
+        flux (dataframe): The measured flux of the gas species.  This is a DataFrame view (one column per pulse) of flux_matrix.
+
+        flux_matrix (PulseMatrix): The measured flux of the gas species stored as a contiguous (num_pulse, num_samples) array.
+
+        flux_source (TdmsPulseSource): The location of the flux within a TDMS file when the flux has not been read.  The flux is read on first use of flux or flux_matrix.
+
+        temperature_source (TdmsPulseSource): The location of the temperature within a TDMS file when the temperature has not been read.  The temperature is read on first use of df_moments.
+
+        smoothed_flux (dataframe): The smoothed flux of the gas species.  This is a DataFrame view of smoothed_flux_matrix.
+
+        smoothed_flux_matrix (PulseMatrix): The smoothed flux of the gas species stored as a contiguous (num_pulse, num_samples) array.
 
         times (float ndarray): An array of time.
 
@@ -44,6 +82,12 @@ class Transient():
         integration_times (list): The integration times for the moments.
 
         num_cores (int): The total number of cores to use in processing the data.  Initially set to the total number of cores available - 1.
+
+        executor (Executor): The executor that evaluates the pulse-parallel methods.  If None, then an executor with num_cores is created on first use and reused afterwards.
+
+        chunk_size (int): The number of pulses processed at once.  If None, then the chunk size of the flux matrix is used, i.e., all pulses unless the flux is memory mapped.
+
+        cache (ResultCache): The on disk cache of the smooth_flux, baseline_correct, calibrate_flux, set_concentration and set_rate results.  If None, then the results are always computed.
         
     """
 
@@ -52,8 +96,9 @@ class Transient():
         self.mass = 40
         self.gain = 9
         self.delay_time = 0
-        self.flux = None
-        self.smoothed_flux = None
+        self.flux_source = None
+        self.flux_matrix = None
+        self.smoothed_flux_matrix = None
         self.times = None
         self.smoothing_parameter = 1e-4
         # if surface species, then diffusion = 0
@@ -61,11 +106,195 @@ class Transient():
         self.amount_pulsed = 1
         self.initial_concentration = 0
         self.num_pulse = 1
+        self.temperature_source = None
         self.df_moments = None
         self.reactor = structures.Reactor()
         self.reference_gas = None
         self.integration_times = [0, 3]
         self.num_cores = mp.cpu_count() - 1
+        self.executor = None
+        self.chunk_size = None
+        self.cache = None
+
+    @property
+    def flux_matrix(self) -> structures.PulseMatrix:
+        if (self._flux_matrix is None) and (self.flux_source is not None):
+            self._flux_matrix = self.flux_source.read()
+            self.flux_source = None
+
+        return self._flux_matrix
+
+    @flux_matrix.setter
+    def flux_matrix(self, value) -> None:
+        self._flux_matrix = value
+        if value is not None:
+            self.flux_source = None
+
+    @property
+    def df_moments(self) -> pd.DataFrame:
+        if self.temperature_source is not None:
+            self._read_temperature()
+
+        return self._df_moments
+
+    @df_moments.setter
+    def df_moments(self, value) -> None:
+        self._df_moments = value
+        self.temperature_source = None
+
+    def _read_temperature(self) -> None:
+        # the temperature of each pulse is read from the TDMS file on first use of the moments
+        temperature_source = self.temperature_source
+        self.temperature_source = None
+        self._df_moments['temperature'] = temperature_source.read_temperature()
+
+    @property
+    def flux(self) -> pd.DataFrame:
+        if self.flux_matrix is None:
+            return None
+
+        return self.flux_matrix.to_dataframe()
+
+    @flux.setter
+    def flux(self, value) -> None:
+        if (value is None) or isinstance(value, structures.PulseMatrix):
+            self.flux_matrix = value
+        else:
+            self.flux_matrix = structures.PulseMatrix.from_dataframe(value)
+
+    @property
+    def smoothed_flux(self) -> pd.DataFrame:
+        if self.smoothed_flux_matrix is None:
+            return None
+
+        return self.smoothed_flux_matrix.to_dataframe()
+
+    @smoothed_flux.setter
+    def smoothed_flux(self, value) -> None:
+        if (value is None) or isinstance(value, structures.PulseMatrix):
+            self.smoothed_flux_matrix = value
+        else:
+            self.smoothed_flux_matrix = structures.PulseMatrix.from_dataframe(value)
+
+    def copy(self):
+        """
+        A method for deriving a new species from the transient, e.g., prior to calculating the rate.
+        The flux arrays are shared (copy-on-write) and are only copied when a transformation writes to them.
+        The reactor and the moments are copied, while the reference gas and the executor are shared, i.e., the derived species is calibrated to (and transforms) the same reference gas object as the transient.
+
+        Returns:
+            transient (Transient): The derived species.
+
+        See also:
+            tapsap.structures.PulseMatrix.share
+        """
+        new_transient = copy.copy(self)
+        if self.flux_matrix is not None:
+            new_transient.flux_matrix = self.flux_matrix.share()
+
+        if self.smoothed_flux_matrix is not None:
+            new_transient.smoothed_flux_matrix = self.smoothed_flux_matrix.share()
+
+        if self.df_moments is not None:
+            new_transient.df_moments = self.df_moments.copy()
+
+        new_transient.reactor = copy.deepcopy(self.reactor)
+        new_transient.integration_times = list(self.integration_times)
+
+        return new_transient
+
+    def append_pulses(self, transient, start:int = 0) -> None:
+        """
+        A method for adding the pulses of another transient of the same gas species after the last pulse, e.g., the new pulses of an experiment that is still being collected.
+        The flux, smoothed flux and moments of the new pulses are added as they are, so the new pulses should be processed in the same way prior to being added.
+
+        Args:
+            transient (Transient): The transient containing the new pulses.
+
+            start (int): The first pulse of the transient to add.
+
+        See also:
+            tapsap.structures.PulseMatrix.append
+
+            tapsap.structures.TdmsFollower
+        """
+        self.flux_matrix.append(transient.flux_matrix, start)
+        if self.smoothed_flux_matrix is not None:
+            if transient.smoothed_flux_matrix is None:
+                transient.smooth_flux()
+
+            self.smoothed_flux_matrix.append(transient.smoothed_flux_matrix, start)
+
+        self.df_moments = pd.concat([self.df_moments, transient.df_moments.iloc[start:]], ignore_index=True)
+        self.num_pulse = self.flux_matrix.num_pulse
+
+    def get_executor(self) -> structures.Executor:
+        """
+        A method for returning the executor used by the pulse-parallel methods.
+        When an Experiment is used, the executor is shared by all of the species in the experiment.
+
+        Returns:
+            executor (Executor): The executor for the transient.
+
+        See also:
+            tapsap.structures.Executor
+        """
+        if self.executor is None:
+            self.executor = structures.Executor(self.num_cores)
+
+        return self.executor
+
+    def _cache_key(self, stage:str, stage_params:dict, moments_columns:list) -> str:
+        # the flux, times, moments used by the stage and reference flux along with every parameter that changes the result of a stage
+        temp_arrays = [self.flux_matrix.values, None if self.smoothed_flux_matrix is None else self.smoothed_flux_matrix.values, self.times]
+        temp_arrays += [self.df_moments[j].values if j in self.df_moments.columns else None for j in moments_columns]
+        temp_params = {
+            'stage': stage_params,
+            'moments_columns': moments_columns,
+            'reactor': vars(self.reactor),
+            'smoothing_parameter': self.smoothing_parameter,
+            'diffusion': self.diffusion,
+            'mass': self.mass,
+            'chunk_size': self.chunk_size
+        }
+        if self.reference_gas is not None:
+            temp_arrays += [self.reference_gas.flux_matrix.values, None if self.reference_gas.smoothed_flux_matrix is None else self.reference_gas.smoothed_flux_matrix.values]
+            temp_params['reference_mass'] = self.reference_gas.mass
+            temp_params['reference_smoothing_parameter'] = self.reference_gas.smoothing_parameter
+            temp_params['reference_chunk_size'] = self.reference_gas.chunk_size
+
+        return self.cache.make_key(stage, temp_arrays, temp_params)
+
+    def _cache_results(self, moments_columns:list, reference_smoothed:bool) -> dict:
+        # the flux, smoothed flux and moments written by a stage, as well as the smoothed reference flux if the stage smoothed the reference gas (e.g., calibrate_flux)
+        results = {'flux': self.flux_matrix.values}
+        if self.smoothed_flux_matrix is not None:
+            results['smoothed_flux'] = self.smoothed_flux_matrix.values
+
+        for j in moments_columns:
+            if j in self.df_moments.columns:
+                results['moments_' + j] = self.df_moments[j].values
+
+        if (self.reference_gas is not None) and (not reference_smoothed) and (self.reference_gas.smoothed_flux_matrix is not None):
+            results['reference_smoothed_flux'] = self.reference_gas.smoothed_flux_matrix.values
+
+        return results
+
+    def _set_cache_results(self, results:dict) -> None:
+        self.flux_matrix.set_all(results['flux'])
+        if 'smoothed_flux' in results:
+            if self.smoothed_flux_matrix is None:
+                self.smoothed_flux_matrix = self.flux_matrix.map_chunks(lambda temp_flux, chunk: results['smoothed_flux'][chunk], self.chunk_size)
+            else:
+                self.smoothed_flux_matrix.set_all(results['smoothed_flux'])
+
+        for j in results.keys():
+            if j.startswith('moments_'):
+                self.df_moments[j[len('moments_'):]] = results[j]
+
+        # the reference flux was not smoothed when the key was made, so the stage smoothed it
+        if 'reference_smoothed_flux' in results:
+            self.reference_gas.smoothed_flux_matrix = self.reference_gas.flux_matrix.map_chunks(lambda temp_flux, chunk: results['reference_smoothed_flux'][chunk], self.reference_gas.chunk_size)
 
     def set_min_mean_max(self) -> None:
         """
@@ -83,7 +312,7 @@ class Transient():
             smooth_flux (bool): Smoothing the flux prior to optimization.
 
         See also:
-            tapsap.moments_analysis.moments
+            tapsap.moments_analysis.moments_batch
         """
         if find_integration_times:
             temp_integration = None
@@ -91,14 +320,16 @@ class Transient():
             temp_integration = self.integration_times
 
         if smooth_flux:
-            if not isinstance(self.smoothed_flux, pd.DataFrame):
+            if self.smoothed_flux_matrix is None:
                 self.smooth_flux()
             
-            temp_result = moments_analysis.moments(self.smoothed_flux, self.times, temp_integration)
+            temp_matrix = self.smoothed_flux_matrix
         else:
-            temp_result = moments_analysis.moments(self.flux, self.times, temp_integration)
-        for j in temp_result.keys():
-            self.df_moments[j] = temp_result[j]
+            temp_matrix = self.flux_matrix
+
+        temp_results = [moments_analysis.moments_batch(temp_matrix.values[chunk], self.times, temp_integration) for chunk in temp_matrix.get_chunks(self.chunk_size)]
+        for j in temp_results[0].keys():
+            self.df_moments[j] = np.concatenate([temp_result[j] for temp_result in temp_results])
 
     def set_gas_diffusion(self) -> None:
         """
@@ -181,6 +412,7 @@ class Transient():
         for j in temp_result.keys():
             self.df_moments[j] = temp_result[j]
 
+    @_cached_stage(['baseline'])
     def baseline_correct(self, baseline_time_range:list=None, baseline_amount:float=None, smooth_flux:bool=True) -> None:
         """
         A method for traditional baseline correction by either a baseline amount or baseline time range.
@@ -194,9 +426,9 @@ class Transient():
             smooth_flux (bool): Smoothing the flux prior to optimization.
 
         See also:
-            tapsap.preprocess.baseline_correction
+            tapsap.preprocess.baseline_correction_batch
 
-            tapsap.preprocess.baseline_gamma
+            tapsap.preprocess.baseline_gamma_batch
 
         """
         moments_keys = list(self.df_moments.keys())
@@ -204,43 +436,41 @@ class Transient():
             self.df_moments['baseline'] = np.zeros(self.num_pulse)
 
         if smooth_flux:
-            if not isinstance(self.smoothed_flux, pd.DataFrame):
+            if self.smoothed_flux_matrix is None:
                 self.smooth_flux()
 
         temp_baseline = np.zeros(self.num_pulse)
-        if (baseline_time_range is None) & (baseline_amount is None):
-            if smooth_flux:
-                temp_args = [(self.smoothed_flux.iloc[:,i].values, self.times) for i in range(self.num_pulse)]
+        def baseline_chunk(temp_flux, chunk):
+            if (baseline_time_range is None) & (baseline_amount is None):
+                results = preprocess.baseline_gamma_batch(temp_flux, self.times)
             else:
-                temp_args = [(self.flux.iloc[:,i].values, self.times) for i in range(self.num_pulse)]
-            
-            pool = mp.Pool(self.num_cores)
-            results = pool.starmap(preprocess.baseline_gamma, temp_args)
-            pool.close()
-            pool.join()
-        else:
-            results = [preprocess.baseline_correction(self.flux.iloc[:,i].values, self.times, baseline_time_range, baseline_amount) for i in range(self.num_pulse)]
+                results = preprocess.baseline_correction_batch(temp_flux, self.times, baseline_time_range, baseline_amount)
+
+            temp_baseline[chunk] = results['baseline_amount']
+            return results['flux']
+
+        if (baseline_time_range is not None) | (baseline_amount is not None):
             smooth_flux = False
 
-        for i, result in enumerate(results):
-            if smooth_flux:
-                self.smoothed_flux.iloc[:,i] = result['flux']
-                self.flux.iloc[:,i] -= result['baseline_amount']
-            else:
-                self.flux.iloc[:,i] = result['flux']
-                if isinstance(self.smoothed_flux, pd.DataFrame):
-                    self.smoothed_flux.iloc[:,i] -= result['baseline_amount']
-            
-            temp_baseline[i] = result['baseline_amount']
+        if smooth_flux:
+            self.smoothed_flux_matrix.update_chunks(baseline_chunk, self.chunk_size)
+            self.flux_matrix.update_chunks(lambda temp_flux, chunk: temp_flux - temp_baseline[chunk, None], self.chunk_size)
+        else:
+            self.flux_matrix.update_chunks(baseline_chunk, self.chunk_size)
+            if self.smoothed_flux_matrix is not None:
+                self.smoothed_flux_matrix.update_chunks(lambda temp_flux, chunk: temp_flux - temp_baseline[chunk, None], self.chunk_size)
 
         self.df_moments['baseline'] = self.df_moments['baseline'] + temp_baseline
 
-    def calibrate_flux(self, calibration_amount: float = None, reference_index:np.ndarray=None, smooth_flux: bool = True, huber_loss: bool = False, constraints:bool = True, fit_intercept:bool = True, enforce_max:bool = False) -> None:
+    @_cached_stage(['calibration_coef', 'intercept', 'baseline'])
+    def calibrate_flux(self, calibration_amount: float = None, reference_index:np.ndarray=None, smooth_flux: bool = True, huber_loss: bool = False, constraints:bool = True, fit_intercept:bool = True, enforce_max:bool = False, backend:str = 'cvxpy', drift_subsample:int = None, drift_smoothing:float = 0.99) -> None:
         """
         A method for applying a calibration coefficient to the flux (multiplied).
         This method has the option to do traditional calibration via a calibration amount or if None, then will perform transient calibration.
         When the reference_index is not None, then this will loop over all flux and calibrate to a specific flux. 
         The reference flux is usefull when accounting for drift in the inert flux.
+        When the drift_subsample is also not None, then only a subsample of the flux is calibrated to the reference flux and the calibration of every flux is a smooth drift model of the subsample (see tapsap.preprocess.drift_model).
+        Check the drift model against the calibration of every flux via drift_error prior to application.
 
         Args:
             calibration_amount (float): The amount to scale the flux.
@@ -257,6 +487,12 @@ class Transient():
 
             enforce_max (bool): Enforce the maximum of the X values must be less than y.
 
+            backend (str): The tap_mix solver. Options: cvxpy, numpy.
+
+            drift_subsample (int): The number of flux, evenly spaced across the pulses (including the reference), used to fit the drift model.  If None, then every flux is calibrated to the reference flux.
+
+            drift_smoothing (float): The smoothing parameter of the drift model.
+
         See also:
             tapsap.preprocess.calibration_coef
 
@@ -264,6 +500,8 @@ class Transient():
 
             tapsap.preprocess.calibration_teak
 
+            tapsap.preprocess.drift_model
+
         """
         moments_keys = list(self.df_moments.keys())
         if 'calibration_coef' not in moments_keys:
@@ -274,59 +512,209 @@ class Transient():
             self.df_moments['baseline'] = np.zeros(self.num_pulse)
 
         if smooth_flux:
-            if not isinstance(self.smoothed_flux, pd.DataFrame):
+            if self.smoothed_flux_matrix is None:
                 self.smooth_flux()
 
         temp_coef = np.zeros(self.num_pulse)
         temp_intercept = np.zeros(self.num_pulse)
         if calibration_amount is not None:
-            results = [preprocess.calibration_coef(self.flux.iloc[:,i].values, calibration_amount=calibration_amount) for i in range(self.num_pulse)]
             smooth_flux = False
-        elif reference_index is not None:
+
+        temp_reference = None
+        if (calibration_amount is None) and (reference_index is not None):
             if smooth_flux:
-                temp_args = [(self.smoothed_flux.iloc[:,i].values, self.smoothed_flux.iloc[:, reference_index].values, self.times, huber_loss, constraints, fit_intercept, enforce_max) for i in range(self.num_pulse)]
+                temp_reference = self.smoothed_flux_matrix.values[reference_index].copy()
             else:
-                temp_args = [(self.flux.iloc[:,i].values, self.flux.iloc[:, reference_index].values, self.times, huber_loss, constraints, fit_intercept, enforce_max) for i in range(self.num_pulse)]
-            pool = mp.Pool(self.num_cores)
-            results = pool.starmap(preprocess.tap_mix, temp_args)
-            pool.close()
-            pool.join()
+                temp_reference = self.flux_matrix.values[reference_index].copy()
+        elif (calibration_amount is None) and smooth_flux:
+            if self.reference_gas.smoothed_flux_matrix is None:
+                self.reference_gas.smooth_flux()
+
+            temp_reference = self.reference_gas.smoothed_flux_matrix.values
+        elif calibration_amount is None:
+            temp_reference = self.reference_gas.flux_matrix.values
+
+        def calibration_chunk(temp_flux, chunk):
+            if calibration_amount is not None:
+                results = [preprocess.calibration_coef(temp_flux[i], calibration_amount=calibration_amount) for i in range(temp_flux.shape[0])]
+                for i, result in enumerate(results):
+                    temp_coef[chunk.start + i] = result['calibration_coef']
+                    temp_intercept[chunk.start + i] = result['intercept']
+
+                return [result['flux'] for result in results]
+
+            if reference_index is not None:
+                chunk_reference = [temp_reference] * temp_flux.shape[0]
+            else:
+                chunk_reference = temp_reference[chunk]
+
+            chunk_results = self._tap_mix_batch(temp_flux, chunk_reference, huber_loss, constraints, fit_intercept, enforce_max, backend)
+            temp_coef[chunk] = chunk_results['calibration_coef']
+            temp_intercept[chunk] = chunk_results['intercept']
+            return temp_flux * temp_coef[chunk, None] + temp_intercept[chunk, None]
+
+        def scale_chunk(temp_flux, chunk):
+            return temp_flux * temp_coef[chunk, None] + temp_intercept[chunk, None]
+
+        if (calibration_amount is None) and (reference_index is not None) and (drift_subsample is not None):
+            drift_results = self._drift_fit(reference_index, drift_subsample, drift_smoothing, smooth_flux, huber_loss, constraints, fit_intercept, enforce_max, backend)
+            temp_coef[:] = drift_results['calibration_coef']
+            temp_intercept[:] = drift_results['intercept']
+            self.flux_matrix.update_chunks(scale_chunk, self.chunk_size)
+            if self.smoothed_flux_matrix is not None:
+                self.smoothed_flux_matrix.update_chunks(scale_chunk, self.chunk_size)
+        elif smooth_flux:
+            self.smoothed_flux_matrix.update_chunks(calibration_chunk, self.chunk_size)
+            self.flux_matrix.update_chunks(scale_chunk, self.chunk_size)
         else:
-            if smooth_flux:
-                if not isinstance(self.smoothed_flux, pd.DataFrame):
-                    self.reference_gas.smooth_flux()
+            self.flux_matrix.update_chunks(calibration_chunk, self.chunk_size)
+            if self.smoothed_flux_matrix is not None:
+                self.smoothed_flux_matrix.update_chunks(scale_chunk, self.chunk_size)
 
-                temp_args = [(self.smoothed_flux.iloc[:,i].values, self.reference_gas.smoothed_flux.iloc[:,i].values, self.times, huber_loss, constraints, fit_intercept, enforce_max) for i in range(self.num_pulse)]
+
+        self.df_moments['calibration_coef'] = self.df_moments['calibration_coef'] * temp_coef
+        self.df_moments['intercept'] = temp_intercept
+        self.df_moments['baseline'] = self.df_moments['baseline'] - temp_intercept[-1]
+
+    def drift_error(self, reference_index:int, drift_subsample:int = 20, drift_smoothing:float = 0.99, smooth_flux:bool = True, huber_loss: bool = False, constraints:bool = True, fit_intercept:bool = True, enforce_max:bool = False, backend:str = 'cvxpy') -> pd.DataFrame:
+        """
+        A method for comparing the drift model of the calibration to calibrating every flux to the reference flux (see calibrate_flux).
+        The flux is not changed.
+
+        Args:
+            reference_index (int): The index in which to calibrate all other flux.
+
+            drift_subsample (int): The number of flux used to fit the drift model.
+
+            drift_smoothing (float): The smoothing parameter of the drift model.
+
+            smooth_flux (bool): Smoothing the flux prior to optimization.
+
+            huber_loss (bool): Use a robust loss function rather than the standard square error loss.
+
+            constraints (bool): This controls whether contrained regression is performed.
+
+            fit_intercept (bool): Fit the intercept within the convex optimization.
+
+            enforce_max (bool): Enforce the maximum of the X values must be less than y.
+
+            backend (str): The tap_mix solver. Options: cvxpy, numpy.
+
+        Returns:
+            df_error (dataframe): The calibration coefficient and intercept of each flux from both the full fit and the drift model, the relative error of the coefficient and the root mean square error between the calibrated flux.
+        """
+        if smooth_flux and (self.smoothed_flux_matrix is None):
+            self.smooth_flux()
+
+        temp_matrix = self.smoothed_flux_matrix if smooth_flux else self.flux_matrix
+        temp_reference = temp_matrix.values[reference_index].copy()
+        full_results = self._reference_fit(np.arange(self.num_pulse), temp_reference, smooth_flux, huber_loss, constraints, fit_intercept, enforce_max, backend)
+        drift_results = self._drift_fit(reference_index, drift_subsample, drift_smoothing, smooth_flux, huber_loss, constraints, fit_intercept, enforce_max, backend)
+        coef_diff = drift_results['calibration_coef'] - full_results['calibration_coef']
+        intercept_diff = drift_results['intercept'] - full_results['intercept']
+        flux_error = np.concatenate([np.sqrt(np.mean((temp_matrix.values[chunk] * coef_diff[chunk, None] + intercept_diff[chunk, None])**2, axis=1)) for chunk in temp_matrix.get_chunks(self.chunk_size)])
+        df_error = pd.DataFrame({
+            'calibration_coef': full_results['calibration_coef'],
+            'drift_coef': drift_results['calibration_coef'],
+            'intercept': full_results['intercept'],
+            'drift_intercept': drift_results['intercept'],
+            'coef_error': np.abs(coef_diff) / np.abs(full_results['calibration_coef']),
+            'flux_error': flux_error
+        })
+
+        return df_error
+
+    def _reference_fit(self, pulse_index:np.ndarray, temp_reference:np.ndarray, smooth_flux:bool, huber_loss:bool, constraints:bool, fit_intercept:bool, enforce_max:bool, backend:str) -> dict:
+        # the calibration of the selected flux to the reference flux without changing the flux
+        temp_matrix = self.smoothed_flux_matrix if smooth_flux else self.flux_matrix
+        return self._tap_mix_batch(temp_matrix.values[pulse_index], [temp_reference] * len(pulse_index), huber_loss, constraints, fit_intercept, enforce_max, backend)
+
+    def _tap_mix_batch(self, temp_flux:np.ndarray, temp_reference:np.ndarray, huber_loss:bool, constraints:bool, fit_intercept:bool, enforce_max:bool, backend:str) -> dict:
+        # the tap_mix calibration of each row of temp_flux to the same row of temp_reference
+        # the numpy backend solves every row at once (as tapsap.preprocess.tap_mix_joint), otherwise each row is a task of the executor
+        num_rows = temp_flux.shape[0]
+        temp_coef = np.ones(num_rows)
+        temp_intercept = np.zeros(num_rows)
+        unsolved = np.arange(num_rows)
+        if backend == 'numpy':
+            temp_reference = np.asarray(temp_reference, dtype=float)
+            # the flux that is only noise is not calibrated, as in tapsap.preprocess.tap_mix
+            flux_median = np.median(temp_flux, axis=1)
+            flux_ci = flux_median + 6 * np.median(abs(temp_flux - flux_median[:, None]), axis=1)
+            unsolved = np.where(temp_flux.max(axis=1) >= flux_ci)[0]
+            design = temp_flux[unsolved][:, :, None]
+            if fit_intercept:
+                design = np.concatenate((np.ones_like(design), design), axis=2)
+
+            if huber_loss:
+                fit_coefs = preprocess.tap_mix_irls(design, temp_reference[unsolved], self.times, constraints, fit_intercept, enforce_max)
             else:
-                temp_args = [(self.flux.iloc[:,i].values, self.reference_gas.flux.iloc[:,i].values, self.times, huber_loss, constraints, fit_intercept, enforce_max) for i in range(self.num_pulse)]
-            pool = mp.Pool(self.num_cores)
-            results = pool.starmap(preprocess.tap_mix, temp_args)
-            pool.close()
-            pool.join()
+                fit_coefs = preprocess.tap_mix_qp(design, temp_reference[unsolved], self.times, constraints, fit_intercept, enforce_max)
 
-        for i, result in enumerate(results):
+            solved = ~np.isnan(fit_coefs).any(axis=1)
+            temp_coef[unsolved[solved]] = fit_coefs[solved, -1]
+            if fit_intercept:
+                temp_intercept[unsolved[solved]] = fit_coefs[solved, 0]
+
+            # the rows that are not solved fall back to cvxpy
+            unsolved = unsolved[~solved]
+            backend = 'cvxpy'
+
+        temp_args = [(temp_flux[i], temp_reference[i], self.times, huber_loss, constraints, fit_intercept, enforce_max, backend) for i in unsolved]
+        results = self.get_executor().starmap(preprocess.tap_mix, temp_args)
+        for i, result in zip(unsolved, results):
             temp_calibration_coef = result['calibration_coef']
             if isinstance(temp_calibration_coef, list):
                 temp_calibration_coef = temp_calibration_coef[0]
 
             temp_coef[i] = temp_calibration_coef
             temp_intercept[i] = result['intercept']
-            if smooth_flux:
-                self.flux.iloc[:,i] *= temp_calibration_coef
-                self.flux.iloc[:,i] += result['intercept']
-                self.smoothed_flux.iloc[:,i] = result['flux']
-            else:
-                self.flux.iloc[:,i] = result['flux']
-                if isinstance(self.smoothed_flux, pd.DataFrame):
-                    self.smoothed_flux.iloc[:,i] *= temp_calibration_coef  
-                    self.smoothed_flux.iloc[:,i] += result['intercept']  
 
+        return {'calibration_coef': temp_coef, 'intercept': temp_intercept}
+
+    def _drift_fit(self, reference_index:int, drift_subsample:int, drift_smoothing:float, smooth_flux:bool, huber_loss:bool, constraints:bool, fit_intercept:bool, enforce_max:bool, backend:str) -> dict:
+        # the drift model of every flux from the calibration of an evenly spaced subsample
+        temp_matrix = self.smoothed_flux_matrix if smooth_flux else self.flux_matrix
+        temp_reference = temp_matrix.values[reference_index].copy()
+        pulse_index = np.unique(np.append(np.linspace(0, self.num_pulse - 1, max(drift_subsample, 1)).round().astype(int), reference_index % self.num_pulse))
+        subsample_results = self._reference_fit(pulse_index, temp_reference, smooth_flux, huber_loss, constraints, fit_intercept, enforce_max, backend)
+        return preprocess.drift_model(pulse_index, subsample_results['calibration_coef'], subsample_results['intercept'], self.num_pulse, drift_smoothing)
+
+    def apply_calibration(self, calibration_coef:np.ndarray, intercept:np.ndarray) -> None:
+        """
+        A method for applying a calibration coefficient and intercept to each flux and smoothed flux that were found elsewhere, e.g., by the joint calibration of every species (see tapsap.structures.Experiment.calibrate_all_species).
+        The moments are updated as in calibrate_flux.
+
+        Args:
+            calibration_coef (float ndarray): The calibration coefficient of each pulse.
+
+            intercept (float ndarray): The intercept of each pulse.
+
+        See also:
+            tapsap.preprocess.tap_mix_joint
+        """
+        moments_keys = list(self.df_moments.keys())
+        if 'calibration_coef' not in moments_keys:
+            self.df_moments['calibration_coef'] = np.ones(self.num_pulse)
+            self.df_moments['intercept'] = np.zeros(self.num_pulse)
+
+        if 'baseline' not in moments_keys:
+            self.df_moments['baseline'] = np.zeros(self.num_pulse)
+
+        temp_coef = np.asarray(calibration_coef, dtype=float)
+        temp_intercept = np.asarray(intercept, dtype=float)
+        def scale_chunk(temp_flux, chunk):
+            return temp_flux * temp_coef[chunk, None] + temp_intercept[chunk, None]
+
+        self.flux_matrix.update_chunks(scale_chunk, self.chunk_size)
+        if self.smoothed_flux_matrix is not None:
+            self.smoothed_flux_matrix.update_chunks(scale_chunk, self.chunk_size)
 
         self.df_moments['calibration_coef'] = self.df_moments['calibration_coef'] * temp_coef
         self.df_moments['intercept'] = temp_intercept
-        self.df_moments['baseline'] = self.df_moments['baseline'] - result['intercept']
-
+        self.df_moments['baseline'] = self.df_moments['baseline'] - temp_intercept[-1]
 
+    @_cached_stage([])
     def set_concentration(self, y_smoothing:float=None, post_smoothing:bool=True) -> None:
         """
         A method calculates the gas concentration from the available flux.
@@ -342,28 +730,30 @@ class Transient():
         See also:
             tapsap.transient_analysis.concentration_g
 
+            tapsap.transient_analysis.concentration_g_batch
+
             tapsap.transient_analysis.concentration_y
 
+            tapsap.transient_analysis.concentration_y_batch
+
             tapsap.transient_analysis.smooth_flux_gam
 
         """
-        pool = mp.Pool(self.num_cores)
-        if y_smoothing is None:
-            temp_args = [(self.flux.iloc[:,i].values, self.times, self.reactor.zone_lengths) for i in range(self.num_pulse)]
-            results = pool.starmap(transient_analysis.concentration_g, temp_args)
-        else:
-            temp_args = [(self.flux.iloc[:,i].values, self.times, self.diffusion, self.reactor.zone_lengths, self.reactor.zone_porosity, y_smoothing) for i in range(self.num_pulse)]
-            results = pool.starmap(transient_analysis.concentration_y, temp_args)
-
-        pool.close()
-        pool.join()
         temp_units = transient_analysis.concentration_units(self.diffusion, self.reactor.zone_lengths, self.reactor.reactor_radius, self.reactor.mol_per_pulse)
-        for i, result in enumerate(results):
-            self.flux.iloc[:,i] = result * temp_units
+        def concentration_chunk(temp_flux, chunk):
+            if y_smoothing is None:
+                results = transient_analysis.concentration_g_batch(temp_flux, self.times, self.reactor.zone_lengths)
+            else:
+                results = transient_analysis.concentration_y_batch(temp_flux, self.times, self.diffusion, self.reactor.zone_lengths, self.reactor.zone_porosity, y_smoothing)
+
+            return results * temp_units
+
+        self.flux_matrix.update_chunks(concentration_chunk, self.chunk_size)
 
         if post_smoothing:
             self.smooth_flux()
 
+    @_cached_stage([])
     def set_rate(self, y_smoothing:float=None, isreactant:bool = False, post_smoothing:bool=True) -> None:
         """
         A method calculates the rate from the available flux.
@@ -381,34 +771,32 @@ class Transient():
         See also:
             tapsap.transient_analysis.rate_g
 
+            tapsap.transient_analysis.rate_g_batch
+
             tapsap.transient_analysis.rate_y
 
+            tapsap.transient_analysis.rate_y_batch
+
             tapsap.transient_analysis.smooth_flux_gam
 
         """
-        if isreactant:
-            pool = mp.Pool(self.num_cores)
-            temp_args = [(self.reference_gas.flux.iloc[:,i].values, self.times, self.reference_gas.mass, self.mass) for i in range(self.num_pulse)]
-            inert_flux = pool.starmap(diffusion.grahams_law, temp_args)
-            pool.close()
-            pool.join()
-        else:
-            inert_flux = [None] * self.num_pulse
+        temp_units = transient_analysis.rate_units(self.reactor.mol_per_pulse, self.reactor.catalyst_weight)
+        def rate_chunk(temp_flux, chunk):
+            if isreactant:
+                temp_reference = self.reference_gas.flux_matrix.values[chunk]
+                temp_args = [(temp_reference[i], self.times, self.reference_gas.mass, self.mass) for i in range(temp_reference.shape[0])]
+                inert_flux = np.array(self.get_executor().starmap(diffusion.grahams_law, temp_args))
+            else:
+                inert_flux = None
 
-        pool = mp.Pool(self.num_cores)
-        if y_smoothing is None:
-            temp_args = [(self.flux.iloc[:,i].values, self.times, self.reactor.zone_lengths, inert_flux[i]) for i in range(self.num_pulse)]
-            results = pool.starmap(transient_analysis.rate_g, temp_args)
-        else:
-            temp_args = [(self.flux.iloc[:,i].values, self.times, self.diffusion, self.reactor.zone_lengths, self.reactor.zone_porosity, inert_flux[i], y_smoothing) for i in range(self.num_pulse)]
-            results = pool.starmap(transient_analysis.rate_y, temp_args)
+            if y_smoothing is None:
+                results = transient_analysis.rate_g_batch(temp_flux, self.times, self.reactor.zone_lengths, inert_flux)
+            else:
+                results = transient_analysis.rate_y_batch(temp_flux, self.times, self.diffusion, self.reactor.zone_lengths, self.reactor.zone_porosity, inert_flux, y_smoothing)
 
-        pool.close()
-        pool.join()
+            return results * temp_units
 
-        temp_units = transient_analysis.rate_units(self.reactor.mol_per_pulse, self.reactor.catalyst_weight)
-        for i, result in enumerate(results):
-            self.flux.iloc[:,i] = result * temp_units
+        self.flux_matrix.update_chunks(rate_chunk, self.chunk_size)
 
         if post_smoothing:
             self.smooth_flux()
@@ -419,31 +807,37 @@ class Transient():
         This method applies a cumulative intergral to the flux (preferably the rate to get the accumulation).
 
         """
-        for i in range(self.num_pulse):
-            self.flux.iloc[:,i] = np.cumsum(self.flux.iloc[:,i].values) * (self.times[1] - self.times[0])
+        def accumulation_chunk(temp_flux, chunk):
+            return np.cumsum(temp_flux, axis=1) * (self.times[1] - self.times[0])
 
-        if self.smoothed_flux is not None:
-            for i in range(self.num_pulse):
-                self.smoothed_flux.iloc[:,i] = np.cumsum(self.smoothed_flux.iloc[:,i].values) * (self.times[1] - self.times[0])
+        self.flux_matrix.update_chunks(accumulation_chunk, self.chunk_size)
 
+        if self.smoothed_flux_matrix is not None:
+            self.smoothed_flux_matrix.update_chunks(accumulation_chunk, self.chunk_size)
 
-    def smooth_flux(self) -> None:
+
+    @_cached_stage([])
+    def smooth_flux(self, batch:bool = True) -> None:
         """
         This method applies smooth_flux_gam to each flux.
 
+        Args:
+            batch (bool): Smooth all of the flux in a single spline solve.  If False, then each flux is smoothed separately by the executor.
+
         See also:
             tapsap.transient_analysis.smooth_flux_gam
 
+            tapsap.preprocess.smooth_flux_gam_batch
+
         """
-        self.smoothed_flux = copy.deepcopy(self.flux)
-        pool = mp.Pool(self.num_cores)
-        temp_args = [(self.smoothed_flux.iloc[:,i].values, self.smoothing_parameter) for i in range(self.num_pulse)]
-        results = pool.starmap(preprocess.smooth_flux_gam, temp_args)
-        pool.close()
-        pool.join()
-        
-        for i, result in enumerate(results):
-            self.smoothed_flux.iloc[:,i] = result
+        def smooth_chunk(temp_flux, chunk):
+            if batch:
+                return preprocess.smooth_flux_gam_batch(temp_flux, self.smoothing_parameter)
+
+            temp_args = [(temp_flux[i], self.smoothing_parameter) for i in range(temp_flux.shape[0])]
+            return self.get_executor().starmap(preprocess.smooth_flux_gam, temp_args)
+
+        self.smoothed_flux_matrix = self.flux_matrix.map_chunks(smooth_chunk, self.chunk_size)
 
 
     def grahams_law(self, new_mass:float) -> None:
@@ -457,25 +851,17 @@ class Transient():
             tapsap.diffusion.grahams_law
 
         """
-        pool = mp.Pool(self.num_cores)
-        temp_args = [(self.flux.iloc[:,i].values, self.times, self.mass, new_mass) for i in range(self.num_pulse)]
-        results = pool.starmap(diffusion.grahams_law, temp_args)
-        pool.close()
-        pool.join()
-        
-        self.mass = new_mass
-        for i, result in enumerate(results):
-            self.flux.iloc[:,i] = result
+        old_mass = self.mass
+        def grahams_chunk(temp_flux, chunk):
+            temp_args = [(temp_flux[i], self.times, old_mass, new_mass) for i in range(temp_flux.shape[0])]
+            return self.get_executor().starmap(diffusion.grahams_law, temp_args)
 
-        if isinstance(self.smoothed_flux, pd.DataFrame):
-            pool = mp.Pool(self.num_cores)
-            temp_args = [(self.smoothed_flux.iloc[:,i].values, self.times, self.mass, new_mass) for i in range(self.num_pulse)]
-            results = pool.starmap(diffusion.grahams_law, temp_args)
-            pool.close()
-            pool.join()
+        self.flux_matrix.update_chunks(grahams_chunk, self.chunk_size)
+        self.mass = new_mass
 
-            for i, result in enumerate(results):
-                self.smoothed_flux.iloc[:,i] = result
+        if self.smoothed_flux_matrix is not None:
+            old_mass = self.mass
+            self.smoothed_flux_matrix.update_chunks(grahams_chunk, self.chunk_size)
 
 
     def remove_delay_time(self) -> None:
@@ -484,8 +870,8 @@ class Transient():
 
         """
         remove_index_end = abs(self.times - self.delay_time).argmin()
-        self.flux.drop(self.flux.index[0:remove_index_end], inplace=True)
-        self.times = self.times[0:self.flux.shape[0]]
+        self.flux_matrix = self.flux_matrix.slice_samples(remove_index_end, None)
+        self.times = self.times[0:self.flux_matrix.num_samples]
         self.integration_times = [self.integration_times[0], min(self.integration_times[1], max(self.times))]
 
 
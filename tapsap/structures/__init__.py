@@ -1,5 +1,8 @@
+from .Executor import Executor
 from .Experiment import Experiment
+from .PulseMatrix import PulseMatrix
 from .Reactor import Reactor
+from .ResultCache import ResultCache
+from .TdmsFollower import TdmsFollower
+from .TdmsPulseSource import TdmsPulseSource
 from .Transient import Transient
-
-
@@ -2,8 +2,12 @@
 import unittest
 from tapsap import file_io
 import io
+import os
 import pkgutil
+import tempfile
 import tapsap
+import pandas as pd
+import numpy as np
 import nptdms
 from numpy import unique, array
 
@@ -26,6 +30,7 @@ class TestFileIO(unittest.TestCase):
         self.transient_excel_shape = [2501, 103]
         self.transient_shape = [2500, 101]
         self.transient_shape = [2500, 2]
+        self.transient_shape_flux = [2500, 100]
 
     def test_read_tdms(self) -> None:
         """
@@ -33,6 +38,59 @@ class TestFileIO(unittest.TestCase):
         """
         test_tdms = file_io.read_tdms(io.BytesIO(self.stream))
         self.assertEqual(test_tdms.num_samples_per_pulse, 2500)
+        test_transient = test_tdms.species_data['AMU_40_1']
+        self.assertListEqual(self.actual_meta_data_list, [test_tdms.pulse_spacing, test_tdms.collection_time, test_transient.delay_time, test_transient.name, test_transient.gain, test_transient.mass])
+        self.assertTrue((test_transient.flux['7'].values == self.base_file["/'1'/'7'"].values[1:]).all())
+        self.assertEqual(test_transient.df_moments['temperature'][6], self.base_file["/'1'/'7'"].values[0])
+
+    def test_read_tdms_lazy(self) -> None:
+        """
+        Test to verify the on demand reading of the read tdms function.
+        """
+        with file_io.read_tdms(io.BytesIO(self.stream), species=['AMU_40_1'], pulse_range=[10, 20], lazy=True) as test_tdms:
+            test_transient = test_tdms.species_data['AMU_40_1']
+            self.assertIsNotNone(test_transient.flux_source)
+            self.assertListEqual(list(test_transient.df_moments['pulse_number']), list(range(11, 21)))
+            self.assertListEqual(list(test_transient.flux.shape), [2500, 10])
+            self.assertIsNone(test_transient.flux_source)
+            self.assertTrue((test_transient.flux['11'].values == self.base_file["/'1'/'11'"].values[1:]).all())
+
+    def test_read_tdms_lazy_open(self) -> None:
+        """
+        Test to verify the on demand reading of the read tdms function does not read the pulse channels on open.
+        """
+        class CountingStream(io.BytesIO):
+            bytes_read = 0
+
+            def read(self, size=-1):
+                data = super().read(size)
+                self.bytes_read += len(data)
+                return data
+
+            def readinto(self, buffer):
+                num_bytes = super().readinto(buffer)
+                self.bytes_read += num_bytes
+                return num_bytes
+
+        temp_stream = CountingStream(self.stream)
+        with file_io.read_tdms(temp_stream, lazy=True) as test_tdms:
+            # the meta data, the meta data group and the time channel
+            self.assertLess(temp_stream.bytes_read, len(self.stream) / 20)
+            open_bytes = temp_stream.bytes_read
+            test_transient = test_tdms.species_data['AMU_40_1']
+            self.assertEqual(test_transient.df_moments['temperature'][6], self.base_file["/'1'/'7'"].values[0])
+            # a single value per pulse
+            self.assertEqual(temp_stream.bytes_read - open_bytes, 8 * test_transient.num_pulse)
+            self.assertIsNotNone(test_transient.flux_source)
+
+    def test_read_tdms_meta_data(self) -> None:
+        """
+        Test to verify the read tdms meta data function.
+        """
+        with nptdms.TdmsFile.open(io.BytesIO(self.stream)) as tdms_file:
+            test_meta_data = file_io.read_tdms_meta_data(tdms_file)
+        self.assertEqual(test_meta_data['AMU 1'], '40')
+        self.assertEqual(test_meta_data['Pulse Spacing (s)'], '5.1')
 
     def test_experiment_to_df(self) -> None:
         """
@@ -71,6 +129,166 @@ class TestFileIO(unittest.TestCase):
         test_shape = list(test_df.shape)
         self.assertListEqual(test_shape, self.transient_excel_shape)
 
+    def test_binary(self) -> None:
+        """
+        Test to verify the write and read binary functions.
+        """
+        temp_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[temp_keys[0]]
+        temp_transient.set_moments()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_io.write_binary(self.experiment, temp_dir)
+            test_experiment = file_io.read_binary(temp_dir)
+            test_transient = test_experiment.species_data[temp_keys[0]]
+            self.assertTrue(test_transient.flux.equals(temp_transient.flux))
+            self.assertTrue(test_transient.df_moments.equals(temp_transient.df_moments))
+            self.assertEqual(test_experiment.pulse_spacing, self.experiment.pulse_spacing)
+            self.assertEqual(test_transient.gain, temp_transient.gain)
+
+    def test_binary_read_only(self) -> None:
+        """
+        Test to verify a read only binary read can be baseline corrected, restores the reactor of each species and checks the format version.
+        """
+        temp_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[temp_keys[0]].copy()
+        temp_transient.reactor.catalyst_weight = 2.5
+        temp_experiment = tapsap.structures.Experiment()
+        temp_experiment.species_data['species'] = temp_transient
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_io.write_binary(temp_experiment, temp_dir)
+            flux_file = os.path.join(temp_dir, '0', 'flux_matrix.npy')
+            flux_values = np.load(flux_file)
+            test_experiment = file_io.read_binary(temp_dir, mmap_mode='r')
+            test_transient = test_experiment.species_data['species']
+            self.assertEqual(test_transient.reactor.catalyst_weight, 2.5)
+            self.assertIsNot(test_transient.reactor, test_experiment.reactor)
+            test_transient.baseline_correct(baseline_amount=0.1, smooth_flux=False)
+            self.assertTrue(np.allclose(test_transient.flux.values, flux_values.T - 0.1))
+            self.assertTrue(np.array_equal(np.load(flux_file), flux_values))
+            del test_experiment, test_transient
+
+            temp_file = os.path.join(temp_dir, 'experiment.json')
+            with open(temp_file, 'r') as f:
+                temp_json = f.read()
+            with open(temp_file, 'w') as f:
+                f.write(temp_json.replace('"format_version": 2', '"format_version": 99'))
+            with self.assertRaises(ValueError):
+                file_io.read_binary(temp_dir)
+
+    def test_write_xlsx_stream(self) -> None:
+        """
+        Test to verify the write to excel function leaves the experiment untouched.
+        """
+        temp_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[temp_keys[0]]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'experiment.xlsx')
+            file_io.write_xlsx(self.experiment, temp_file)
+            self.assertListEqual(list(temp_transient.flux.shape), self.transient_shape_flux)
+            test_df = pd.read_excel(temp_file, sheet_name=temp_transient.name)
+            temp_df = file_io.transient_to_xlsx(temp_transient)
+            self.assertListEqual(list(test_df.shape), self.transient_excel_shape)
+            self.assertTrue(np.allclose(test_df.iloc[:, 2:].values.astype(float), temp_df.iloc[:, 2:].values.astype(float)))
+
+    def test_read_xlsx_packaged(self) -> None:
+        """
+        Test to verify the read xlsx function on the packaged workbook, which contains a simulation sheet.
+        """
+        test_experiment = file_io.read_xlsx(io.BytesIO(pkgutil.get_data('tapsap', 'data/argon_100C.xlsx')))
+        self.assertListEqual(list(test_experiment.species_data.keys()), ['AMU_40_1'])
+        test_transient = test_experiment.species_data['AMU_40_1']
+        self.assertListEqual(list(test_transient.flux.shape), self.transient_shape_flux)
+        self.assertTrue(np.allclose(test_transient.flux_matrix.values, self.experiment.species_data['AMU_40_1'].flux_matrix.values))
+
+    def test_read_xlsx_labels(self) -> None:
+        """
+        Test to verify the read xlsx function labels the samples and pulses as the read tdms function.
+        """
+        for pulse_range in [None, [10, 20]]:
+            test_experiment = file_io.read_xlsx(io.BytesIO(pkgutil.get_data('tapsap', 'data/argon_100C.xlsx')), pulse_range=pulse_range)
+            temp_experiment = file_io.read_tdms(io.BytesIO(pkgutil.get_data('tapsap', 'data/argon_100C.tdms')), pulse_range=pulse_range)
+            test_transient = test_experiment.species_data['AMU_40_1']
+            temp_transient = temp_experiment.species_data['AMU_40_1']
+            self.assertTrue(test_transient.flux.index.equals(temp_transient.flux.index))
+            self.assertTrue(test_transient.flux.columns.equals(temp_transient.flux.columns))
+            self.assertListEqual([int(i) for i in test_transient.df_moments['pulse_number']], list(temp_transient.df_moments['pulse_number']))
+
+    def test_read_xlsx_selection(self) -> None:
+        """
+        Test to verify the read from excel function with a species filter and pulse range.
+        """
+        temp_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[temp_keys[0]]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'experiment.xlsx')
+            file_io.write_xlsx(self.experiment, temp_file)
+            test_experiment = file_io.read_xlsx(temp_file, species=[temp_transient.name], pulse_range=[10, 20])
+            test_transient = test_experiment.species_data[temp_transient.name]
+            self.assertListEqual(list(test_transient.flux.shape), [2500, 10])
+            self.assertListEqual(list(test_transient.df_moments['pulse_number']), [str(i) for i in range(11, 21)])
+            self.assertTrue(np.allclose(test_transient.flux.values, temp_transient.flux.values[:, 10:20]))
+            self.assertTrue(np.allclose(test_transient.times, temp_transient.times))
+            self.assertEqual(test_transient.gain, temp_transient.gain)
+            self.assertEqual(test_experiment.pulse_spacing, self.experiment.pulse_spacing)
+
+    def test_read_tdms_batch(self) -> None:
+        """
+        Test to verify the batch read of tdms files.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for temp_name in ['a.tdms', 'b.tdms']:
+                with open(os.path.join(temp_dir, temp_name), 'wb') as temp_file:
+                    temp_file.write(self.stream)
+
+            with open(os.path.join(temp_dir, 'c.tdms'), 'wb') as temp_file:
+                temp_file.write(b'not a tdms file')
+
+            test_catalog = file_io.read_tdms_batch(temp_dir, num_cores=1)
+            self.assertListEqual([os.path.basename(i) for i in test_catalog['file_name']], ['a.tdms', 'b.tdms', 'c.tdms'])
+            self.assertListEqual(list(test_catalog['error'].isna()), [True, True, False])
+            self.assertEqual(test_catalog['experiment'][0].species_data['AMU_40_1'].num_pulse, 100)
+
+            test_catalog = file_io.read_tdms_batch(os.path.join(temp_dir, '[ab].tdms'), output_dir=os.path.join(temp_dir, 'binary'), num_cores=1)
+            self.assertTrue(test_catalog['experiment'].isna().all())
+            test_experiment = file_io.read_binary(test_catalog['checkpoint'][1])
+            self.assertTrue(test_experiment.species_data['AMU_40_1'].flux.equals(self.experiment.species_data['AMU_40_1'].flux))
+
+            # the species of each file are memory mapped to a directory of the file rather than to the same .npy files
+            memmap_dir = os.path.join(temp_dir, 'memmap')
+            test_catalog = file_io.read_tdms_batch(os.path.join(temp_dir, '[ab].tdms'), num_cores=1, read_args={'memmap_dir': memmap_dir})
+            memmap_files = [i.species_data['AMU_40_1'].flux_matrix.memmap_file for i in test_catalog['experiment']]
+            self.assertListEqual(memmap_files, [os.path.join(memmap_dir, i, 'AMU_40_1.npy') for i in ['a', 'b']])
+            self.assertTrue(test_catalog['experiment'][0].species_data['AMU_40_1'].flux.equals(self.experiment.species_data['AMU_40_1'].flux))
+
+            # the worker processes return the experiments, where a lazy read is not sent back with the open file
+            test_catalog = file_io.read_tdms_batch(temp_dir, num_cores=2, read_args={'lazy': True})
+            self.assertListEqual(list(test_catalog['error'].isna()), [True, True, False])
+            self.assertTrue(test_catalog['experiment'][1].species_data['AMU_40_1'].flux.equals(self.experiment.species_data['AMU_40_1'].flux))
+
+    def test_index_tdms(self) -> None:
+        """
+        Test to verify the meta data index of tdms files.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'a.tdms'), 'wb') as temp_file:
+                temp_file.write(self.stream)
+
+            index_file = os.path.join(temp_dir, 'index.db')
+            file_io.index_tdms(temp_dir, index_file)
+            test_matches = file_io.query_tdms_index(index_file, masses=[40], pulse_spacing=5.1)
+            self.assertEqual(test_matches.shape[0], 1)
+            self.assertEqual(test_matches['num_pulse'][0], 100)
+            self.assertEqual(test_matches['gain'][0], 8.0)
+            self.assertEqual(test_matches['num_samples_per_pulse'][0], 2500)
+            self.assertTrue(test_matches['temperature_max'].isna().all())
+            # the unchanged file is indexed again for the temperature
+            file_io.index_tdms(temp_dir, index_file, read_temperature=True)
+            test_matches = file_io.query_tdms_index(index_file, masses=[40], pulse_spacing=5.1)
+            temperature_values = self.experiment.species_data['AMU_40_1'].df_moments['temperature']
+            self.assertAlmostEqual(test_matches['temperature_max'][0], max(temperature_values))
+            test_matches = file_io.query_tdms_index(index_file, temperature_range=[max(temperature_values) + 1, max(temperature_values) + 100])
+            self.assertEqual(test_matches.shape[0], 0)
+
     # def test_write_xlsx(self) -> None:
     #     """
     #     Test to verify the write to excel function.
@@ -4,7 +4,7 @@ import tapsap
 import pkgutil
 import io
 import pandas as pd
-from numpy import array
+from numpy import array, vstack
 
 
 class TestMoments(unittest.TestCase):
@@ -53,6 +53,20 @@ class TestMoments(unittest.TestCase):
         self.assertListEqual(all_moments_rounded, list(self.actual_moments_clipped.values()))
 
 
+    def test_moments_batch(self) -> None:
+        """
+        Test to verify the batched moments match the moments of each flux, both with a shared and a per pulse integration time.
+        """
+        flux_matrix = vstack([self.irreversible_inert_flux, self.irreversible_reactant_flux, self.reversible_reactant_flux - 0.1])
+        batch_moments = tapsap.moments_batch(flux_matrix, self.times, [0, 1])
+        single_moments = tapsap.moments(self.irreversible_reactant_flux, self.times, [0, 1])
+        self.assertAlmostEqual(batch_moments['M1'][1], single_moments['M1'])
+        batch_moments = tapsap.moments_batch(flux_matrix, self.times)
+        for i in range(flux_matrix.shape[0]):
+            temp_times = tapsap.find_integration_time(flux_matrix[i], self.times)
+            single_moments = tapsap.moments(flux_matrix[i], self.times, temp_times)
+            self.assertAlmostEqual(batch_moments['M2'][i], single_moments['M2'])
+
     ## testing rtd_parameters
     def test_rtd_parameters(self) -> None:
         """
@@ -3,8 +3,9 @@ import unittest
 import tapsap
 import pkgutil
 import io
+import warnings
 import pandas as pd
-from numpy import array
+from numpy import array, vstack, linspace, interp, ones, sin
 
 
 class TestPreprocess(unittest.TestCase):
@@ -74,6 +75,19 @@ class TestPreprocess(unittest.TestCase):
         test_rmse = tapsap.rmse(test_flux, self.irreversible_inert_flux)
         self.assertLessEqual(test_rmse, self.allowed_rmse)
 
+    def test_baseline_batch(self) -> None:
+        """
+        Test to verify the baseline correction of all flux at once matches the correction of each flux.
+        """
+        test_flux = vstack([self.noisy_flux_1, self.noisy_flux_2])
+        test_result = tapsap.baseline_gamma_batch(test_flux, array(self.noisy_times))
+        test_rmse = tapsap.rmse(test_result['flux'][1], tapsap.baseline_gamma(array(self.noisy_flux_2), array(self.noisy_times))['flux'])
+        self.assertLessEqual(test_rmse, 1e-12)
+        test_result = tapsap.baseline_correction_batch(test_flux, array(self.noisy_times), baseline_time_range=[4.5, 5.0])
+        test_rmse = tapsap.rmse(test_result['flux'][1], tapsap.baseline_correction(array(self.noisy_flux_2), array(self.noisy_times), baseline_time_range=[4.5, 5.0])['flux'])
+        self.assertLessEqual(test_rmse, 1e-12)
+        self.assertEqual(tapsap.baseline_correction_batch(test_flux, array(self.noisy_times), baseline_amount=2)['baseline_amount'][1], 2)
+
     def test_tap_mix(self) -> None:
         """
         Test to verify the automatic calibration coefficient correction of a flux.
@@ -92,6 +106,74 @@ class TestPreprocess(unittest.TestCase):
         test_rmse = tapsap.rmse(test_flux, self.irreversible_reactant_flux)
         self.assertLessEqual(test_rmse, self.allowed_rmse)
 
+    def test_tap_mix_problem(self) -> None:
+        """
+        Test to verify the calibration problem is built once and reused with new data.
+        """
+        n = len(self.times)
+        test_problem = tapsap.tap_mix_problem(n, 2)
+        self.assertIs(test_problem, tapsap.tap_mix_problem(n, 2))
+        tapsap.tap_mix(self.irreversible_reactant_flux, self.irreversible_inert_flux, self.times)
+        test_flux = tapsap.tap_mix(
+            self.irreversible_reactant_flux_scaled, self.irreversible_inert_flux, self.times)['flux']
+        test_rmse = tapsap.rmse(test_flux, self.irreversible_reactant_flux)
+        self.assertLessEqual(test_rmse, self.allowed_rmse)
+
+    def test_tap_mix_qp(self) -> None:
+        """
+        Test to verify the numpy backend of tap_mix matches the convex solver.
+        """
+        test_coefs = tapsap.tap_mix(
+            self.irreversible_reactant_flux_scaled, self.irreversible_inert_flux, self.times, backend='numpy')['all_coefs']
+        actual_coefs = tapsap.tap_mix(
+            self.irreversible_reactant_flux_scaled, self.irreversible_inert_flux, self.times)['all_coefs']
+        self.assertAlmostEqual(test_coefs[1], actual_coefs[1], 4)
+        self.assertAlmostEqual(test_coefs[0], actual_coefs[0], 4)
+
+    def test_tap_mix_reduced(self) -> None:
+        """
+        Test to verify the sufficient statistics formulation of a long flux matches the exact solution.
+        """
+        long_times = linspace(self.times[0], self.times[-1], 10000)
+        long_reactant_flux = interp(long_times, self.times, self.irreversible_reactant_flux_scaled)
+        long_inert_flux = interp(long_times, self.times, self.irreversible_inert_flux)
+        test_coefs = tapsap.tap_mix(long_reactant_flux, long_inert_flux, long_times)['all_coefs']
+        actual_coefs = tapsap.tap_mix_qp(vstack([ones(10000), long_reactant_flux]).T, long_inert_flux, long_times)
+        self.assertAlmostEqual(test_coefs[1], actual_coefs[1], 6)
+        self.assertAlmostEqual(test_coefs[0], actual_coefs[0], 6)
+
+    def test_tap_mix_joint(self) -> None:
+        """
+        Test to verify calibrating many flux in a single problem matches calibrating each flux.
+        """
+        temp_filters = list(warnings.filters)
+        test_result = tapsap.tap_mix_joint(vstack([self.irreversible_reactant_flux_scaled, self.irreversible_reactant_flux]), vstack([self.irreversible_inert_flux, self.irreversible_inert_flux]), self.times)
+        # the solver warnings are not ignored outside of the solve
+        self.assertListEqual(list(warnings.filters), temp_filters)
+        actual_coefs = tapsap.tap_mix(
+            self.irreversible_reactant_flux, self.irreversible_inert_flux, self.times)['all_coefs']
+        self.assertAlmostEqual(test_result['calibration_coef'][1], actual_coefs[1], 4)
+        self.assertAlmostEqual(test_result['intercept'][1], actual_coefs[0], 4)
+        test_rmse = tapsap.rmse(test_result['flux'][0], self.irreversible_reactant_flux)
+        self.assertLessEqual(test_rmse, self.allowed_rmse)
+
+    def test_tap_mix_irls(self) -> None:
+        """
+        Test to verify the numpy backend of tap_mix with the huber loss matches the convex solver.
+        """
+        noisy_reactant_flux = self.irreversible_reactant_flux_scaled + 0.01 * sin(50 * self.times)
+        test_coefs = tapsap.tap_mix(
+            noisy_reactant_flux, self.irreversible_inert_flux, self.times, huber_loss=True, backend='numpy')['all_coefs']
+        actual_coefs = tapsap.tap_mix(
+            noisy_reactant_flux, self.irreversible_inert_flux, self.times, huber_loss=True)['all_coefs']
+        self.assertAlmostEqual(test_coefs[1], actual_coefs[1], 6)
+        self.assertAlmostEqual(test_coefs[0], actual_coefs[0], 6)
+        test_coefs = tapsap.tap_mix_irls(vstack([ones(len(self.times)), noisy_reactant_flux]).T, self.irreversible_inert_flux, self.times, constraints=False)
+        actual_coefs = tapsap.tap_mix(
+            noisy_reactant_flux, self.irreversible_inert_flux, self.times, huber_loss=True, constraints=False)['all_coefs']
+        self.assertAlmostEqual(test_coefs[1], actual_coefs[1], 6)
+        self.assertAlmostEqual(test_coefs[0], actual_coefs[0], 6)
+
     def test_tap_mix_opt(self) -> None:
         """
         Test to verify the automatic calibration coefficient correction of a flux.
@@ -109,6 +191,14 @@ class TestPreprocess(unittest.TestCase):
         test_rmse = tapsap.rmse(test_flux, self.irreversible_inert_flux)
         self.assertLessEqual(test_rmse, self.allowed_rmse)
 
+    def test_smooth_flux_gam_batch(self) -> None:
+        """
+        Test to verify smoothing all flux at once matches smoothing each flux.
+        """
+        test_flux = tapsap.smooth_flux_gam_batch(vstack([self.noisy_flux_1, self.noisy_flux_2]))
+        test_rmse = tapsap.rmse(test_flux[1], tapsap.smooth_flux_gam(array(self.noisy_flux_2)))
+        self.assertLessEqual(test_rmse, 1e-12)
+
     def test_calibration_teak(self) -> None:
         """
         Test to verify the calibration teak that takes into account if the flux is reversible or irreversible
@@ -2,7 +2,11 @@
 
 import unittest
 import io
+import os
 import pkgutil
+import tempfile
+import numpy as np
+import nptdms
 import tapsap
 
 class TestStructures(unittest.TestCase):
@@ -70,3 +74,199 @@ class TestStructures(unittest.TestCase):
             temp_transient.df_moments['calibration_coef'][25], 3)
         self.assertEqual(temp_calibration_amount, self.calibration_amount_sequential)
 
+
+    def test_executor_reuse(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        self.experiment.set_executor()
+        temp_transient.smooth_flux()
+        temp_transient.baseline_correct()
+        self.assertIs(temp_transient.get_executor(), self.experiment.executor)
+        self.experiment.close()
+        temp_baseline_amount = round(
+            temp_transient.df_moments['baseline'][25], 2)
+        self.assertEqual(temp_baseline_amount, self.baseline_amount)
+
+    def test_pulse_matrix_view(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        temp_matrix = temp_transient.flux_matrix
+        self.assertTrue(temp_matrix.values.flags['C_CONTIGUOUS'])
+        self.assertListEqual(list(temp_transient.flux.shape), [temp_matrix.num_samples, temp_matrix.num_pulse])
+        temp_matrix.set_all(temp_matrix.values * 2)
+        self.assertEqual(temp_transient.flux.iloc[10, 50], temp_matrix.values[50, 10])
+
+    def test_calibrate_flux_pulse_numpy(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        temp_transient.calibrate_flux(reference_index=0, backend='numpy')
+        temp_calibration_amount = round(
+            temp_transient.df_moments['calibration_coef'][25], 3)
+        self.assertEqual(temp_calibration_amount, self.calibration_amount_sequential)
+
+    def test_calibrate_flux_batch_numpy(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        temp_copy = temp_transient.copy()
+        temp_transient.calibrate_flux(reference_index=0, backend='numpy')
+        temp_copy.calibrate_flux(reference_index=0)
+        self.assertTrue(np.allclose(temp_transient.df_moments['calibration_coef'], temp_copy.df_moments['calibration_coef'], atol=1e-5))
+        self.assertTrue(np.allclose(temp_transient.flux_matrix.values, temp_copy.flux_matrix.values, atol=1e-5))
+
+    def test_calibrate_flux_drift(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        df_error = temp_transient.drift_error(10, 20, backend='numpy')
+        self.assertLessEqual(df_error['coef_error'].median(), 0.05)
+        temp_transient.calibrate_flux(reference_index=10, backend='numpy', drift_subsample=20)
+        self.assertTrue(np.allclose(temp_transient.df_moments['calibration_coef'], df_error['drift_coef']))
+
+    def test_make_copy(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        self.experiment.make_copy(species_keys[0], 'copy')
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        temp_copy = self.experiment.species_data['copy']
+        self.assertIs(temp_copy.flux_matrix.values, temp_transient.flux_matrix.values)
+        self.assertIsNot(temp_copy.reactor, temp_transient.reactor)
+        # reading the shared flux does not copy it
+        temp_copy.set_min_mean_max()
+        self.assertIs(temp_copy.flux_matrix.values, temp_transient.flux_matrix.values)
+        self.assertFalse(temp_copy.flux.values.flags['WRITEABLE'])
+        temp_flux = temp_transient.flux_matrix.values.copy()
+        temp_copy.set_accumulation()
+        self.assertIsNot(temp_copy.flux_matrix.values, temp_transient.flux_matrix.values)
+        self.assertTrue((temp_transient.flux_matrix.values == temp_flux).all())
+        temp_copy.set_moments()
+        self.assertNotIn('M0', temp_transient.df_moments.keys())
+        # a removed copy no longer shares the flux, so the flux is written in place
+        self.experiment.make_copy(species_keys[0], 'removed')
+        del self.experiment.species_data['removed']
+        temp_values = temp_transient.flux_matrix.values
+        temp_transient.flux_matrix.set_all(temp_values * 2)
+        self.assertIs(temp_transient.flux_matrix.values, temp_values)
+
+    def test_executor_run_tasks(self) -> None:
+        finished = []
+        temp_tasks = {
+            'product': (finished.append, ('product',), ['reactant']),
+            'reactant': (finished.append, ('reactant',), ['inert']),
+            'inert': (finished.append, ('inert',), [])
+        }
+        for num_workers in [1, 4]:
+            finished.clear()
+            tapsap.Executor(num_workers).run_tasks(temp_tasks)
+            self.assertListEqual(finished, ['inert', 'reactant', 'product'])
+
+        temp_tasks['inert'] = (finished.append, ('inert',), ['product'])
+        with self.assertRaises(ValueError):
+            tapsap.Executor(4).run_tasks(temp_tasks)
+
+    def test_pulse_matrix_memmap(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        temp_flux = temp_transient.flux_matrix.values.copy()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_transient.flux = temp_transient.flux_matrix.to_memmap(os.path.join(temp_dir, 'flux.npy'))
+            temp_transient.chunk_size = 30
+            temp_copy = temp_transient.copy()
+            temp_copy.set_accumulation()
+            self.assertNotEqual(temp_copy.flux_matrix.memmap_file, temp_transient.flux_matrix.memmap_file)
+            self.assertTrue((temp_transient.flux_matrix.values == temp_flux).all())
+            self.assertTrue(np.allclose(temp_copy.flux_matrix.values, np.cumsum(temp_flux, axis=1) * (temp_transient.times[1] - temp_transient.times[0])))
+            temp_transient.set_moments()
+            self.assertEqual(round(temp_transient.df_moments['M1'][50], 3), self.M1_value)
+            # the temporary .npy files are removed once they are no longer used
+            temp_copy.smooth_flux()
+            temp_copy.smooth_flux()
+            temp_copy.flux_matrix.append(temp_transient.flux_matrix)
+            self.assertEqual(len(os.listdir(temp_dir)), 3)
+            temp_copy.flux_matrix.close()
+            del temp_copy
+            self.assertListEqual(os.listdir(temp_dir), ['flux.npy'])
+
+    def test_tdms_follower(self) -> None:
+        stream = pkgutil.get_data('tapsap', 'data/argon_100C.tdms')
+        source_file = nptdms.TdmsFile.read(io.BytesIO(stream))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'live.tdms')
+            with tapsap.TdmsFollower(temp_file, inert='AMU_40_1', backend='numpy') as temp_follower:
+                for num_pulse in [50, 100]:
+                    # a file still being collected only contains the first pulses
+                    temp_channels = []
+                    for group in source_file.groups():
+                        group_channels = group.channels()
+                        if group.name not in ['Meta Data', 'Secondary Data']:
+                            group_channels = group_channels[:(3 + num_pulse)]
+
+                        temp_channels += [nptdms.ChannelObject(group.name, channel.name, channel[:]) for channel in group_channels]
+                        # a second species at mass 28 to calibrate against the inert
+                        if group.name == 'Meta Data':
+                            temp_channels[-2:] = [nptdms.ChannelObject(group.name, 'Item', np.append(group_channels[0][:], ['AMU 2', 'Gain 2'])), nptdms.ChannelObject(group.name, 'Value', np.append(group_channels[1][:], ['28', '8']))]
+                        elif group.name != 'Secondary Data':
+                            temp_channels += [nptdms.ChannelObject('2', channel.name, channel[:] * 0.5 if j >= 3 else channel[:]) for j, channel in enumerate(group_channels)]
+
+                    with nptdms.TdmsWriter(temp_file) as tdms_writer:
+                        tdms_writer.write_segment(temp_channels)
+
+                    self.assertEqual(temp_follower.update(), 50)
+
+                self.assertEqual(temp_follower.update(), 0)
+                temp_experiment = tapsap.read_tdms(temp_file)
+                temp_experiment.calibrate_all_species('AMU_40_1', backend='numpy')
+                self.assertIn('AMU_28_1', list(temp_experiment.species_data.keys()))
+                for i in temp_experiment.species_data.keys():
+                    temp_transient = temp_experiment.species_data[i]
+                    test_transient = temp_follower.experiment.species_data[i]
+                    self.assertEqual(test_transient.num_pulse, 100)
+                    self.assertTrue(np.allclose(test_transient.flux_matrix.values, temp_transient.flux_matrix.values))
+                    if i != 'AMU_40_1':
+                        self.assertTrue(np.allclose(test_transient.df_moments['calibration_coef'], temp_transient.df_moments['calibration_coef']))
+
+    def test_calibrate_all_species_workers(self) -> None:
+        all_coefs = []
+        for num_workers in [1, 4]:
+            temp_experiment = tapsap.read_tdms(io.BytesIO(pkgutil.get_data('tapsap', 'data/argon_100C.tdms')))
+            temp_species = temp_experiment.species_data['AMU_40_1'].copy()
+            temp_species.name = 'AMU_28_1'
+            temp_species.mass = 28
+            temp_species.flux_matrix.set_all(temp_species.flux_matrix.values * 0.5)
+            temp_experiment.species_data['AMU_28_1'] = temp_species
+            # the inert name is not the same object as the species_data key
+            temp_experiment.calibrate_all_species(''.join(['AMU_40', '_1']), backend='numpy', num_workers=num_workers)
+            all_coefs.append(temp_experiment.species_data['AMU_28_1'].df_moments['calibration_coef'].values)
+
+        self.assertTrue(np.array_equal(all_coefs[0], all_coefs[1]))
+
+    def test_result_cache(self) -> None:
+        species_keys = list(self.experiment.species_data.keys())
+        temp_transient = self.experiment.species_data[species_keys[0]]
+        def run_stages(temp_cache, calibration_coef = 1):
+            temp_copy = temp_transient.copy()
+            temp_copy.reference_gas = temp_transient.copy()
+            temp_copy.df_moments['calibration_coef'] = calibration_coef
+            temp_copy.df_moments['intercept'] = 0.0
+            temp_copy.df_moments['M0'] = calibration_coef
+            temp_copy.cache = temp_cache
+            temp_copy.baseline_correct(baseline_amount=self.baseline_amount, smooth_flux=False)
+            temp_copy.calibrate_flux(backend='numpy')
+            temp_copy.set_concentration()
+            return temp_copy
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_cache = tapsap.ResultCache(temp_dir)
+            cold_transient = run_stages(temp_cache)
+            num_results = len(os.listdir(temp_dir))
+            # the warm run reads every stage and ends in the same state as the cold run, including the smoothed reference flux
+            warm_transient = run_stages(temp_cache)
+            self.assertEqual(len(os.listdir(temp_dir)), num_results)
+            self.assertTrue(np.array_equal(cold_transient.flux_matrix.values, warm_transient.flux_matrix.values))
+            self.assertTrue(np.array_equal(cold_transient.smoothed_flux_matrix.values, warm_transient.smoothed_flux_matrix.values))
+            self.assertTrue(np.array_equal(cold_transient.reference_gas.smoothed_flux_matrix.values, warm_transient.reference_gas.smoothed_flux_matrix.values))
+            self.assertTrue(cold_transient.df_moments.equals(warm_transient.df_moments))
+            # the calibration coefficient is an input of calibrate_flux and the other moments are not restored
+            scaled_transient = run_stages(temp_cache, 2)
+            self.assertTrue(np.allclose(scaled_transient.df_moments['calibration_coef'], 2 * cold_transient.df_moments['calibration_coef']))
+            self.assertTrue((scaled_transient.df_moments['M0'] == 2).all())
+            temp_cache.max_size = 0
+            run_stages(temp_cache, 3)
+            self.assertEqual(len(os.listdir(temp_dir)), 0)
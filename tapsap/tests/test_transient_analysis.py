@@ -52,6 +52,41 @@ class TestTransientAnalysis(unittest.TestCase):
         test_rmse = round(tapsap.rmse(test_rate, self.irreversible_rate), 1)
         self.assertLessEqual(test_rmse, self.allowed_rmse)
 
+    def test_g_batch(self):
+        all_flux = np.vstack([self.irreversible_reactant_flux, self.irreversible_inert_flux])
+        all_inert = np.vstack([self.irreversible_inert_flux, self.irreversible_inert_flux])
+        test_concentration = tapsap.concentration_g_batch(all_flux, self.times, self.zone_lengths)
+        test_rate = tapsap.rate_g_batch(all_flux, self.times, self.zone_lengths, all_inert)
+        for i in range(all_flux.shape[0]):
+            concentration = tapsap.concentration_g(all_flux[i].copy(), self.times, self.zone_lengths)
+            rate = tapsap.rate_g(all_flux[i].copy(), self.times, self.zone_lengths, all_inert[i].copy())
+            self.assertTrue(np.allclose(test_concentration[i], concentration))
+            self.assertTrue(np.allclose(test_rate[i], rate))
+
+    def test_y_batch(self):
+        all_flux = np.vstack([self.irreversible_reactant_flux, self.irreversible_inert_flux])
+        all_inert = np.vstack([self.irreversible_inert_flux, self.irreversible_inert_flux])
+        test_concentration = tapsap.concentration_y_batch(all_flux, self.times, self.diffusion, self.zone_lengths, self.zone_porosity, 5)
+        test_rate = tapsap.rate_y_batch(all_flux, self.times, self.diffusion, self.zone_lengths, self.zone_porosity, all_inert, 5)
+        for i in range(all_flux.shape[0]):
+            concentration = tapsap.concentration_y(all_flux[i], self.times, self.diffusion, self.zone_lengths, self.zone_porosity, 5)
+            rate = tapsap.rate_y(all_flux[i], self.times, self.diffusion, self.zone_lengths, self.zone_porosity, all_inert[i], 5)
+            self.assertTrue(np.allclose(test_concentration[i], concentration))
+            self.assertTrue(np.allclose(test_rate[i], rate))
+
+    def test_y_transfer_function_cache(self):
+        time_step = self.times[1] - self.times[0]
+        tapsap.y_transfer_function.cache_clear()
+        transfer_function = tapsap.y_transfer_function('rate', len(self.times), time_step, self.diffusion, self.zone_lengths, self.zone_porosity, 5)
+        self.assertIs(tapsap.y_transfer_function('rate', len(self.times), time_step, self.diffusion, dict(self.zone_lengths), self.zone_porosity, 5), transfer_function)
+        self.assertFalse(transfer_function.flags.writeable)
+        # the cache is bounded and may be cleared
+        for i in range(200):
+            tapsap.y_transfer_function('rate', 16, time_step, self.diffusion * (1 + i), self.zone_lengths, self.zone_porosity, 5)
+        self.assertEqual(tapsap.y_transfer_function.cache_info().currsize, 128)
+        tapsap.y_transfer_function.cache_clear()
+        self.assertEqual(tapsap.y_transfer_function.cache_info().currsize, 0)
+
     def test_uptake(self):
         test_uptake = tapsap.uptake(self.irreversible_rate, self.times)
         test_rmse = round(tapsap.rmse(test_uptake, self.irreversible_uptake), 1)
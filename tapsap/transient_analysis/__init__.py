@@ -3,6 +3,12 @@ from .rate_units import rate_units
 from .concentration_g import concentration_g
 from .rate_g import rate_g
 from .postprocess_g import postprocess_g
+from .postprocess_g_batch import postprocess_g_batch
+from .concentration_g_batch import concentration_g_batch
+from .rate_g_batch import rate_g_batch
 from .concentration_y import concentration_y
 from .rate_y import rate_y
-from .uptake import uptake
\ No newline at end of file
+from .uptake import uptake
+from .y_transfer_function import y_transfer_function
+from .concentration_y_batch import concentration_y_batch
+from .rate_y_batch import rate_y_batch
\ No newline at end of file
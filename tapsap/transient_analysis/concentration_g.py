@@ -49,13 +49,9 @@ def concentration_g(flux: np.ndarray, times: np.ndarray, zone_lengths: dict) ->
 
     # altering the flux wrt the alpha parameter in the gamma distribution
     time_scalar = -(1 - catalyst_ratio**2) / 6
-    temp_time_multiplier = times[1:len(times)]**time_scalar
-    time_multiplier = np.array([0] + list(temp_time_multiplier))
+    time_multiplier = np.concatenate(([0], times[1:len(times)]**time_scalar))
     concentration = flux * time_multiplier
     concentration = transient_analysis.postprocess_g(concentration, flux.argmax())
-    print(min(flux))
-    print(min(concentration))
-    print('******************')
 
     # Calculate the area
     concentration_area = utils.trapz(concentration, times)
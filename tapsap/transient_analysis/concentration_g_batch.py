@@ -0,0 +1,67 @@
+#concentration_g_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import utils, transient_analysis
+
+
+def concentration_g_batch(flux: np.ndarray, times: np.ndarray, zone_lengths: dict) -> np.ndarray:
+    """
+
+    Calculation of the concentration via the G-Procedure for every flux at once.
+    The time multiplier is calculated once and applied to all of the flux.
+    The results are equal to tapsap.transient_analysis.concentration_g applied to each flux.
+    
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        zone_lengths (dict): The reactor zone lengths.
+
+    Returns:
+        concentration (float ndarray): The gas concentration (1/second) of each flux.
+
+    Citation:
+        Yablonsky et al, "The Y-procedure: How to extract the chemical transformation rate from reaction–diffusion data with no assumption on the kinetic model"
+
+        Redekop et al, "The Y-Procedure methodology for the interpretation of transient kinetic data: Analysis of irreversible adsorption"
+
+        Kunz et al, "Pulse response analysis using the Y-procedure: A data science approach"
+
+        Kunz et al, "Probability theory for inverse diffusion: Extracting the transport/kinetic time-dependence from transient experiments"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.concentration_g
+
+        tapsap.transient_analysis.postprocess_g_batch
+
+    Link:
+        https://doi.org/10.1016/j.ces.2007.04.050
+
+        https://doi.org/10.1016/j.ces.2011.08.055
+
+        https://doi.org/10.1016/j.ces.2018.06.078
+
+        https://doi.org/10.1016/j.cej.2020.125985
+    """
+    flux = np.asarray(flux, dtype=float)
+    # assuming a symmetric reactor for the time being, but this may be altered accordingly
+    catalyst_ratio = zone_lengths['zone2'] / sum(zone_lengths.values())
+
+    # altering the flux wrt the alpha parameter in the gamma distribution
+    time_scalar = -(1 - catalyst_ratio**2) / 6
+    time_multiplier = np.concatenate(([0], times[1:len(times)]**time_scalar))
+    concentration = flux * time_multiplier[None, :]
+    concentration = transient_analysis.postprocess_g_batch(concentration, flux.argmax(axis=1))
+
+    # Calculate the area
+    concentration_area = utils.trapz(concentration, times)
+    flux_area = utils.trapz(flux, times)
+    # Dimensionless concentration
+    concentration = concentration * (flux_area / concentration_area)[:, None]
+
+    return concentration
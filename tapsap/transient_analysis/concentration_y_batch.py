@@ -0,0 +1,57 @@
+# concentration_y_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import utils, transient_analysis
+
+def concentration_y_batch(flux: np.ndarray, times: np.ndarray, diffusion: float, zone_lengths: dict, zone_porosity: dict, smoothing_amt: float = 3) -> np.ndarray:
+    """
+
+    Calculation of the concentration via the Y-Procedure for every flux at once.
+    The cached transfer function is applied to the real FFT of all of the flux in a single call.
+    The results are equal to tapsap.transient_analysis.concentration_y applied to each flux.
+    
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        diffusion (float): The diffusion coefficient within the catalyst zone.
+
+        zone_lengths (dict): The reactor zone lengths.
+
+        zone_porosity (dict): The assumed bed porosity within the catalyst.
+
+        smoothing_amt (float, optional): The amount of smoothing to be applied to the Y-Procedure. 
+
+    Returns:
+        concentration (float ndarray): The gas concentration (1/second) of each flux.
+
+    Citation:
+        Yablonsky et al, "The Y-procedure: How to extract the chemical transformation rate from reaction–diffusion data with no assumption on the kinetic model"
+
+        Kunz et al, "Pulse response analysis using the Y-procedure: A data science approach"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.concentration_y
+
+        tapsap.transient_analysis.y_transfer_function
+
+    Link:
+        https://doi.org/10.1016/j.ces.2007.04.050
+
+        https://doi.org/10.1016/j.ces.2018.06.078
+    """
+    flux = np.asarray(flux, dtype=float)
+    len_flux = flux.shape[-1]
+    gas_scalar = transient_analysis.y_transfer_function('concentration', len_flux, times[1] - times[0], diffusion, zone_lengths, zone_porosity, smoothing_amt)
+    concentration = np.fft.irfft(np.fft.rfft(flux, axis=-1) * gas_scalar, n=len_flux, axis=-1)
+    concentration_area = utils.trapz(concentration, times)
+    flux_area = utils.trapz(flux, times)
+    # Area normalize the concentration
+    concentration = concentration * (flux_area / concentration_area)[..., None]
+
+    return concentration
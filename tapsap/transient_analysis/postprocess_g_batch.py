@@ -0,0 +1,47 @@
+#postprocess_g_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+
+def postprocess_g_batch(flux: np.ndarray, flux_argmax: np.ndarray = None) -> np.ndarray:
+    """
+
+    Correction of negative values within the concentration and rate via the G-Procedure for every flux at once.
+    For each flux, the values up to the last value prior to the maximum that falls below the noise level are removed and the end of the flux is repeated to keep the length.
+    The shift is applied to every flux in a single indexing operation.
+    The results are identical to tapsap.transient_analysis.postprocess_g applied to each flux.
+    
+    Args:
+        flux (float ndarray): The outlet flux with a shape of (num_pulse, num_samples). More specifically, the concentration or rate.
+
+        flux_argmax (int ndarray, optional): The index of the maximum of each flux (typically the flux not the concentration or rate).
+
+    Returns:
+        flux (float ndarray): The flux without the negative values before the maximum of the flux response.
+
+    Citation:
+        None
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.postprocess_g
+
+    Link:
+        None
+    """
+    flux = np.asarray(flux, dtype=float)
+    num_samples = flux.shape[1]
+    if flux_argmax is None:
+        flux_argmax = flux.argmax(axis=1)
+
+    sample_index = np.arange(num_samples)
+    max_noise = np.std(flux[:, (num_samples - 30):num_samples], axis=1)
+    negative_values = (flux < max_noise[:, None] * 3) & (sample_index[None, :] < np.asarray(flux_argmax)[:, None])
+    # the last negative value prior to the maximum
+    negative_max = num_samples - 1 - negative_values[:, ::-1].argmax(axis=1)
+    flux_shift = np.where(negative_values.any(axis=1), negative_max + 1, 0)
+    shift_index = np.minimum(sample_index[None, :] + flux_shift[:, None], num_samples - 1)
+
+    return np.take_along_axis(flux, shift_index, axis=1)
@@ -64,8 +64,7 @@ def rate_g(flux: np.ndarray, times: np.ndarray, zone_lengths: dict, inert_flux:
     flux_diff[0] = 0
     # altering the flux wrt the alpha parameter in the gamma distribution
     time_scalar = -(1 - catalyst_ratio**2) * 1.5
-    temp_time_multiplier = times[1:len(times)]**time_scalar
-    time_multiplier = np.array([0] + list(temp_time_multiplier))
+    time_multiplier = np.concatenate(([0], times[1:len(times)]**time_scalar))
     rate = flux_diff * time_multiplier
     rate[0] = 0
 
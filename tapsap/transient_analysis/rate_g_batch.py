@@ -0,0 +1,91 @@
+# rate_g_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import utils, transient_analysis
+
+
+def rate_g_batch(flux: np.ndarray, times: np.ndarray, zone_lengths: dict, inert_flux: np.ndarray = None) -> np.ndarray:
+    """
+
+    Calculation of the rate via the G-Procedure for every flux at once.
+    The time multiplier is calculated once and applied to all of the flux.
+    If the flux is derived from the reactant gas, then flux must be the difference of the inert_flux and reactant_flux or inert_flux must be populated with the flux of the inert.
+    The results are equal to tapsap.transient_analysis.rate_g applied to each flux.
+    
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        zone_lengths (dict): The reactor zone lengths.
+
+        inert_flux (float ndarray, optional): The outlet flux of the inert with the same shape as the flux.
+
+    Returns:
+        rate (float ndarray): The gas rate (temporal) of each flux.
+
+    Citation:
+        Yablonsky et al, "The Y-procedure: How to extract the chemical transformation rate from reaction–diffusion data with no assumption on the kinetic model"
+
+        Redekop et al, "The Y-Procedure methodology for the interpretation of transient kinetic data: Analysis of irreversible adsorption"
+
+        Kunz et al, "Pulse response analysis using the Y-procedure: A data science approach"
+
+        Kunz et al, "Probability theory for inverse diffusion: Extracting the transport/kinetic time-dependence from transient experiments"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.rate_g
+
+        tapsap.transient_analysis.postprocess_g_batch
+
+    Link:
+        https://doi.org/10.1016/j.ces.2007.04.050
+
+        https://doi.org/10.1016/j.ces.2011.08.055
+
+        https://doi.org/10.1016/j.ces.2018.06.078
+
+        https://doi.org/10.1016/j.cej.2020.125985
+    """
+    flux = np.asarray(flux, dtype=float)
+    catalyst_ratio = zone_lengths['zone2'] / sum(zone_lengths.values())
+
+    if inert_flux is None:
+        flux_diff = flux.copy()
+        original_m0 = utils.trapz(flux, times)
+    else:
+        inert_flux = np.asarray(inert_flux, dtype=float)
+        flux_diff = inert_flux - flux
+        original_m0 = utils.trapz(flux_diff, times) / utils.trapz(inert_flux, times)
+
+    # this is put here just incase there is no reaction, i.e., the inert flux is equal to the reactant flux
+    no_reaction = flux_diff.sum(axis=1) == 0
+    original_diff = flux_diff[no_reaction]
+
+    flux_diff[:, 0] = 0
+    # the maximum of the flux is found after the first value is removed when no inert is given
+    if inert_flux is None:
+        flux_argmax = flux_diff.argmax(axis=1)
+    else:
+        flux_argmax = flux.argmax(axis=1)
+
+    # altering the flux wrt the alpha parameter in the gamma distribution
+    time_scalar = -(1 - catalyst_ratio**2) * 1.5
+    time_multiplier = np.concatenate(([0], times[1:len(times)]**time_scalar))
+    rate = flux_diff * time_multiplier[None, :]
+    rate[:, 0] = 0
+
+    rate = transient_analysis.postprocess_g_batch(rate, flux_argmax)
+
+    rate_area = utils.trapz(rate, times)
+    # Appropriately scale the M0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        area_scalar = original_m0 / rate_area
+    rate = rate * (area_scalar * (-time_scalar))[:, None]
+    rate[no_reaction] = original_diff
+
+    return rate
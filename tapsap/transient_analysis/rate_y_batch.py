@@ -0,0 +1,60 @@
+# rate_y_batch
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from tapsap import transient_analysis
+
+def rate_y_batch(flux: np.ndarray, times: np.ndarray, diffusion: float, zone_lengths: dict, zone_porosity: dict, inert_flux: np.ndarray = None,  smoothing_amt: float = 3) -> np.ndarray:
+    """
+
+    Calculation of the rate via the Y-Procedure for every flux at once.
+    The cached transfer function is applied to the real FFT of all of the flux in a single call.
+    The results are equal to tapsap.transient_analysis.rate_y applied to each flux.
+    
+    Args:
+        flux (float ndarray): The outlet flux of each pulse with a shape of (num_pulse, num_samples).
+
+        times (float ndarray): An array of time.
+
+        diffusion (float): The diffusion coefficient within the catalyst zone.
+
+        zone_lengths (dict): The reactor zone lengths.
+
+        zone_porosity (dict): The assumed bed porosity within the catalyst.
+
+        inert_flux (float ndarray, optional): The outlet flux of the inert with the same shape as the flux.
+
+        smoothing_amt (float, optional): The amount of smoothing to be applied to the Y-Procedure. 
+
+    Returns:
+        rate (float ndarray): The gas rate (temporal) of each flux.
+
+    Citation:
+        Yablonsky et al, "The Y-procedure: How to extract the chemical transformation rate from reaction–diffusion data with no assumption on the kinetic model"
+
+        Kunz et al, "Pulse response analysis using the Y-procedure: A data science approach"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.rate_y
+
+        tapsap.transient_analysis.y_transfer_function
+
+    Link:
+        https://doi.org/10.1016/j.ces.2007.04.050
+
+        https://doi.org/10.1016/j.ces.2018.06.078
+    """
+    flux = np.asarray(flux, dtype=float)
+    if inert_flux is None:
+        flux_diff = flux
+    else:
+        flux_diff = np.asarray(inert_flux, dtype=float) - flux
+
+    len_flux = flux.shape[-1]
+    rate_scalar = transient_analysis.y_transfer_function('rate', len_flux, times[1] - times[0], diffusion, zone_lengths, zone_porosity, smoothing_amt)
+    rate = np.fft.irfft(np.fft.rfft(flux_diff, axis=-1) * rate_scalar, n=len_flux, axis=-1)
+
+    return rate
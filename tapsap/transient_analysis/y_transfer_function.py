@@ -0,0 +1,93 @@
+# y_transfer_function
+# Copyright 2021, Battelle Energy Alliance, LLC All Rights Reserved
+
+import numpy as np
+from functools import lru_cache
+
+
+def y_transfer_function(transfer_type: str, num_samples: int, time_step: float, diffusion: float, zone_lengths: dict, zone_porosity: dict, smoothing_amt: float = 3) -> np.ndarray:
+    """
+
+    The frequency domain transfer function of the Y-Procedure for real valued flux.
+    The transfer function only depends on the sampling, diffusion, reactor geometry and smoothing, so it is calculated once per set of parameters and the most recent sets (128) are cached.
+    The cache may be cleared by y_transfer_function.cache_clear().
+    The real part of the inverse transform used by concentration_y and rate_y is kept by symmetrizing the transfer function, such that it may be applied to the half spectrum of numpy.fft.rfft.
+
+    Args:
+        transfer_type (str): The transformation. Options: concentration, rate
+
+        num_samples (int): The number of samples in the flux.
+
+        time_step (float): The time between samples.
+
+        diffusion (float): The diffusion coefficient within the catalyst zone.
+
+        zone_lengths (dict): The reactor zone lengths.
+
+        zone_porosity (dict): The assumed bed porosity within the catalyst.
+
+        smoothing_amt (float, optional): The amount of smoothing to be applied to the Y-Procedure. 
+
+    Returns:
+        transfer_function (complex ndarray): The transfer function for the rfft frequencies (num_samples // 2 + 1).  The array is read only.
+
+    Citation:
+        Yablonsky et al, "The Y-procedure: How to extract the chemical transformation rate from reaction–diffusion data with no assumption on the kinetic model"
+
+        Kunz et al, "Pulse response analysis using the Y-procedure: A data science approach"
+
+    Implementor:
+        M. Ross Kunz
+
+    See also:
+        tapsap.transient_analysis.concentration_y
+
+        tapsap.transient_analysis.rate_y
+
+    Link:
+        https://doi.org/10.1016/j.ces.2007.04.050
+
+        https://doi.org/10.1016/j.ces.2018.06.078
+    """
+    if transfer_type not in ['concentration', 'rate']:
+        raise ValueError(
+            "transfer_type must be either concentration or rate")
+
+    return _transfer_function(transfer_type, int(num_samples), float(time_step), float(diffusion), tuple(sorted(zone_lengths.items())), tuple(sorted(zone_porosity.items())), float(smoothing_amt))
+
+
+@lru_cache(maxsize=128)
+def _transfer_function(transfer_type: str, num_samples: int, time_step: float, diffusion: float, zone_lengths: tuple, zone_porosity: tuple, smoothing_amt: float) -> np.ndarray:
+    # the reactor zones are given as sorted (key, value) tuples, such that the arguments are hashable
+    zone_lengths = dict(zone_lengths)
+    zone_porosity = dict(zone_porosity)
+    len_flux = num_samples
+    gamma_1 = diffusion / zone_lengths['zone0']
+    gamma_3 = diffusion / zone_lengths['zone2']
+    tau_1 = zone_porosity['zone0'] * zone_lengths['zone0']**2 / diffusion
+    tau_3 = zone_porosity['zone2'] * zone_lengths['zone2']**2 / diffusion
+    k = np.array(list(np.arange(0, np.ceil(len_flux / 2) + 1)) +
+                list(np.arange(-np.floor(len_flux / 2), -1)))
+    omega = 2 * np.pi * k / (len_flux * time_step)
+    omega[0] = 1e-10
+    smoothing_vector = np.exp(-omega**2 * time_step**2 * smoothing_amt**2 / 2)
+    iwt1 = np.sqrt(1.j * omega * tau_1)
+    iwt3 = np.sqrt(1.j * omega * tau_3)
+    if transfer_type == 'concentration':
+        full_transfer = np.sinh(iwt3) / iwt1
+        full_transfer[0] = 1
+        full_transfer = full_transfer * smoothing_vector / gamma_3
+    else:
+        full_transfer = (np.cosh(iwt3) + np.sqrt(tau_1 * gamma_1**2 / (tau_3 * gamma_3**2))
+                         * np.sinh(iwt1) * np.sinh(iwt3) / np.cosh(iwt1)) * smoothing_vector
+
+    # Re(ifft(fft(x) * H)) is equal to ifft(fft(x) * (H[j] + conj(H[-j])) / 2) for a real flux x
+    half_index = np.arange(0, len_flux // 2 + 1)
+    transfer_function = (full_transfer[half_index] + np.conj(full_transfer[(-half_index) % len_flux])) / 2
+    transfer_function.flags.writeable = False
+
+    return transfer_function
+
+
+y_transfer_function.cache_clear = _transfer_function.cache_clear
+y_transfer_function.cache_info = _transfer_function.cache_info